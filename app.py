@@ -51,26 +51,47 @@ class ShortcutTUI:
         self.items = []
         self.sub_index = 0
         self.current_path = os.path.expanduser("~") # For Explorer
+        self.registry = None # Script index, opened on first use
         self.running = True
 
     def get_local_scripts(self):
         for d in [SCRIPTS_DIR, QUARANTINE_DIR]:
             if not os.path.exists(d): os.makedirs(d)
-        scripts = []
-        if os.path.exists(SCRIPTS_DIR):
-            for f in os.listdir(SCRIPTS_DIR):
-                if f.endswith(".ps1") or f.endswith(".py"):
-                    scripts.append({"name": f, "path": os.path.join(SCRIPTS_DIR, f), "status": "Verified"})
-        if os.path.exists(QUARANTINE_DIR):
-            for f in os.listdir(QUARANTINE_DIR):
-                if f.endswith(".ps1") or f.endswith(".py"):
-                    scripts.append({"name": f, "path": os.path.join(QUARANTINE_DIR, f), "status": "QUARANTINE"})
-        return scripts
+        if self.registry is None:
+            from script_registry import ScriptRegistry
+            self.registry = ScriptRegistry([(SCRIPTS_DIR, "Verified"), (QUARANTINE_DIR, "QUARANTINE")])
+        return self.registry.items()
 
     def get_pidgeon_contacts(self):
         from pidgeon import Pidgeon
         p = Pidgeon()
-        return [{"name": c['name'], "email": c['email'], "status": "Contact"} for c in p.get_contacts()]
+        return [{"name": c['name'] or c['email'], "email": c['email'], "status": c['email']} for c in p.get_contacts(limit=50)]
+
+    def get_pidgeon_history(self):
+        from pidgeon import Pidgeon
+        p = Pidgeon()
+        return [{"name": f"{datetime.fromtimestamp(m['sent_at']).strftime('%Y-%m-%d %H:%M')}  {m['recipient']}  {m['subject']}",
+                 "status": m['status'], "message": m} for m in p.get_history(limit=50)]
+
+    def show_message(self, item):
+        m = item['message']
+        console.clear()
+        console.print(Panel(m['body'] or "[dim](empty)[/dim]", title=f"[bold]{m['subject']}[/bold]",
+                            subtitle=f"To {m['recipient']} :: {m['status']}", border_style="cyan"))
+        if m.get('error'): console.print(f"[red]{m['error']}[/red]")
+        console.input("\n[dim]Press Enter to return...[/dim]")
+
+    def prompt_recipient(self):
+        """Ask for a recipient; a partial name or address autocompletes from contacts."""
+        from pidgeon import Pidgeon
+        p = Pidgeon()
+        to = console.input("To: ").strip()
+        if not to or "@" in to or p.get_actual_id(to) != to: return to
+        matches = p.get_contacts(to, 5)
+        if not matches: return to
+        for i, c in enumerate(matches, 1): console.print(f"  [cyan]{i}[/cyan] {c['name']} [dim]<{c['email']}>[/dim]")
+        pick = console.input("Pick [1]: ").strip() or "1"
+        return matches[int(pick) - 1]['email'] if pick.isdigit() and 0 < int(pick) <= len(matches) else to
 
     def get_connect_peers(self):
         from connect import Connect
@@ -151,7 +172,8 @@ class ShortcutTUI:
             elif isinstance(item, dict):
                 status = item.get("status", "") or item.get("id", "")
                 s_style = "bold red" if status == "QUARANTINE" else "dim"
-                table.add_row(prefix, item["name"], Text(status, style=s_style), style=style)
+                name = Text.assemble(item["name"], (f"  {item['synopsis']}", "dim")) if item.get("synopsis") else item["name"]
+                table.add_row(prefix, name, Text(status, style=s_style), style=style)
             else: table.add_row(prefix, str(item), "", style=style)
         sub = "[dim]Enter: Action | 'v': View Code | 'q': Back[/dim]"
         if is_explorer: sub = f"[bold cyan]{self.current_path}[/bold cyan] | {sub}"
@@ -181,13 +203,28 @@ class ShortcutTUI:
         if is_quarantine:
             console.print(Panel("[bold red]SECURITY WARNING[/bold red]\nThis script is unverified.", border_style="red"))
             if not console.input("Type 'run' to proceed: ").lower() == 'run': return
-        console.print(Panel(f"Executing: [bold yellow]{item['name']}[/bold yellow]", border_style="yellow"))
-        cmd = ["powershell", "-ExecutionPolicy", "Bypass", "-File", script_path] if script_path.endswith(".ps1") else [sys.executable, script_path]
+        from script_runner import ScriptRunner
+        from output_capture import RingBuffer
+        from script_stats import record_runs
+        # Live tail of the last lines while the script runs; the full output goes to its log file
+        tail = RingBuffer(20)
+
+        def render():
+            body = Text()
+            for i, (stream, line) in enumerate(tail.snapshot()):
+                body.append(("\n" if i else "") + line, style="red" if stream == "stderr" else "")
+            return Panel(body, title=f"Executing: [bold yellow]{item['name']}[/bold yellow]",
+                         subtitle=f"[dim]{tail.total} lines[/dim]", border_style="yellow")
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.stdout: console.print(f"\n[bold white]Output:[/bold white]\n{result.stdout}")
-            if result.returncode != 0: console.print(f"\n[bold red]✕ Failed (Exit {result.returncode})[/bold red]")
-            else: console.print("\n[bold green]✓ Execution Successful[/bold green]")
+            with Live(get_renderable=render, console=console, refresh_per_second=8):
+                result = ScriptRunner(workers=1, on_line=lambda script, stream, line: tail.append((stream, line))).run(
+                    [{"name": item['name'], "path": script_path}])[0]
+            record_runs([result], "tui")
+            if result['error']: console.print(f"[red]Error: {result['error']}[/red]")
+            elif result['exit_code'] != 0: console.print(f"\n[bold red]✕ Failed (Exit {result['exit_code']})[/bold red] [dim]{result['seconds']:.2f}s[/dim]")
+            else: console.print(f"\n[bold green]✓ Execution Successful[/bold green] [dim]{result['seconds']:.2f}s[/dim]")
+            if result['log']: console.print(f"[dim]Full output: {result['log']}[/dim]")
+        except KeyboardInterrupt: console.print("\n[yellow]Interrupted.[/yellow]")
         except Exception as e: console.print(f"[red]Error: {e}[/red]")
         console.input("\n[dim]Press Enter to return...[/dim]")
 
@@ -223,6 +260,7 @@ class ShortcutTUI:
                 
                 elif self.state == "KEYCARD_LIST": live.update(self.draw_list("Keycard: Restore Points", self.items, self.sub_index))
                 elif self.state == "CONTACTS_LIST": live.update(self.draw_list("Pidgeon: Contacts", self.items, self.sub_index))
+                elif self.state == "HISTORY_LIST": live.update(self.draw_list("Pidgeon: Message History", self.items, self.sub_index))
                 elif self.state == "PEERS_LIST": live.update(self.draw_list("Connect: Online Peers", self.items, self.sub_index))
                 elif self.state == "SCRIPTS_LIST": live.update(self.draw_list("My Scripts", self.items, self.sub_index))
                 elif self.state == "MARKET": live.update(self.draw_list("Verified Marketplace", self.items, self.sub_index, True))
@@ -263,8 +301,9 @@ class ShortcutTUI:
                             c = self.pidgeon_options[self.current_index]
                             if "Contacts" in c: self.state = "CONTACTS_LIST"; self.items = self.get_pidgeon_contacts(); self.sub_index = 0
                             elif "Send" in c:
-                                live.stop(); to = console.input("To: "); sub = console.input("Subject: "); body = console.input("Body: ")
-                                subprocess.run([sys.executable, "cli.py", "pidgeon", "send", to, "-s", sub, "-b", body]); console.input("\n..."); live.start()
+                                live.stop(); to = self.prompt_recipient(); sub = console.input("Subject: "); body = console.input("Body: ")
+                                from pidgeon import Pidgeon; Pidgeon().send_pidgeon(to, sub, body); console.input("\n..."); live.start()
+                            elif "History" in c: self.state = "HISTORY_LIST"; self.items = self.get_pidgeon_history(); self.sub_index = 0
                             elif "Back" in c: self.state = "MENU"; self.current_index = 0
 
                         elif self.state == "CONNECT_MENU":
@@ -298,6 +337,8 @@ class ShortcutTUI:
                                 item = self.items[self.sub_index]
                                 if item['type'] == 'dir': self.current_path = item['path']; self.items = self.get_explorer_items(); self.sub_index = 0
                                 else: os.startfile(item['path']); self.running = False
+                        elif self.state == "HISTORY_LIST":
+                            if self.items: live.stop(); self.show_message(self.items[self.sub_index]); live.start()
                         elif self.state == "MARKET":
                             if self.items: live.stop(); self.download_script(self.items[self.sub_index]); live.start()
                         elif self.state == "SEARCH":
@@ -315,7 +356,7 @@ class ShortcutTUI:
                         else:
                              if self.state in ["SCRIPTS_LIST", "MARKET", "SEARCH"]: self.state = "SCRIPTS_MENU"
                              elif self.state in ["EXPLORER", "RECENT"]: self.state = "FEATURES_MENU"
-                             elif self.state in ["CONTACTS_LIST"]: self.state = "PIDGEON_MENU"
+                             elif self.state in ["CONTACTS_LIST", "HISTORY_LIST"]: self.state = "PIDGEON_MENU"
                              elif self.state in ["PEERS_LIST"]: self.state = "CONNECT_MENU"
                              else: self.state = "MENU"
                              self.current_index = 0
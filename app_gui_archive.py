@@ -8,10 +8,15 @@ import requests
 from PIL import Image
 from tkinter import messagebox
 
+from script_registry import ScriptRegistry
+
 # Configuration
 APP_NAME = "Script Commander"
 VERSION = "2.0.0"
 SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "scripts")
+QUARANTINE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "quarantine")
+# Same roots as the CLI and TUI: registry IDs only stay stable if every opener indexes both
+REGISTRY_ROOTS = [(SCRIPTS_DIR, "Verified"), (QUARANTINE_DIR, "QUARANTINE")]
 MARKETPLACE_URL = "https://raw.githubusercontent.com/torresjchristopher/ScriptCommander-Scripts/main/marketplace.json"
 
 # Colors & Style
@@ -27,6 +32,10 @@ class ScriptCommanderApp(ctk.CTk):
         # Cache & Performance
         self._market_cache = None
         self._scripts_cache = {}
+        if not os.path.exists(SCRIPTS_DIR):
+            os.makedirs(SCRIPTS_DIR)
+        self.registry = ScriptRegistry(REGISTRY_ROOTS)
+        self.registry.watch(self._scripts_changed)
 
         # Window Setup
         self.title(f"{APP_NAME} v{VERSION}")
@@ -295,19 +304,24 @@ class ScriptCommanderApp(ctk.CTk):
         if not os.path.exists(SCRIPTS_DIR):
             os.makedirs(SCRIPTS_DIR)
 
-        files = [f for f in os.listdir(SCRIPTS_DIR) if f.endswith(".ps1") or f.endswith(".py")]
-        filtered_files = [f for f in files if query in f.lower()]
+        items = self.registry.items(status="Verified")
+        filtered = [item for item in items if query in item['name'].lower() or query in item['synopsis'].lower()]
         
-        if not filtered_files:
+        if not filtered:
             msg = "No scripts found." if not query else f"No scripts matching '{query}'"
             lbl = ctk.CTkLabel(self.scroll_frame, text=msg, text_color="gray")
             lbl.pack(pady=50)
             return
 
-        for script_file in filtered_files:
-            self.create_script_card(script_file)
+        for item in filtered:
+            self.create_script_card(item)
 
-    def create_script_card(self, filename):
+    def _scripts_changed(self):
+        # Called from the registry's watcher thread; redraw on the Tk thread if the library is showing
+        self.after(0, lambda: self.filter_scripts() if self.view_title.cget("text") == "My Scripts" else None)
+
+    def create_script_card(self, item):
+        filename = item['name']
         card = ctk.CTkFrame(self.scroll_frame, fg_color=CARD_BG, corner_radius=12)
         card.pack(fill="x", pady=8, padx=5)
         
@@ -318,8 +332,8 @@ class ScriptCommanderApp(ctk.CTk):
         lbl_name = ctk.CTkLabel(info, text=name, font=ctk.CTkFont(size=16, weight="bold"), anchor="w")
         lbl_name.pack(fill="x")
         
-        script_type = "PowerShell" if filename.endswith(".ps1") else "Python"
-        lbl_desc = ctk.CTkLabel(info, text=f"Local {script_type} Utility", font=ctk.CTkFont(size=12), text_color="gray", anchor="w")
+        description = item['synopsis'] or f"Local {item['language']} Utility"
+        lbl_desc = ctk.CTkLabel(info, text=description, font=ctk.CTkFont(size=12), text_color="gray", anchor="w")
         lbl_desc.pack(fill="x")
 
         btn_run = ctk.CTkButton(card, text="Execute", width=100, height=35,
@@ -333,16 +347,27 @@ class ScriptCommanderApp(ctk.CTk):
         
         def execute():
             if filename.endswith(".ps1"):
-                ps_command = f"Start-Process powershell -ArgumentList '-ExecutionPolicy Bypass -File \"{script_path}\" ' -Verb RunAs"
+                # Wait for the elevated child and pass its exit code on, so the recorded run is the script's
+                ps_command = (f"$p = Start-Process powershell -ArgumentList '-ExecutionPolicy Bypass -File \"{script_path}\" ' "
+                              "-Verb RunAs -Wait -PassThru; exit $p.ExitCode")
                 command = ["powershell", "-Command", ps_command]
             else:
                 command = [sys.executable, script_path]
 
+            from script_runner import ScriptRunner, succeeded
+            from script_stats import record_runs
             try:
-                subprocess.run(command, check=True)
-                self.after(0, lambda: self.status_label.configure(text=f"Success: {filename}", text_color=SUCCESS_COLOR))
+                result = ScriptRunner(workers=1, on_line=lambda *args: None).run(
+                    [{"name": filename, "path": script_path, "command": command}])[0]
             except Exception as e:
                 self.after(0, lambda: self.status_label.configure(text=f"Error: {str(e)}", text_color="red"))
+                return
+            record_runs([result], "gui")
+            if succeeded(result):
+                self.after(0, lambda: self.status_label.configure(text=f"Success: {filename} ({result['seconds']:.1f}s)", text_color=SUCCESS_COLOR))
+            else:
+                error = result['error'] or ("timed out" if result['timed_out'] else f"exit code {result['exit_code']}")
+                self.after(0, lambda: self.status_label.configure(text=f"Error: {filename} ({error})", text_color="red"))
 
         threading.Thread(target=execute, daemon=True).start()
 
@@ -362,11 +387,11 @@ def run_cli():
         if not os.path.exists(SCRIPTS_DIR):
             print("No scripts directory found.")
             return
-        files = [f for f in os.listdir(SCRIPTS_DIR) if f.endswith(".ps1") or f.endswith(".py")]
+        items = ScriptRegistry(REGISTRY_ROOTS).items(status="Verified")
         print(f"\n--- Local Scripts (Page {args.page}) ---")
-        for f in files[start_idx:end_idx]:
-            print(f"- {f}")
-        if len(files) > end_idx:
+        for item in items[start_idx:end_idx]:
+            print(f"{item['id']:>4}  {item['name']}" + (f"  - {item['synopsis']}" if item['synopsis'] else ""))
+        if len(items) > end_idx:
             print(f"\nUse --page {args.page + 1} to see more.")
     
     elif args.market:
@@ -0,0 +1,304 @@
+"""
+Artifact Bench - Benchmark & Regression Harness for the .nxs Pipeline.
+
+Generates synthetic context trees, runs them through pack, unpack and
+Pidgeon mesh transfer, and records throughput, peak RSS and file counts.
+Results are plain JSON so two versions can be compared; `compare()`
+flags every stage that got slower (or hungrier) than a baseline by more
+than a threshold.
+
+    python artifact_bench.py [--scale 0.1] [--baseline old.json]
+    shortcut nexus bench --baseline old.json --threshold 0.15
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import random
+import platform
+import tempfile
+import threading
+import contextlib
+from datetime import datetime
+
+import psutil
+
+from seed_codecs import DEFAULT_CODEC
+
+BENCH_VERSION = 1
+DEFAULT_THRESHOLD = 0.10
+RSS_SAMPLE_INTERVAL = 0.005
+
+# profile -> shape of the synthetic tree at scale 1.0
+PROFILES = {
+    "small_files": {"text_files": 10000, "text_size": (512, 4096), "bin_files": 0, "bin_size": (0, 0), "dirs": 200},
+    "huge_files": {"text_files": 2, "text_size": (64 << 20, 64 << 20), "bin_files": 2, "bin_size": (64 << 20, 64 << 20), "dirs": 1},
+    "mixed": {"text_files": 2000, "text_size": (1024, 64 << 10), "bin_files": 100, "bin_size": (256 << 10, 2 << 20), "dirs": 50},
+}
+
+_WORDS = ("sovereign", "nexus", "forge", "pidgeon", "bridge", "seed", "context", "artifact",
+          "def", "return", "import", "class", "self", "for", "in", "if", "else", "{", "}", "\n")
+
+
+def _text_blob(rng: random.Random, size: int) -> bytes:
+    """Compressible, source-like bytes (built from a repeated 64 KiB block)."""
+    block = " ".join(rng.choice(_WORDS) for _ in range(12000)).encode()[:64 << 10]
+    reps = size // len(block) + 1
+    return (block * reps)[:size]
+
+
+def generate_tree(root: str, profile: str, scale: float = 1.0, seed: int = 1337) -> dict:
+    """
+    Write a deterministic synthetic context for `profile` under `root`.
+    File counts scale with `scale`; huge files scale in size instead.
+    Returns {"files", "bytes"} for what was written (pruned dirs excluded).
+    """
+    shape = PROFILES[profile]
+    rng = random.Random(seed)
+    huge = profile == "huge_files"
+    n_text = shape["text_files"] if huge else max(1, int(shape["text_files"] * scale))
+    n_bin = shape["bin_files"] if huge else int(shape["bin_files"] * scale)
+    size_scale = scale if huge else 1.0
+
+    dirs = [os.path.join(root, f"pkg{i:03d}") for i in range(shape["dirs"])]
+    for d in dirs:
+        os.makedirs(d, exist_ok=True)
+
+    files = total = 0
+    for i in range(n_text):
+        size = max(1, int(rng.randint(*shape["text_size"]) * size_scale))
+        with open(os.path.join(dirs[i % len(dirs)], f"mod{i:06d}.py"), "wb") as f:
+            f.write(_text_blob(rng, size))
+        files += 1
+        total += size
+    for i in range(n_bin):
+        size = max(1, int(rng.randint(*shape["bin_size"]) * size_scale))
+        with open(os.path.join(dirs[i % len(dirs)], f"asset{i:04d}.bin"), "wb") as f:
+            f.write(rng.randbytes(size))
+        files += 1
+        total += size
+
+    if profile == "mixed":
+        # Heavy dirs the ingestion scanner must prune without walking
+        junk = os.path.join(root, "node_modules", "dep")
+        os.makedirs(junk, exist_ok=True)
+        for i in range(int(200 * scale)):
+            with open(os.path.join(junk, f"index{i}.js"), "wb") as f:
+                f.write(b"module.exports = {};\n")
+    return {"files": files, "bytes": total}
+
+
+class PeakRSS:
+    """Background sampler of this process's resident set size."""
+
+    def __init__(self, interval: float = RSS_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.peak = 0
+        self._proc = psutil.Process()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._proc.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = self._proc.memory_info().rss
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._proc.memory_info().rss)
+
+
+@contextlib.contextmanager
+def _sandboxed_home(path: str):
+    """Point ~ at `path` so transfers land in a throwaway mesh inbox."""
+    saved = {k: os.environ.get(k) for k in ("HOME", "USERPROFILE")}
+    os.environ["HOME"] = os.environ["USERPROFILE"] = path
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _measure(fn, nbytes: int, nfiles: int, quiet: bool = True) -> tuple:
+    """Run fn once under the RSS sampler. Returns (result, metrics)."""
+    sink = io.StringIO() if quiet else sys.stdout
+    with PeakRSS() as rss, contextlib.redirect_stdout(sink):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+    return result, {
+        "seconds": elapsed,
+        "bytes": nbytes,
+        "files": nfiles,
+        "mb_per_sec": nbytes / elapsed / 1e6 if elapsed else 0.0,
+        "files_per_sec": nfiles / elapsed if elapsed else 0.0,
+        "peak_rss_bytes": rss.peak,
+    }
+
+
+def _best(runs: list) -> dict:
+    """Fastest of several runs; peak RSS is the worst seen."""
+    best = dict(min(runs, key=lambda r: r["seconds"]))
+    best["peak_rss_bytes"] = max(r["peak_rss_bytes"] for r in runs)
+    return best
+
+
+def bench_profile(profile: str, scale: float = 1.0, codec: str = DEFAULT_CODEC,
+                  workers: int = None, repeat: int = 1, quiet: bool = True) -> dict:
+    """Benchmark pack -> unpack -> transfer for one synthetic profile."""
+    from artifact_packager import SovereignArtifact
+    from pidgeon import Pidgeon
+
+    with tempfile.TemporaryDirectory(prefix="nxs-bench-") as tmp:
+        context = os.path.join(tmp, profile)
+        tree = generate_tree(context, profile, scale)
+        stages = {"pack": [], "unpack": [], "transfer": []}
+
+        for run in range(repeat):
+            out_dir = os.path.join(tmp, f"run{run}")
+            os.makedirs(out_dir)
+            nxs_path, metrics = _measure(
+                lambda: SovereignArtifact().pack(context, os.path.join(out_dir, "bench.nxs"),
+                                                 codec=codec, workers=workers),
+                tree["bytes"], tree["files"], quiet)
+            manifest = SovereignArtifact(nxs_path).read_manifest()
+            metrics["artifact_bytes"] = os.path.getsize(nxs_path)
+            metrics["ratio"] = metrics["artifact_bytes"] / tree["bytes"] if tree["bytes"] else 0.0
+            stages["pack"].append(metrics)
+
+            _, metrics = _measure(
+                lambda: SovereignArtifact(nxs_path).unpack(os.path.join(out_dir, "unpacked"), workers=workers),
+                manifest["payload_bytes"], manifest["file_count"], quiet)
+            stages["unpack"].append(metrics)
+
+            with _sandboxed_home(os.path.join(tmp, f"home{run}")):
+                messenger = Pidgeon()
+                _, metrics = _measure(lambda: messenger.transfer_artifact(nxs_path, "bench-peer"),
+                                      os.path.getsize(nxs_path), 1, quiet)
+                metrics["strategy"] = messenger.last_delivery["strategy"]
+            stages["transfer"].append(metrics)
+
+        return {"tree": tree, "stages": {name: _best(runs) for name, runs in stages.items()}}
+
+
+def run_suite(profiles: list = None, scale: float = 1.0, codec: str = DEFAULT_CODEC,
+              workers: int = None, repeat: int = 1, quiet: bool = True) -> dict:
+    """Run every profile and return the JSON-ready report."""
+    report = {
+        "bench_version": BENCH_VERSION,
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "codec": codec,
+        "workers": workers,
+        "scale": scale,
+        "repeat": repeat,
+        "profiles": {},
+    }
+    for profile in profiles or list(PROFILES):
+        report["profiles"][profile] = bench_profile(profile, scale, codec, workers, repeat, quiet)
+    return report
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Stages where `current` regressed against `baseline` by more than
+    `threshold` (a fraction): lower MB/s or higher peak RSS. Only
+    profile/stage pairs present in both reports are compared.
+    """
+    regressions = []
+    for profile, result in current.get("profiles", {}).items():
+        base_stages = baseline.get("profiles", {}).get(profile, {}).get("stages", {})
+        for stage, metrics in result["stages"].items():
+            base = base_stages.get(stage)
+            if not base:
+                continue
+            if base["mb_per_sec"] and metrics["mb_per_sec"] < base["mb_per_sec"] * (1 - threshold):
+                regressions.append({"profile": profile, "stage": stage, "metric": "mb_per_sec",
+                                    "baseline": base["mb_per_sec"], "current": metrics["mb_per_sec"],
+                                    "change": metrics["mb_per_sec"] / base["mb_per_sec"] - 1})
+            if base["peak_rss_bytes"] and metrics["peak_rss_bytes"] > base["peak_rss_bytes"] * (1 + threshold):
+                regressions.append({"profile": profile, "stage": stage, "metric": "peak_rss_bytes",
+                                    "baseline": base["peak_rss_bytes"], "current": metrics["peak_rss_bytes"],
+                                    "change": metrics["peak_rss_bytes"] / base["peak_rss_bytes"] - 1})
+    return regressions
+
+
+def save_report(report: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+
+
+def load_report(path: str) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def render_report(report: dict, regressions: list = None, console=None):
+    """Print the results (and any regressions) as rich tables."""
+    from rich.console import Console
+    from rich.table import Table
+
+    console = console or Console()
+    table = Table(title=f"Artifact Bench :: codec {report['codec']}, scale {report['scale']}", border_style="blue")
+    table.add_column("Profile", style="cyan")
+    table.add_column("Stage", style="white")
+    table.add_column("Files", justify="right")
+    table.add_column("MB", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("MB/s", justify="right", style="bold green")
+    table.add_column("Files/s", justify="right", style="bold green")
+    table.add_column("Peak RSS", justify="right", style="yellow")
+    for profile, result in report["profiles"].items():
+        for stage, m in result["stages"].items():
+            table.add_row(profile, stage, f"{m['files']:,}", f"{m['bytes'] / 1e6:.1f}", f"{m['seconds']:.2f}",
+                          f"{m['mb_per_sec']:.1f}", f"{m['files_per_sec']:.0f}", f"{m['peak_rss_bytes'] / 1e6:.0f} MB")
+    console.print(table)
+
+    if regressions:
+        reg = Table(title="Regressions", border_style="red")
+        reg.add_column("Profile", style="cyan")
+        reg.add_column("Stage")
+        reg.add_column("Metric")
+        reg.add_column("Baseline", justify="right")
+        reg.add_column("Current", justify="right")
+        reg.add_column("Change", justify="right", style="bold red")
+        for r in regressions:
+            reg.add_row(r["profile"], r["stage"], r["metric"], f"{r['baseline']:,.1f}",
+                        f"{r['current']:,.1f}", f"{r['change']:+.1%}")
+        console.print(reg)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the .nxs artifact pipeline")
+    parser.add_argument("--profile", action="append", choices=list(PROFILES))
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--codec", default=DEFAULT_CODEC)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--output", default="nxs-bench.json")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    report = run_suite(args.profile, args.scale, args.codec, args.workers, args.repeat)
+    save_report(report, args.output)
+    regressions = compare(report, load_report(args.baseline), args.threshold) if args.baseline else []
+    render_report(report, regressions)
+    sys.exit(1 if regressions else 0)
@@ -7,11 +7,138 @@ These are encrypted, compressed logic-seeds that can be 'Detonated' remotely.
 
 import os
 import json
+import errno
+import shutil
+import getpass
+import fnmatch
+import hashlib
 import tarfile
 import zipfile
+import tempfile
+import contextlib
 from datetime import datetime
 from pathlib import Path
 
+from chunk_store import CHUNKS_DIR
+from context_scanner import ContextScanner
+from seed_codecs import DEFAULT_CODEC, ParallelCompressWriter, open_seed_reader, seed_member_name
+from seed_hydrator import SeedHydrator
+
+# Block size used when streaming the seed tarball into the artifact.
+SEED_BUFSIZE = 1024 * 1024
+
+# Per-file index fields recorded in every manifest.
+INDEX_KEYS = ("path", "size", "mode", "mtime", "sha256")
+
+# Already-compressed formats are stored as-is in the indexed layout.
+STORED_SUFFIXES = {'.gz', '.tgz', '.zip', '.nxs', '.zst', '.lz4', '.xz', '.bz2', '.7z',
+                   '.png', '.jpg', '.jpeg', '.gif', '.webp', '.mp3', '.mp4', '.mkv', '.whl', '.jar'}
+
+
+def _scan_context(context: Path, report: bool = False) -> list:
+    """Filtered ScanEntry list for a context; `report` prints what was skipped."""
+    scanner = ContextScanner(str(context))
+    entries = scanner.scan()
+    if report:
+        st = scanner.stats
+        print(f"[INGEST] Scanned {st['files']} files ({st['bytes'] / 1e6:.1f} MB) in {st['seconds']:.2f}s; "
+              f"skipped {st['skipped_files']} files ({st['skipped_bytes'] / 1e6:.1f} MB), "
+              f"pruned {len(st['pruned_dirs'])} dirs")
+    return entries
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(SEED_BUFSIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def state_id(files: list) -> str:
+    """Content identity of a context: hash over its sorted (path, sha256) index."""
+    digest = hashlib.sha256()
+    for entry in sorted(files, key=lambda e: e["path"]):
+        digest.update(f"{entry['path']}\0{entry['sha256']}\n".encode())
+    return digest.hexdigest()
+
+
+def _state_marker(root: Path) -> Path:
+    """Beside a hydrated root (never inside it, so it is not packed): the state it was hydrated to."""
+    return root.parent / f".{root.name}.nxs-state"
+
+
+def _record_state(root: Path, state: str):
+    if state:
+        _state_marker(root).write_text(json.dumps({"state_id": state, "recorded_at": datetime.now().isoformat()}))
+
+
+def root_states(root: Path) -> set:
+    """
+    State ids a hydrated root can claim: the recorded marker if there is
+    one, else computed over its files (with and without the scaffolded
+    forge.yml, which unpack adds outside the payload).
+    """
+    try:
+        return {json.loads(_state_marker(root).read_text())["state_id"]}
+    except (OSError, ValueError, KeyError):
+        pass
+    files = [{"path": e.rel, "sha256": _file_sha256(e.path)} for e in _scan_context(root) if e.kind == "file"]
+    return {state_id(files), state_id([f for f in files if f["path"] != "forge.yml"])}
+
+
+@contextlib.contextmanager
+def _partial_beside(path: str):
+    """
+    A uniquely named temp file in `path`'s directory to build an artifact
+    in, so concurrent packs never share one. Removed unless the caller
+    renamed it into place.
+    """
+    fd, partial = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), prefix=".tmp-", suffix=".nxs")
+    os.close(fd)
+    try:
+        yield partial
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+
+
+def _matches(rel: str, only: list) -> bool:
+    """True if rel matches any glob in `only` or lives under a listed directory."""
+    for pattern in only:
+        if fnmatch.fnmatchcase(rel, pattern) or rel.startswith(pattern.rstrip("/") + "/"):
+            return True
+    return False
+
+
+def _safe_join(root: Path, rel: str) -> Path:
+    """Resolve rel under root, refusing anything that escapes it."""
+    target = (root / rel).resolve()
+    if target != root and root not in target.parents:
+        raise ValueError(f"Refusing to write outside the artifact root: {rel}")
+    return target
+
+
+def _check_link_target(root: Path, link: Path, target: str):
+    """Refuse a symlink whose target is absolute or points outside root."""
+    resolved = Path(os.path.normpath(os.path.join(link.parent, target)))
+    if os.path.isabs(target) or (resolved != root and root not in resolved.parents):
+        raise ValueError(f"Refusing a link outside the artifact root: {link.relative_to(root)} -> {target}")
+
+
+class _HashingReader:
+    """File wrapper that hashes everything tarfile reads through it."""
+
+    def __init__(self, f):
+        self.f = f
+        self.digest = hashlib.sha256()
+
+    def read(self, size=-1):
+        data = self.f.read(size)
+        self.digest.update(data)
+        return data
+
+
 class SovereignArtifact:
     """
     The transport container for Sovereign Intelligence.
@@ -20,10 +147,18 @@ class SovereignArtifact:
     def __init__(self, artifact_path: str = None):
         self.artifact_path = artifact_path
 
-    def pack(self, context_path: str, output_path: str, metadata: dict = None) -> str:
+    def pack(self, context_path: str, output_path: str, metadata: dict = None,
+             codec: str = DEFAULT_CODEC, workers: int = None, chunk_store=None,
+             indexed: bool = False) -> str:
         """
         Compress a local context (folder/repo) into a .nxs artifact.
-        Performs smart ingestion: Sanitizes heavy dirs and detects runtime.
+        Performs smart ingestion: Sanitizes heavy dirs (plus .gitignore and
+        .nxsignore matches) and detects runtime.
+        The seed is compressed on `workers` cores (default: all) with `codec`.
+        With a `chunk_store`, files are deduplicated into the store instead
+        and the manifest lists chunk references (no seed member).
+        With `indexed`, every file is its own compressed member and the
+        manifest records its offset, so single files can be read directly.
         """
         context = Path(context_path)
         if not context.exists():
@@ -37,9 +172,18 @@ class SovereignArtifact:
             "created_at": datetime.now().isoformat(),
             "type": "context_seed",
             "runtime_detected": project_info['runtime'],
-            "entry_point": metadata.get("entry_point", project_info['entry_point']),
-            "security": "vault_zero_unsigned"
+            "entry_point": (metadata or {}).get("entry_point", project_info['entry_point']),
+            "security": "vault_zero_unsigned",
+            "packed_by": getpass.getuser()
         }
+        if chunk_store is not None:
+            meta["layout"] = "chunked"
+        elif indexed:
+            meta["layout"] = "indexed"
+        else:
+            meta["layout"] = "seed"
+            meta["codec"] = codec
+            meta["seed_member"] = seed_member_name(codec)
         if metadata:
             meta.update(metadata)
 
@@ -54,39 +198,244 @@ class SovereignArtifact:
         coded_name = f"NX-{type_code}-{checksum}-{os.path.basename(context_path)}.nxs"
         final_path = os.path.join(os.path.dirname(output_path), coded_name)
         
-        print(f"[ARTIFACT] Packing context from {context}...")
+        mode = "chunk store" if chunk_store is not None else "indexed" if indexed else f"codec: {codec}"
+        print(f"[ARTIFACT] Packing context from {context} ({mode})...")
         print(f"[NX-CODE] Generated: {coded_name}")
         print(f"[INGEST] Detected {project_info['runtime']}. Pruning heavy artifacts...")
-        
-        with zipfile.ZipFile(final_path, 'w', zipfile.ZIP_DEFLATED) as nxs:
-            # Write Manifest
-            nxs.writestr("manifest.json", json.dumps(meta, indent=2))
-            
-            # Auto-scaffold forge.yml if missing
-            if project_info['runtime'] != "forge_native":
-                scaffold = self._generate_forge_scaffold(project_info)
-                nxs.writestr("root/forge.yml", scaffold)
-                print(f"[INGEST] Auto-generated forge.yml for {project_info['runtime']}")
-
-            # Write Seed (Tarball of filtered directory)
-            tar_path = f"{context.name}.tar.gz"
-            
-            # Smart Filter
-            def filter_heavy(tarinfo):
-                name = tarinfo.name
-                if any(x in name for x in ['node_modules', 'venv', '.git', '__pycache__', '.env', 'dist', 'build']):
-                    return None # Exclude
-                return tarinfo
-
-            with tarfile.open(tar_path, "w:gz") as tar:
-                tar.add(context, arcname="root", filter=filter_heavy)
-            
-            nxs.write(tar_path, arcname="seed.tar.gz")
-            os.remove(tar_path) # Cleanup temp tar
+        entries = _scan_context(context, report=True)
+
+        # Built beside the target and renamed over it: a re-pack gets a fresh
+        # inode instead of rewriting one the mesh inbox may hardlink to.
+        # Each pack builds under its own temp name, so concurrent ships of
+        # one context never write into the same file.
+        with _partial_beside(final_path) as partial:
+            with zipfile.ZipFile(partial, 'w', zipfile.ZIP_DEFLATED) as nxs:
+                # Auto-scaffold forge.yml if missing
+                if project_info['runtime'] != "forge_native":
+                    scaffold = self._generate_forge_scaffold(project_info)
+                    nxs.writestr("root/forge.yml", scaffold)
+                    print(f"[INGEST] Auto-generated forge.yml for {project_info['runtime']}")
+
+                if chunk_store is not None:
+                    meta.update(self._pack_chunks(entries, chunk_store))
+                elif indexed:
+                    meta["files"] = self._pack_indexed(nxs, entries)
+                else:
+                    meta["files"] = self._pack_seed(nxs, context, meta, workers, entries)
+                meta["state_id"] = state_id(meta["files"])
+                meta["file_count"] = len(meta["files"])
+                meta["payload_bytes"] = sum(f["size"] for f in meta["files"])
+
+                # Write Manifest (last, so it can carry what packing produced)
+                nxs.writestr("manifest.json", json.dumps(meta, indent=2))
+            os.replace(partial, final_path)
             
         print(f"[ARTIFACT] .nxs file created at {final_path}")
         return final_path
 
+    def _pack_seed(self, nxs: zipfile.ZipFile, context: Path, meta: dict,
+                   workers: int = None, entries=None) -> list:
+        """
+        Write the filtered context (or just `entries`) as a single compressed
+        tarball member. Returns the per-file index of what was written.
+        """
+        # The tar stream is compressed block-parallel straight into the
+        # zip member, so the seed never touches disk as a temp file and
+        # memory stays bounded by the in-flight blocks. The member itself
+        # is STORED: deflating an already compressed stream only burns CPU.
+        seed_info = zipfile.ZipInfo(meta["seed_member"], date_time=datetime.now().timetuple()[:6])
+        seed_info.compress_type = zipfile.ZIP_STORED
+
+        files = []
+        with nxs.open(seed_info, "w", force_zip64=True) as seed:
+            with ParallelCompressWriter(seed, meta["codec"], workers=workers) as writer:
+                with tarfile.open(fileobj=writer, mode="w|", bufsize=SEED_BUFSIZE) as tar:
+                    tar.add(context, arcname="root", recursive=False)
+                    # Files are hashed as tarfile reads them: one pass builds
+                    # both the seed and the index.
+                    for rel, full, kind, *_ in (entries if entries is not None else _scan_context(context)):
+                        info = tar.gettarinfo(full, arcname=f"root/{rel}")
+                        # Whole-second mtimes fit the ustar header; a float
+                        # would cost an extra pax header per member to write
+                        # and parse. The index keeps the exact value.
+                        mtime, info.mtime = info.mtime, int(info.mtime)
+                        if kind != "file":
+                            tar.addfile(info)
+                            continue
+                        with open(full, "rb") as f:
+                            reader = _HashingReader(f)
+                            tar.addfile(info, reader)
+                        files.append({"path": rel, "size": info.size, "mode": info.mode,
+                                      "mtime": mtime, "sha256": reader.digest.hexdigest()})
+        return files
+
+    def _pack_indexed(self, nxs: zipfile.ZipFile, entries: list) -> list:
+        """
+        Write each file as an independently compressed `root/<path>` member.
+        Returns the file index with each member's offset and stored size.
+        """
+        files = []
+        for e in entries:
+            if e.kind != "file":
+                continue
+            rel, full = e.rel, e.path
+            info = zipfile.ZipInfo.from_file(full, arcname=f"root/{rel}")
+            if os.path.splitext(rel)[1].lower() in STORED_SUFFIXES:
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+
+            with open(full, "rb") as f, nxs.open(info, "w", force_zip64=True) as member:
+                reader = _HashingReader(f)
+                shutil.copyfileobj(reader, member, SEED_BUFSIZE)
+
+            files.append({"path": rel, "size": info.file_size, "mode": e.mode,
+                          "mtime": e.mtime, "sha256": reader.digest.hexdigest(),
+                          "offset": info.header_offset, "stored_size": info.compress_size,
+                          "method": "deflate" if info.compress_type == zipfile.ZIP_DEFLATED else "stored"})
+        return files
+
+    def _pack_chunks(self, entries: list, store) -> dict:
+        """
+        Deduplicate the filtered context into a ChunkStore.
+        Returns the manifest section describing every file by chunk refs.
+        """
+        files, dirs, links = [], [], []
+        total_bytes = new_bytes = new_chunks = 0
+
+        for e in entries:
+            if e.kind == "link":
+                links.append({"path": e.rel, "target": os.readlink(e.path)})
+            elif e.kind == "dir":
+                dirs.append(e.rel)
+            else:
+                entry = store.put_file(e.path)
+                total_bytes += entry["size"]
+                new_bytes += entry.pop("new_bytes")
+                new_chunks += entry.pop("new_chunks")
+                entry.update({"path": e.rel, "mode": e.mode, "mtime": e.mtime})
+                files.append(entry)
+
+        print(f"[CHUNKS] {len(files)} files, {total_bytes / 1e6:.1f} MB -> "
+              f"{new_chunks} new chunks ({new_bytes / 1e6:.1f} MB written to {store.root})")
+        # The store's location is the packer's business: receivers hydrate from their own store
+        return {"dirs": dirs, "links": links, "files": files}
+
+    def list_files(self, only: list = None) -> list:
+        """Per-file index of the artifact, read from the manifest alone."""
+        files = self.read_manifest().get("files", [])
+        return [f for f in files if _matches(f["path"], only)] if only else files
+
+    def read_file(self, rel: str) -> bytes:
+        """Read a single file from an indexed artifact without unpacking it."""
+        with zipfile.ZipFile(self.artifact_path, 'r') as nxs:
+            manifest = json.loads(nxs.read("manifest.json"))
+            if manifest.get("layout") != "indexed":
+                raise ValueError("Random access needs an indexed artifact (nexus pack --indexed)")
+            return nxs.read(f"root/{rel}")
+
+    def inspect(self) -> dict:
+        """
+        X-ray summary for show_manifest: manifest fields plus the forge.yml
+        task count. Never decompresses the payload.
+        """
+        with zipfile.ZipFile(self.artifact_path, 'r') as nxs:
+            manifest = json.loads(nxs.read("manifest.json"))
+            nodes = None
+            if "root/forge.yml" in nxs.namelist():
+                import yaml
+                forge = yaml.safe_load(nxs.read("root/forge.yml")) or {}
+                nodes = len(forge.get("tasks", []))
+
+        files = manifest.get("files")
+        return {
+            "type": manifest.get("type", "context_seed"),
+            "layout": manifest.get("layout", "seed"),
+            "codec": manifest.get("codec"),
+            "source": manifest.get("packed_by"),
+            "created_at": manifest.get("created_at"),
+            "runtime": manifest.get("runtime_detected", "unknown"),
+            "entry_point": manifest.get("entry_point"),
+            "security": manifest.get("security"),
+            "nodes": nodes,
+            "file_count": manifest.get("file_count", len(files) if files is not None else None),
+            "payload_bytes": manifest.get("payload_bytes", sum(f["size"] for f in files) if files is not None else None),
+            "artifact_bytes": os.path.getsize(self.artifact_path),
+            "state_id": manifest.get("state_id"),
+        }
+
+    def diff_context(self, context_path: str, base_files: list) -> dict:
+        """
+        Compare a context against a base artifact's file index.
+        Files whose size and mtime match the base are trusted without
+        re-hashing. Returns {"files": new index, "changed": [...], "removed": [...]}.
+        """
+        base = {f["path"]: f for f in base_files}
+        files, changed = [], []
+        for e in _scan_context(Path(context_path)):
+            if e.kind != "file":
+                continue
+            rel = e.rel
+            prev = base.get(rel)
+            if prev and prev["size"] == e.size and prev["mtime"] == e.mtime:
+                files.append({k: prev[k] for k in INDEX_KEYS})
+                continue
+            entry = {"path": rel, "size": e.size, "mode": e.mode,
+                     "mtime": e.mtime, "sha256": _file_sha256(e.path)}
+            if not prev or prev["sha256"] != entry["sha256"]:
+                changed.append(rel)
+            files.append(entry)
+
+        seen = {f["path"] for f in files}
+        removed = sorted(p for p in base if p not in seen)
+        return {"files": files, "changed": changed, "removed": removed}
+
+    def pack_delta(self, context_path: str, output_path: str, base_manifest: dict,
+                   codec: str = DEFAULT_CODEC, workers: int = None) -> str:
+        """
+        Pack only what changed in a context since `base_manifest` into an
+        NX-DLT artifact named by its hash. Returns None when nothing changed.
+        """
+        context = Path(context_path)
+        if not context.exists():
+            raise FileNotFoundError(f"Context not found: {context}")
+
+        base_files = base_manifest.get("files", [])
+        diff = self.diff_context(context_path, base_files)
+        if not diff["changed"] and not diff["removed"]:
+            return None
+
+        base_state = base_manifest.get("state_id") or state_id(base_files)
+        meta = {
+            "created_at": datetime.now().isoformat(),
+            "type": "context_delta",
+            "layout": "seed",
+            "codec": codec,
+            "seed_member": seed_member_name(codec),
+            "base_state": base_state,
+            "changed": diff["changed"],
+            "removed": diff["removed"],
+        }
+
+        print(f"[DELTA] {len(diff['changed'])} changed, {len(diff['removed'])} removed "
+              f"since {base_state[:12]}")
+
+        with _partial_beside(output_path) as partial:
+            with zipfile.ZipFile(partial, 'w', zipfile.ZIP_DEFLATED) as nxs:
+                entries = [(rel, str(context / rel), "file") for rel in diff["changed"]]
+                written = {f["path"]: f for f in self._pack_seed(nxs, context, meta, workers, entries)}
+                # Trust the hashes taken while packing over the ones from the scan
+                meta["files"] = [written.get(f["path"], f) for f in diff["files"]]
+                meta["state_id"] = state_id(meta["files"])
+                meta["delta_id"] = hashlib.sha256(f"{base_state}:{meta['state_id']}".encode()).hexdigest()
+                nxs.writestr("manifest.json", json.dumps(meta, indent=2))
+
+            coded_name = f"NX-DLT-{meta['delta_id'][:12].upper()}-{context.resolve().name}.nxs"
+            final_path = os.path.join(os.path.dirname(output_path), coded_name)
+            os.replace(partial, final_path)
+        print(f"[NX-CODE] Generated: {coded_name}")
+        return final_path
+
     def _analyze_context(self, path: Path) -> dict:
         """
         Heuristic scan to determine project type and entry point.
@@ -142,9 +491,22 @@ class SovereignArtifact:
         import yaml
         return yaml.dump(template)
 
-    def unpack(self, target_dir: str) -> dict:
+    def read_manifest(self) -> dict:
+        """Read the manifest without touching the payload."""
+        if not self.artifact_path or not os.path.exists(self.artifact_path):
+            raise FileNotFoundError("No artifact loaded.")
+        with zipfile.ZipFile(self.artifact_path, 'r') as nxs:
+            return json.loads(nxs.read("manifest.json"))
+
+    def unpack(self, target_dir: str, only: list = None, workers: int = None,
+               max_bytes: int = None, chunk_store=None) -> dict:
         """
         Unpack a .nxs artifact for Detonation.
+        `only` limits extraction to paths matching any of the given globs
+        (or directory prefixes); indexed artifacts read just those members.
+        Seeds are hydrated straight from the zip member with file writes
+        spread over `workers` threads. `max_bytes` caps the hydrated payload.
+        Chunked artifacts read from `chunk_store` (default: the local store).
         Returns the manifest and the path to the extracted seed.
         """
         if not self.artifact_path or not os.path.exists(self.artifact_path):
@@ -158,19 +520,113 @@ class SovereignArtifact:
         with zipfile.ZipFile(self.artifact_path, 'r') as nxs:
             # 1. Read Manifest
             manifest = json.loads(nxs.read("manifest.json"))
+            if max_bytes is not None and manifest.get("layout") in ("chunked", "indexed"):
+                wanted = sum(f["size"] for f in manifest["files"] if not only or _matches(f["path"], only))
+                if wanted > max_bytes:
+                    raise OSError(errno.ENOSPC, f"Payload of {wanted / 1e6:.1f} MB exceeds the "
+                                                f"{max_bytes / 1e6:.1f} MB hydration cap")
             
-            # 2. Extract Seed
-            nxs.extract("seed.tar.gz", dest)
-            
-            # 3. Hydrate (Untar the seed)
-            seed_path = dest / "seed.tar.gz"
-            with tarfile.open(seed_path, "r:gz") as tar:
-                tar.extractall(dest)
-            
-            # Cleanup
-            os.remove(seed_path)
+            # 2. Hydrate
+            if manifest.get("layout") == "chunked":
+                self._hydrate_chunks(manifest, dest / "root", only, chunk_store)
+            elif manifest.get("layout") == "indexed":
+                self._hydrate_indexed(nxs, manifest, dest / "root", only)
+            else:
+                # Stream the seed through its codec, no temp copy. Artifacts
+                # predating codec support carry a plain gzip seed.
+                codec = manifest.get("codec", DEFAULT_CODEC)
+                member = manifest.get("seed_member", "seed.tar.gz")
+                with nxs.open(member) as raw, open_seed_reader(raw, codec) as reader:
+                    hydrator = SeedHydrator(dest / "root", workers=workers, max_bytes=max_bytes)
+                    stats = hydrator.hydrate(reader, only=(lambda rel: _matches(rel, only)) if only else None)
+                print(f"[HYDRATE] {stats['files']} files, {stats['bytes'] / 1e6:.1f} MB in {stats['seconds']:.2f}s "
+                      f"({stats['files_per_sec']:.0f} files/s, {stats['mb_per_sec']:.1f} MB/s)")
+
+            # The scaffolded forge.yml lives outside the payload; detonation
+            # needs it next to the hydrated files.
+            scaffold = dest / "root" / "forge.yml"
+            if "root/forge.yml" in nxs.namelist() and not scaffold.exists() \
+                    and (not only or _matches("forge.yml", only)):
+                scaffold.write_bytes(nxs.read("root/forge.yml"))
+            if not only:
+                _record_state(dest / "root", manifest.get("state_id"))
             
         return {
             "manifest": manifest,
             "root_path": str(dest / "root")
         }
+
+    def _hydrate_indexed(self, nxs: zipfile.ZipFile, manifest: dict, root: Path, only: list = None):
+        """Extract the selected members of an indexed artifact."""
+        root.mkdir(parents=True, exist_ok=True)
+        root = root.resolve()
+        for entry in manifest["files"]:
+            if only and not _matches(entry["path"], only):
+                continue
+            target = _safe_join(root, entry["path"])
+            target.parent.mkdir(parents=True, exist_ok=True)
+            with nxs.open(f"root/{entry['path']}") as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, SEED_BUFSIZE)
+            os.chmod(target, entry["mode"])
+            os.utime(target, (entry["mtime"], entry["mtime"]))
+
+    def _hydrate_chunks(self, manifest: dict, root: Path, only: list = None, store=None):
+        """Rebuild a chunked context from the local chunk store."""
+        from chunk_store import ChunkStore
+        store = store or ChunkStore(CHUNKS_DIR)
+        root.mkdir(parents=True, exist_ok=True)
+        root = root.resolve()
+
+        for rel in manifest.get("dirs", []):
+            _safe_join(root, rel).mkdir(parents=True, exist_ok=True)
+        for entry in manifest.get("files", []):
+            if only and not _matches(entry["path"], only):
+                continue
+            target = _safe_join(root, entry["path"])
+            target.parent.mkdir(parents=True, exist_ok=True)
+            store.write_file(entry["chunks"], str(target))
+            os.chmod(target, entry.get("mode", 0o644))
+            os.utime(target, (entry["mtime"], entry["mtime"]))
+        for link in manifest.get("links", []):
+            target = _safe_join(root, link["path"])
+            _check_link_target(root, target, link["target"])
+            if not os.path.lexists(target):
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.symlink(link["target"], target)
+
+    def apply_delta(self, target_root: str, force: bool = False) -> dict:
+        """
+        Apply an NX-DLT artifact on top of an already-hydrated root:
+        removed files are deleted, changed files are written in place.
+        The root must be at the delta's base state (so a delta is never
+        applied twice or to the wrong base) unless `force` is set.
+        Returns the delta manifest.
+        """
+        root = Path(target_root)
+        if not root.is_dir():
+            raise FileNotFoundError(f"Delta needs a hydrated root to apply to: {root}")
+        root = root.resolve()
+
+        print(f"[ARTIFACT] Applying delta {self.artifact_path} to {root}...")
+
+        with zipfile.ZipFile(self.artifact_path, 'r') as nxs:
+            manifest = json.loads(nxs.read("manifest.json"))
+            if manifest.get("type") != "context_delta":
+                raise ValueError(f"{os.path.basename(self.artifact_path)} is not a delta artifact")
+            if not force:
+                states = root_states(root)
+                if manifest["base_state"] not in states:
+                    at = "already at its result" if manifest["state_id"] in states else f"at {min(states)[:12]}"
+                    raise ValueError(f"Root is {at}; this delta applies to {manifest['base_state'][:12]}")
+
+            for rel in manifest["removed"]:
+                target = _safe_join(root, rel)
+                if target.exists():
+                    os.remove(target)
+
+            with nxs.open(manifest["seed_member"]) as raw, open_seed_reader(raw, manifest["codec"]) as reader:
+                SeedHydrator(root).hydrate(reader)
+
+        _record_state(root, manifest["state_id"])
+        print(f"[DELTA] {len(manifest['changed'])} written, {len(manifest['removed'])} removed")
+        return manifest
@@ -8,31 +8,112 @@ The sequence:
 
 import os
 import sys
+import json
 from rich.console import Console
 from rich.panel import Panel
 from artifact_packager import SovereignArtifact
+from local_db import connect, migrate, transaction
 from pidgeon import Pidgeon
 
 console = Console()
 
+# Last shipped state per (source, recipient), the base for delta shipments.
+SHIPMENTS_PATH = os.path.expanduser("~/.shortcut/bridge/shipments.db")
+# Where earlier versions kept it; imported once into the database.
+LEGACY_SHIPMENTS_PATH = os.path.expanduser("~/.shortcut/bridge/shipments.json")
+
+_MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS shipments (
+        key TEXT PRIMARY KEY,
+        shipped_at TEXT NOT NULL,
+        state_id TEXT NOT NULL,
+        files TEXT NOT NULL
+    )
+    """,
+]
+
+
+def _open_shipments():
+    """
+    The shipments database. Concurrent ships record through it, so each
+    upsert is atomic instead of a read-modify-write of a shared file.
+    """
+    conn = connect(SHIPMENTS_PATH)
+    migrate(conn, _MIGRATIONS)
+    if os.path.exists(LEGACY_SHIPMENTS_PATH):
+        with transaction(conn):
+            try:
+                with open(LEGACY_SHIPMENTS_PATH, 'r') as f:
+                    legacy = json.load(f)
+                os.replace(LEGACY_SHIPMENTS_PATH, LEGACY_SHIPMENTS_PATH + ".imported")
+            except FileNotFoundError:
+                legacy = {}  # another ship imported it first
+            conn.executemany("INSERT OR IGNORE INTO shipments (key, shipped_at, state_id, files) VALUES (?, ?, ?, ?)",
+                             [(key, s["shipped_at"], s["state_id"], json.dumps(s["files"])) for key, s in legacy.items()])
+    return conn
+
+
 class BridgeEngine:
     def __init__(self):
         # Nexus and Bridge are already 'Started' by the CLI entry point
         self.packager = SovereignArtifact()
         self.messenger = Pidgeon()
 
-    def ship_workflow(self, source_path: str, recipient: str):
+    def _load_shipments(self) -> dict:
+        conn = _open_shipments()
+        try:
+            return {row["key"]: {"shipped_at": row["shipped_at"], "state_id": row["state_id"],
+                                 "files": json.loads(row["files"])}
+                    for row in conn.execute("SELECT * FROM shipments")}
+        finally:
+            conn.close()
+
+    def _record_shipment(self, source_path: str, recipient: str, manifest: dict):
+        conn = _open_shipments()
+        try:
+            conn.execute("INSERT OR REPLACE INTO shipments (key, shipped_at, state_id, files) VALUES (?, ?, ?, ?)",
+                         (f"{os.path.abspath(source_path)}|{recipient}", manifest["created_at"],
+                          manifest["state_id"], json.dumps(manifest["files"])))
+        finally:
+            conn.close()
+
+    def ship_workflow(self, source_path: str, recipient: str, dedup: bool = False, full: bool = False,
+                      peer: str = None, output_dir: str = None, spool=None):
         """
         The 'Ship' command initiates the refined priming sequence.
+        With `dedup`, only chunks new to the local chunk store are written.
+        Once a recipient holds a base, only an NX-DLT delta is shipped
+        unless `full` is set. With `peer`, the artifact is streamed to that
+        mesh daemon instead of the local inbox. The artifact is written to
+        `output_dir` (default: the working directory). With an
+        OutboundSpool as `spool`, the recipient notification is queued as
+        its own job rather than sent inline.
         """
         console.print(Panel(f"[bold blue]BRIDGE SHIPMENT[/bold blue] :: Initiating Native Context Transfer", border_style="blue"))
         
         # 1. PRIME FORGE: Prepare the Compactor
         console.print("[dim][PRIME] Forge Engine: Initializing Ingestion Compactor...[/dim]")
         try:
-            artifact_name = f"{os.path.basename(source_path)}.nxs"
-            # Forge Ingests the path into a clean .nxs seed
-            nxs_path = self.packager.pack(source_path, artifact_name)
+            artifact_name = os.path.join(output_dir or "", f"{os.path.basename(os.path.abspath(source_path))}.nxs")
+            base = None
+            if not (full or dedup):
+                base = self._load_shipments().get(f"{os.path.abspath(source_path)}|{recipient}")
+
+            if base:
+                # Forge diffs against what the recipient already holds
+                nxs_path = self.packager.pack_delta(source_path, artifact_name, base)
+                if nxs_path is None:
+                    console.print(f"[green]✓ Forge: No changes since last shipment to {recipient}[/green]")
+                    return True
+            else:
+                # Forge Ingests the path into a clean .nxs seed
+                store = None
+                if dedup:
+                    from chunk_store import ChunkStore
+                    store = ChunkStore()
+                nxs_path = self.packager.pack(source_path, artifact_name, chunk_store=store)
+            artifact_name = os.path.basename(nxs_path)
             console.print(f"[green]✓ Forge: Context Ingested into {artifact_name}[/green]")
         except Exception as e:
             console.print(f"[bold red]Priming Error (Forge): {e}[/bold red]")
@@ -43,12 +124,16 @@ class BridgeEngine:
         try:
             # Pidgeon doesn't 'send an attachment' - it 'references' or 'copies' natively
             # This negates web-based transfers for local work
-            success = self.messenger.transfer_artifact(nxs_path, recipient)
+            success = self.messenger.transfer_artifact(nxs_path, recipient, peer=peer)
             
             if success:
+                self._record_shipment(source_path, recipient, SovereignArtifact(nxs_path).read_manifest())
                 message = f"REFERENCE_PIDGEON_CONTEXT::{artifact_name}"
-                self.messenger.send_pidgeon(recipient, "NATIVE_CONTEXT_PULL", message)
-                console.print(f"[bold green]BRIDGE[/bold blue] :: Context is now NATIVELY AVAILABLE to {recipient}")
+                if spool is not None:
+                    spool.enqueue("pidgeon", {"to": recipient, "subject": "NATIVE_CONTEXT_PULL", "body": message})
+                else:
+                    self.messenger.send_pidgeon(recipient, "NATIVE_CONTEXT_PULL", message)
+                console.print(f"[bold green]BRIDGE[/bold green] :: Context is now NATIVELY AVAILABLE to {recipient}")
                 console.print("[dim]Recipient can now pull, inspect, or detonate the reference.[/dim]")
         except Exception as e:
             console.print(f"[bold red]Priming Error (Pidgeon): {e}[/bold red]")
@@ -62,11 +147,15 @@ class BridgeEngine:
         """
         console.print(f"[bold blue]BRIDGE PULL[/bold blue] :: Fetching native reference: {artifact_ref}")
         
-        # Simulation: Pidgeon 'pulls' the referenced file from the mesh inbox
-        mesh_dir = os.path.expanduser("~/.shortcut/mesh_inbox")
-        artifact_path = os.path.join(mesh_dir, artifact_ref)
+        # Pidgeon 'pulls' the referenced file via the mesh inbox index
+        # (by name, inbox id or content hash prefix)
+        from mesh_inbox import MeshInbox
+        inbox = MeshInbox()
+        item = inbox.find(artifact_ref)
+        artifact_path = item["path"] if item else None
         
-        if os.path.exists(artifact_path):
+        if artifact_path and os.path.exists(artifact_path):
+            inbox.mark_read(item["id"])
             self.show_manifest(artifact_path)
             if console.input("\n[bold yellow]Detonate this context? (y/n): [/bold yellow]").lower() == 'y':
                 from forge_integration import launch_forge_command
@@ -83,11 +172,24 @@ class BridgeEngine:
         table.add_column("Property", style="dim")
         table.add_column("Value", style="white")
         
-        table.add_row("Source", "torresjchristopher")
-        table.add_row("Runtime", "Python 3.11")
-        table.add_row("Security", "VaultZero Signed (Verified)")
-        table.add_row("Nodes", "3 Recursive Nodes")
-        table.add_row("Payload", "12.4 MB")
+        # Manifest + file index only: the payload is never decompressed
+        info = SovereignArtifact(artifact_path).inspect()
+        unknown = "[dim]unknown (legacy artifact)[/dim]"
+
+        table.add_row("Source", info["source"] or unknown)
+        table.add_row("Packed", info["created_at"] or unknown)
+        table.add_row("Type", f"{info['type']} ({info['layout']}{', ' + info['codec'] if info['codec'] else ''})")
+        table.add_row("Runtime", info["runtime"])
+        table.add_row("Entry Point", str(info["entry_point"]))
+        table.add_row("Security", info["security"] or unknown)
+        table.add_row("Nodes", f"{info['nodes']} Recursive Nodes" if info["nodes"] is not None else unknown)
+        table.add_row("Files", str(info["file_count"]) if info["file_count"] is not None else unknown)
+        if info["payload_bytes"] is not None:
+            table.add_row("Payload", f"{info['payload_bytes'] / 1e6:.1f} MB ({info['artifact_bytes'] / 1e6:.1f} MB packed)")
+        else:
+            table.add_row("Payload", f"{info['artifact_bytes'] / 1e6:.1f} MB packed")
+        if info["state_id"]:
+            table.add_row("State", info["state_id"][:12])
         
         console.print(table)
         console.print("[dim]Scan Complete: No forensic trace detected.[/dim]")
@@ -95,11 +197,36 @@ class BridgeEngine:
     def sync_context(self, path: str):
         """
         Ambiently monitor a local path and prepare it for the Pidgeon mesh.
-        This is the 'Always-Ready' logistics mode.
+        This is the 'Always-Ready' logistics mode: reports, per recipient,
+        the delta the next shipment of `path` would carry.
         """
         console.print(f"[bold blue]BRIDGE SYNC[/bold blue] :: Monitoring {path}...")
         console.print("[dim][LOGISTICS] Tracking delta changes for ambient shipment.[/dim]")
-        # In a real impl, this would start a watchdog observer
+
+        prefix = f"{os.path.abspath(path)}|"
+        pending = {}
+        for key, base in self._load_shipments().items():
+            if not key.startswith(prefix):
+                continue
+            recipient = key[len(prefix):]
+            diff = self.packager.diff_context(path, base["files"])
+            pending[recipient] = diff
+            console.print(f"  {recipient}: [yellow]{len(diff['changed'])} changed[/yellow], "
+                          f"[red]{len(diff['removed'])} removed[/red] since {base['shipped_at']}")
+
+        if not pending:
+            console.print("[dim]Not shipped yet. The next 'bridge ship' sends the full context.[/dim]")
+        return pending
+
+    def apply_delta(self, artifact_path: str, root_path: str, force: bool = False):
+        """Receiving end of a delta shipment: patch an already-hydrated root."""
+        console.print(f"[bold blue]BRIDGE APPLY[/bold blue] :: {os.path.basename(artifact_path)} -> {root_path}")
+        try:
+            manifest = SovereignArtifact(artifact_path).apply_delta(root_path, force=force)
+        except Exception as e:
+            console.print(f"[bold red]Apply Error: {e}[/bold red]")
+            return False
+        console.print(f"[green]✓ Root now at state {manifest['state_id'][:12]}[/green]")
         return True
 
     def follow_peer(self, peer_id: str):
@@ -0,0 +1,196 @@
+"""
+Chunk Store - Content-Addressed Deduplication for .nxs Artifacts.
+
+Files are split at content-defined boundaries (a Gear rolling hash, as in
+FastCDC) so an edit only disturbs the chunks around it. Each chunk is
+stored once under ~/.shortcut/chunks, keyed by the SHA-256 of its bytes.
+Repacking a lightly changed context therefore only writes the new chunks.
+
+Chunking runs in pure Python at a few MB/s, so the store also remembers
+how each file it has seen was chunked, keyed by path, size and mtime.
+A file that has not changed since the last pack reuses that chunk list
+and is not read again.
+"""
+
+import os
+import json
+import zlib
+import sqlite3
+import hashlib
+import tempfile
+
+from local_db import connect, migrate
+
+CHUNKS_DIR = os.path.expanduser("~/.shortcut/chunks")
+
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024
+# 16 boundary bits -> ~64 KiB average chunk past the minimum. The mask sits
+# in the high bits because the low bits of a Gear hash only see the last
+# few bytes of the window.
+BOUNDARY_MASK = 0xFFFF << 48
+_MASK64 = (1 << 64) - 1
+
+_MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS files (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        sha256 TEXT NOT NULL,
+        chunks TEXT NOT NULL
+    )
+    """,
+]
+
+# Deterministic per-byte table: boundaries must agree across machines.
+_GEAR = [int.from_bytes(hashlib.sha256(bytes([i])).digest()[:8], "big") for i in range(256)]
+
+
+def cut_point(buf, length: int) -> int:
+    """Return the length of the first chunk in buf[:length]."""
+    if length <= MIN_CHUNK:
+        return length
+    limit = min(length, MAX_CHUNK)
+    gear = _GEAR
+    h = 0
+    for i in range(MIN_CHUNK, limit):
+        h = ((h << 1) + gear[buf[i]]) & _MASK64
+        if not h & BOUNDARY_MASK:
+            return i + 1
+    return limit
+
+
+def iter_chunks(fileobj):
+    """Yield content-defined chunks from a binary file object."""
+    buf = bytearray()
+    eof = False
+    while True:
+        while not eof and len(buf) < MAX_CHUNK:
+            data = fileobj.read(MAX_CHUNK)
+            if not data:
+                eof = True
+            buf += data
+        if not buf:
+            return
+        n = cut_point(buf, len(buf))
+        yield bytes(buf[:n])
+        del buf[:n]
+
+
+class ChunkStore:
+    """
+    On-disk store of zlib-compressed chunks addressed by SHA-256.
+    Layout: <root>/<id[:2]>/<id>. Writes are atomic, so concurrent packers
+    can share one store.
+    """
+
+    def __init__(self, root: str = CHUNKS_DIR):
+        self.root = root
+        if not os.path.exists(self.root):
+            os.makedirs(self.root)
+        self._index = None
+
+    def _file_index(self):
+        """Per-file chunking cache (files.db in the store); None if it cannot be opened."""
+        if self._index is None:
+            try:
+                self._index = connect(os.path.join(self.root, "files.db"))
+                migrate(self._index, _MIGRATIONS)
+            except sqlite3.Error:
+                self._index = False
+        return self._index or None
+
+    def _cached(self, path: str, st) -> dict:
+        index = self._file_index()
+        if index is None:
+            return None
+        row = index.execute("SELECT * FROM files WHERE path = ? AND size = ? AND mtime_ns = ?",
+                            (path, st.st_size, st.st_mtime_ns)).fetchone()
+        if row is None:
+            return None
+        chunks = json.loads(row["chunks"])
+        # Chunks may have been pruned from the store since; then the file is re-chunked
+        if not all(self.has(chunk_id) for chunk_id in chunks):
+            return None
+        return {"sha256": row["sha256"], "size": row["size"], "chunks": chunks, "new_chunks": 0, "new_bytes": 0}
+
+    def _remember(self, path: str, st, entry: dict):
+        index = self._file_index()
+        if index is None:
+            return
+        try:
+            index.execute("INSERT OR REPLACE INTO files (path, size, mtime_ns, sha256, chunks) VALUES (?, ?, ?, ?, ?)",
+                          (path, st.st_size, st.st_mtime_ns, entry["sha256"], json.dumps(entry["chunks"])))
+        except sqlite3.Error:
+            pass
+
+    def _path(self, chunk_id: str) -> str:
+        return os.path.join(self.root, chunk_id[:2], chunk_id)
+
+    def has(self, chunk_id: str) -> bool:
+        return os.path.exists(self._path(chunk_id))
+
+    def put(self, data: bytes) -> tuple:
+        """Store a chunk. Returns (chunk_id, is_new)."""
+        chunk_id = hashlib.sha256(data).hexdigest()
+        path = self._path(chunk_id)
+        if os.path.exists(path):
+            return chunk_id, False
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(zlib.compress(data, 6))
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp): os.remove(tmp)
+            raise
+        return chunk_id, True
+
+    def get(self, chunk_id: str) -> bytes:
+        """Read and verify a chunk."""
+        path = self._path(chunk_id)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Chunk {chunk_id[:12]} missing from store {self.root}")
+        with open(path, "rb") as f:
+            data = zlib.decompress(f.read())
+        if hashlib.sha256(data).hexdigest() != chunk_id:
+            raise ValueError(f"Chunk {chunk_id[:12]} is corrupt (hash mismatch)")
+        return data
+
+    def put_file(self, path: str) -> dict:
+        """
+        Chunk and store a file, reusing the previous chunking when the
+        file's size and mtime are unchanged.
+        Returns {"sha256", "size", "chunks", "new_chunks", "new_bytes"}.
+        """
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        cached = self._cached(path, st)
+        if cached is not None:
+            return cached
+        digest = hashlib.sha256()
+        chunks, size, new_chunks, new_bytes = [], 0, 0, 0
+        with open(path, "rb") as f:
+            for data in iter_chunks(f):
+                digest.update(data)
+                size += len(data)
+                chunk_id, is_new = self.put(data)
+                chunks.append(chunk_id)
+                if is_new:
+                    new_chunks += 1
+                    new_bytes += len(data)
+        entry = {"sha256": digest.hexdigest(), "size": size, "chunks": chunks,
+                 "new_chunks": new_chunks, "new_bytes": new_bytes}
+        # Only cache a file that did not change while it was being read
+        if size == st.st_size and os.stat(path).st_mtime_ns == st.st_mtime_ns:
+            self._remember(path, st, entry)
+        return entry
+
+    def write_file(self, chunks: list, dest: str):
+        """Reassemble a file from its chunk references."""
+        with open(dest, "wb") as f:
+            for chunk_id in chunks:
+                f.write(self.get(chunk_id))
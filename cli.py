@@ -1,6 +1,5 @@
 import os
 import sys
-import subprocess
 import requests
 import click
 from rich.console import Console
@@ -43,25 +42,225 @@ def pidgeon():
     """Email and contact management from the command line."""
     pass
 
+def _complete_recipient(ctx, param, incomplete):
+    """Shell completion for recipients, ranked by the contact index."""
+    from click.shell_completion import CompletionItem
+    return [CompletionItem(c['email'], help=c['name']) for c in Pidgeon().get_contacts(incomplete, 10)]
+
 @pidgeon.command(name='send')
-@click.argument('to')
-@click.option('--subject', '-s', required=True)
-@click.option('--body', '-b', required=True)
-def pidgeon_send(to, subject, body):
-    """Send a Pidgeon (email)."""
+@click.argument('to', required=False, shell_complete=_complete_recipient)
+@click.option('--subject', '-s')
+@click.option('--body', '-b')
+@click.option('--batch', type=click.Path(exists=True, dir_okay=False), help='JSONL file of {"to", "subject", "body"} messages')
+@click.option('--pool', type=int, default=4, show_default=True, help='SMTP connections for --batch')
+@click.option('--queue', 'queued', is_flag=True, help='Spool the message(s) for the background worker and return')
+def pidgeon_send(to, subject, body, batch, pool, queued):
+    """Send a Pidgeon (email), or a whole batch of them."""
+    import json
+    if batch:
+        with open(batch, 'r') as f:
+            messages = [json.loads(line) for line in f if line.strip()]
+    elif to and subject is not None and body is not None:
+        messages = [{"to": to, "subject": subject, "body": body}]
+    else:
+        raise click.UsageError("TO, --subject and --body are required unless --batch is given.")
+
+    if queued:
+        from outbound_spool import OutboundSpool, ensure_background_worker
+        spool = OutboundSpool()
+        for m in messages:
+            spool.enqueue("pidgeon", {"to": m["to"], "subject": m.get("subject", ""), "body": m.get("body", "")})
+        ensure_background_worker(spool)
+        console.print(f"[bold green]✓ {len(messages)} Pidgeon(s) queued.[/bold green] [dim]See 'pidgeon queue status'.[/dim]")
+        return
+
+    p = Pidgeon()
+    if not batch:
+        p.send_pidgeon(to, subject, body)
+        return
+
+    from pidgeon_mailer import PidgeonMailer
+    with console.status(f"[bold cyan]Sending {len(messages)} Pidgeons...[/bold cyan]"), \
+            PidgeonMailer(pool_size=pool) as mailer:
+        results = p.send_batch(messages, mailer=mailer)
+    failed = [r for r in results if r['status'] != 'sent']
+    console.print(f"[bold green]✓ {len(results) - len(failed)} sent[/bold green], "
+                  f"[bold red]{len(failed)} failed[/bold red] over {mailer.pool.connects} connection(s).")
+    if failed:
+        table = Table(title="Failed", border_style="red")
+        table.add_column("To", style="cyan")
+        table.add_column("Attempts", justify="right")
+        table.add_column("Error", style="red")
+        for r in failed:
+            table.add_row(r['recipient'], str(r['attempts']), r['error'] or "")
+        console.print(table)
+
+@pidgeon.command(name='daemon')
+@click.option('--host', default='127.0.0.1', show_default=True, help='Address to listen on')
+@click.option('--port', type=int, default=47470, show_default=True, help='Mesh transport port')
+@click.option('--inbox', default=None, help='Inbox directory (default: ~/.shortcut/mesh_inbox)')
+def pidgeon_daemon(host, port, inbox):
+    """Run the mesh transport daemon that receives artifacts from peers."""
+    from mesh_transport import MeshDaemon, MESH_INBOX
+    from mesh_inbox import MeshInbox
+    index = MeshInbox(inbox or MESH_INBOX)
+    daemon = MeshDaemon(index.inbox_dir, host, port, on_receive=lambda path, offer: index.record(
+        path, offer.get("sender"), offer.get("recipient"), offer["sha256"], "mesh"))
+    from mesh_auth import MESH_KEY_PATH
+    console.print(f"[bold cyan]MESH[/bold cyan] :: Listening on {host}:{port} -> {daemon.inbox}")
+    console.print(f"[dim]Senders need the mesh key: copy {MESH_KEY_PATH} to their machine.[/dim]")
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        console.print(f"[dim]Mesh daemon stopped. {daemon.stats['transfers']} transfers, "
+                      f"{daemon.stats['bytes'] / 1e6:.1f} MB received.[/dim]")
+
+@pidgeon.command(name='inbox')
+@click.option('--unread', is_flag=True, help='Only artifacts not yet pulled')
+@click.option('--sender', default=None, help='Only artifacts from this sender')
+@click.option('--limit', '-n', type=int, default=50, show_default=True)
+@click.option('--rescan', is_flag=True, help='Reconcile the index with the inbox directory first')
+def pidgeon_inbox(unread, sender, limit, rescan):
+    """List artifacts delivered to the mesh inbox."""
+    from datetime import datetime
+    from mesh_inbox import MeshInbox
+    inbox = MeshInbox()
+    if rescan:
+        changes = inbox.rescan()
+        console.print(f"[dim]Rescan: {changes['added']} added, {changes['removed']} removed, "
+                      f"{changes['duplicates']} duplicate copies skipped.[/dim]")
+    items = inbox.list(unread=unread, sender=sender, limit=limit)
+    table = Table(title=f"Mesh Inbox ({inbox.unread_count()} unread)", border_style="cyan")
+    table.add_column("ID", justify="right", style="dim")
+    table.add_column("Artifact", style="white")
+    table.add_column("From", style="cyan")
+    table.add_column("Ghost", style="magenta")
+    table.add_column("Size", justify="right")
+    table.add_column("Arrived", style="dim")
+    table.add_column("SHA-256", style="dim")
+    for item in items:
+        name = item['name'] if item['read'] else f"[bold]{item['name']}[/bold]"
+        if item['deliveries'] > 1:
+            name += f" [dim]x{item['deliveries']}[/dim]"
+        table.add_row(str(item['id']), name, item['sender'] or "-", item['ghost'] or "-",
+                      f"{item['size'] / 1e6:.1f} MB", datetime.fromtimestamp(item['arrived_at']).strftime("%Y-%m-%d %H:%M"),
+                      item['sha256'][:12])
+    console.print(table)
+
+@pidgeon.group(name='queue')
+def pidgeon_queue():
+    """Outbound spool for queued Pidgeons and Bridge shipments."""
+    pass
+
+@pidgeon_queue.command(name='status')
+def pidgeon_queue_status():
+    """Show spool depth, delivery rates and recent failures."""
+    from outbound_spool import OutboundSpool
+    status = OutboundSpool().status()
+    table = Table(title="Outbound Spool", box=None)
+    table.add_column("Metric", style="dim")
+    table.add_column("Value", style="white")
+    table.add_row("Queued", str(status['queued']))
+    table.add_row("In flight", str(status['leased']))
+    table.add_row("Done", str(status['done']))
+    table.add_row("Failed", f"[red]{status['failed']}[/red]" if status['failed'] else "0")
+    age = status['oldest_pending_age']
+    table.add_row("Oldest pending", f"{age:.0f}s" if age is not None else "-")
+    table.add_row("Rate", f"{status['done_last_minute']}/min, {status['done_last_hour']}/h")
+    if status['avg_latency'] is not None:
+        table.add_row("Avg latency", f"{status['avg_latency']:.1f}s (enqueue to done, last hour)")
+    table.add_row("Workers", ", ".join(w['name'] for w in status['workers']) or "[yellow]none running[/yellow]")
+    console.print(table)
+
+    if status['recent_failures']:
+        failures = Table(title="Recent Failures", border_style="red")
+        failures.add_column("Job", justify="right", style="dim")
+        failures.add_column("Kind", style="cyan")
+        failures.add_column("State")
+        failures.add_column("Attempts", justify="right")
+        failures.add_column("Error", style="red")
+        for f in status['recent_failures']:
+            failures.add_row(str(f['id']), f['kind'], f['state'], str(f['attempts']), f['last_error'])
+        console.print(failures)
+
+@pidgeon_queue.command(name='work')
+@click.option('--concurrency', '-j', type=int, default=4, show_default=True, help='Jobs run in parallel')
+@click.option('--until-empty', is_flag=True, help='Exit once the spool is drained')
+def pidgeon_queue_work(concurrency, until_empty):
+    """Run a spool worker in the foreground."""
+    from outbound_spool import OutboundSpool, SpoolWorker
+    console.print(f"[bold cyan]SPOOL[/bold cyan] :: Draining with {concurrency} worker(s)...")
+    try:
+        stats = SpoolWorker(OutboundSpool(), concurrency).run(until_empty=until_empty)
+    except KeyboardInterrupt:
+        return
+    console.print(f"[dim]{stats['done']} done, {stats['retried']} retried, {stats['failed']} failed.[/dim]")
+
+@pidgeon_queue.command(name='retry')
+def pidgeon_queue_retry():
+    """Requeue every failed job."""
+    from outbound_spool import OutboundSpool, ensure_background_worker
+    spool = OutboundSpool()
+    count = spool.retry_failed()
+    if count:
+        ensure_background_worker(spool)
+    console.print(f"[green]✓ {count} job(s) requeued.[/green]")
+
+def _parse_since(value: str) -> float:
+    """'30m', '12h', '7d', '2w' ago, or an ISO date/time."""
+    import re
+    import time
+    from datetime import datetime
+    match = re.fullmatch(r"(\d+)\s*([mhdw])", value.strip().lower())
+    if match:
+        return time.time() - int(match.group(1)) * {"m": 60, "h": 3600, "d": 86400, "w": 604800}[match.group(2)]
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        raise click.BadParameter(f"'{value}' is neither a duration like 7d nor an ISO date.", param_hint="--since")
+
+@pidgeon.command(name='history')
+@click.option('--since', default=None, help="Only messages newer than this (7d, 12h, or 2024-05-01)")
+@click.option('--grep', '-g', default=None, help="Full-text search; every word must match, 'word*' matches a prefix")
+@click.option('--page', '-p', type=click.IntRange(min=1), default=1, show_default=True)
+@click.option('--limit', '-n', type=int, default=20, show_default=True, help='Messages per page')
+def pidgeon_history(since, grep, page, limit):
+    """Browse and search sent messages, newest first."""
+    from datetime import datetime
     p = Pidgeon()
-    p.send_pidgeon(to, subject, body)
+    messages = p.get_history(grep=grep, since=_parse_since(since) if since else None, page=page, limit=limit)
+    table = Table(title=f"Message History (page {page})", border_style="cyan")
+    table.add_column("ID", justify="right", style="dim")
+    table.add_column("Sent", style="dim")
+    table.add_column("To", style="cyan")
+    table.add_column("Subject", style="white")
+    table.add_column("Status")
+    for m in messages:
+        status = "[green]sent[/green]" if m['status'] == 'sent' else f"[red]{m['status']}[/red]"
+        table.add_row(str(m['id']), datetime.fromtimestamp(m['sent_at']).strftime("%Y-%m-%d %H:%M"),
+                      m['recipient'], m['subject'], status)
+    console.print(table)
+    if len(messages) == limit:
+        console.print(f"[dim]Older messages: --page {page + 1}[/dim]")
+    elif not messages:
+        console.print("[dim]No messages.[/dim]")
 
 @pidgeon.command(name='contacts')
-def pidgeon_contacts():
-    """List recent contacts."""
+@click.argument('query', required=False)
+@click.option('--limit', '-n', type=int, default=20, show_default=True)
+def pidgeon_contacts(query, limit):
+    """List recent contacts, or the best matches for QUERY."""
+    from datetime import datetime
     p = Pidgeon()
-    contacts = p.get_contacts()
-    table = Table(title="Recent Contacts")
+    contacts = p.get_contacts(query, limit)
+    table = Table(title=f"Contacts matching '{query}'" if query else "Recent Contacts")
     table.add_column("Name", style="cyan")
     table.add_column("Email", style="green")
+    table.add_column("Sent", justify="right", style="dim")
+    table.add_column("Last Used", style="dim")
     for c in contacts:
-        table.add_row(c['name'], c['email'])
+        last = datetime.fromtimestamp(c['last_used']).strftime("%Y-%m-%d") if c['last_used'] else "-"
+        table.add_row(c['name'], c['email'], str(c['use_count']), last)
     console.print(table)
 
 
@@ -77,15 +276,74 @@ def connect():
 @connect.command(name='peers')
 def connect_peers():
     """Discover online peers."""
+    import time
     c = Connect()
     peers = c.get_online_peers()
     table = Table(title="Online Nexus Users")
     table.add_column("User", style="bold cyan")
     table.add_column("Status", style="yellow")
     table.add_column("IP", style="dim")
+    table.add_column("Seen", justify="right", style="dim")
     for p in peers:
-        table.add_row(p['username'], p['status'], p['ip'])
+        table.add_row(p['username'], p['status'], f"{p['ip']}:{p['port']}" if p['port'] else p['ip'],
+                      f"{time.time() - p['last_seen']:.0f}s ago")
     console.print(table)
+    if not peers:
+        console.print("[dim]No peers seen recently. Is 'connect daemon' running?[/dim]")
+
+@connect.command(name='daemon')
+@click.option('--status', default='Idle', show_default=True, help='What peers see you working on')
+@click.option('--interface', default='0.0.0.0', show_default=True, help='Local address to announce on (127.0.0.1 for loopback)')
+@click.option('--port', type=int, default=47472, show_default=True, help='Peer session port')
+def connect_daemon(status, interface, port):
+    """Announce yourself, track peers, and hold peer sessions."""
+    import asyncio
+    from peer_discovery import PeerDiscovery, node_id
+    from peer_session import SessionServer, SessionPool, LocalAgent, record_message
+    from session_sync import SyncService
+
+    def on_message(message, peer):
+        record_message(message, peer)
+        console.print(f"[magenta][{message.get('from')} -> You]:[/magenta] {message.get('text')}")
+
+    async def serve():
+        hello = {"node": node_id()}
+        pool = SessionPool(hello)
+        discovery = None
+
+        def resolve(peer):
+            for p in discovery.peers():
+                if peer in (p["username"], p["node"]) and p["port"]:
+                    return p["ip"], p["port"]
+            return None
+
+        sync = SyncService(pool, hello["node"], resolve)
+        server = SessionServer(port=port, on_message=on_message, handlers={"sync": sync.serve_stream}, hello=hello)
+        agent = LocalAgent(pool, ops={"share": sync.share, "unshare": sync.unshare})
+        discovery = PeerDiscovery(status=status, interface=interface, port=await server.start(), node=hello["node"])
+        await agent.start()
+        discovery.start()
+        await sync.start()
+        console.print(f"[bold cyan]CONNECT[/bold cyan] :: {discovery.username} announced on "
+                      f"{discovery.group}:{discovery.discovery_port} ({interface}), sessions on :{server.port}")
+        from mesh_auth import MESH_KEY_PATH
+        console.print(f"[dim]Peers need the same mesh key: copy {MESH_KEY_PATH} to their machine.[/dim]")
+        for name, session in sync.sessions.items():
+            console.print(f"[dim]Syncing {name}: {session.root} with {', '.join(session.peers)}[/dim]")
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await sync.stop()
+            discovery.stop()
+            await agent.stop()
+            await server.stop()
+            console.print(f"[dim]Connect daemon stopped. {server.stats['sessions']} session(s), "
+                          f"{server.stats['messages']} message(s) received.[/dim]")
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
 
 @connect.command(name='msg')
 @click.argument('user')
@@ -95,6 +353,45 @@ def connect_msg(user, text):
     c = Connect()
     c.send_message(user, text)
 
+@connect.command(name='share')
+@click.argument('name')
+@click.argument('path', default='.', type=click.Path(exists=True, file_okay=False))
+@click.option('--with', 'peers', multiple=True, required=True, help='Peer username to sync with (repeatable)')
+def connect_share(name, path, peers):
+    """Live-sync a directory with peers as session NAME."""
+    Connect().share_workspace(name, path, peers)
+
+@connect.command(name='unshare')
+@click.argument('name')
+def connect_unshare(name):
+    """Stop syncing session NAME (files are left in place)."""
+    if Connect().unshare_workspace(name):
+        console.print(f"[dim]Stopped syncing {name}.[/dim]")
+
+@connect.command(name='sessions')
+def connect_sessions():
+    """Shared workspaces and their merge state."""
+    import time
+    sessions = Connect().get_active_sessions()
+    table = Table(title="Connect Sessions")
+    table.add_column("Session", style="bold cyan")
+    table.add_column("Peers", style="magenta")
+    table.add_column("Status")
+    table.add_column("Files", justify="right")
+    table.add_column("Last Sync", justify="right", style="dim")
+    table.add_column("Path", style="dim")
+    colors = {"MERGED": "green", "SYNCING": "yellow", "CONFLICT": "red"}
+    for s in sessions:
+        status = s['status']
+        table.add_row(s['workflow'], s['peer'], f"[{colors.get(status, 'dim')}]{status}[/]", str(s['files']),
+                      f"{time.time() - s['last_sync']:.0f}s ago" if s['last_sync'] else "-", s['root'])
+    console.print(table)
+    for s in sessions:
+        for c in s['conflicts']:
+            console.print(f"[red]Conflict[/red] in {s['workflow']}: {c['path']} -> other version kept as {c['copy']}")
+    if not sessions:
+        console.print("[dim]No shared sessions. Start one with 'connect share NAME PATH --with USER'.[/dim]")
+
 
 # ─────────────────────────────────────────────────────────────
 # FORGE INTEGRATION (Container Orchestration + Workflows)
@@ -119,11 +416,42 @@ def bridge():
 @bridge.command(name='ship')
 @click.argument('path', type=click.Path(exists=True))
 @click.option('--to', required=True, help='Recipient identifier on Pidgeon Mesh')
-def bridge_ship(path, to):
+@click.option('--dedup', is_flag=True, help='Ship chunk references backed by ~/.shortcut/chunks')
+@click.option('--full', is_flag=True, help='Ship the whole context even if the recipient holds a base')
+@click.option('--peer', default=None, help='Stream to a mesh daemon (host:port) instead of the local inbox')
+@click.option('--inline', is_flag=True, help='Ship in the foreground instead of queueing for the spool worker')
+def bridge_ship(path, to, dedup, full, peer, inline):
     """Ingest, Package, and Transmit a workflow context."""
+    if inline:
+        from bridge_engine import BridgeEngine
+        engine = BridgeEngine()
+        engine.ship_workflow(path, to, dedup=dedup, full=full, peer=peer)
+        return
+    from outbound_spool import OutboundSpool, ensure_background_worker
+    spool = OutboundSpool()
+    job = spool.enqueue("ship", {"source_path": os.path.abspath(path), "recipient": to, "dedup": dedup,
+                                 "full": full, "peer": peer, "output_dir": os.getcwd()})
+    ensure_background_worker(spool)
+    console.print(f"[bold green]✓ Shipment queued[/bold green] (job {job}) :: {os.path.basename(os.path.abspath(path))} -> {to}")
+    console.print("[dim]Track it with 'pidgeon queue status'.[/dim]")
+
+@bridge.command(name='apply')
+@click.argument('artifact', type=click.Path(exists=True))
+@click.argument('root', type=click.Path(exists=True, file_okay=False))
+@click.option('--force', is_flag=True, help="Apply even if ROOT is not at the delta's base state")
+def bridge_apply(artifact, root, force):
+    """Apply a received NX-DLT delta onto a hydrated context root."""
+    from bridge_engine import BridgeEngine
+    engine = BridgeEngine()
+    engine.apply_delta(artifact, root, force=force)
+
+@bridge.command(name='sync')
+@click.argument('path', type=click.Path(exists=True))
+def bridge_sync(path):
+    """Show the pending delta for each recipient of a context."""
     from bridge_engine import BridgeEngine
     engine = BridgeEngine()
-    engine.ship_workflow(path, to)
+    engine.sync_context(path)
 
 @bridge.command(name='receive')
 @click.argument('artifact', type=click.Path(exists=True))
@@ -180,25 +508,32 @@ def scripts():
     pass
 
 
+def _script_registry():
+    from script_registry import ScriptRegistry
+    return ScriptRegistry([(SCRIPTS_DIR, "Verified"), (QUARANTINE_DIR, "QUARANTINE")])
+
+
+def _script_items():
+    """Local then quarantined scripts with their stable registry IDs, as 'scripts list' shows them."""
+    return _script_registry().items()
+
+
 @scripts.command(name='list')
-def scripts_list():
+@click.option('--tag', default=None, help='Only scripts tagged TAG')
+def scripts_list(tag):
     """List all local and quarantined scripts."""
-    scripts_list_items = []
-    if os.path.exists(SCRIPTS_DIR):
-        for f in os.listdir(SCRIPTS_DIR):
-            if f.endswith((".ps1", ".py")): scripts_list_items.append((f, "Verified"))
-    if os.path.exists(QUARANTINE_DIR):
-        for f in os.listdir(QUARANTINE_DIR):
-            if f.endswith((".ps1", ".py")): scripts_list_items.append((f, "QUARANTINE"))
-    
     table = Table(title="Local Scripts", border_style="blue")
     table.add_column("ID", justify="right", style="cyan")
     table.add_column("Filename", style="white")
+    table.add_column("Type")
+    table.add_column("Synopsis", style="white")
     table.add_column("Status", style="green")
 
-    for i, (f, status) in enumerate(scripts_list_items):
-        style = "bold red" if status == "QUARANTINE" else "dim"
-        table.add_row(str(i+1), f, status, style=style)
+    for item in _script_items():
+        if tag and tag.lower() not in item['tags']:
+            continue
+        style = "bold red" if item['status'] == "QUARANTINE" else "dim"
+        table.add_row(str(item['id']), item['name'], item['language'], item['synopsis'], item['status'], style=style)
     
     console.print(table)
 
@@ -250,32 +585,236 @@ def scripts_search(query):
 
 
 @scripts.command(name='run')
-@click.argument('script_id', type=int)
-def scripts_run(script_id):
-    """Run a script by its ID from the list."""
-    scripts_list_items = []
-    for d in [SCRIPTS_DIR, QUARANTINE_DIR]:
-        if os.path.exists(d):
-            for f in os.listdir(d):
-                if f.endswith((".ps1", ".py")): scripts_list_items.append(os.path.join(d, f))
-    
-    if 0 < script_id <= len(scripts_list_items):
-        script_path = scripts_list_items[script_id - 1]
-        filename = os.path.basename(script_path)
-        
-        if "quarantine" in script_path.lower():
-            console.print(Panel("[bold red]QUARANTINE EXECUTION[/bold red]\nThis script is unverified.", border_style="red"))
-            if not console.input("Type 'run' to proceed: ").lower() == 'run': return
-
-        console.print(Panel(f"Executing: [bold yellow]{filename}[/bold yellow]", border_style="yellow"))
-        cmd = ["powershell", "-ExecutionPolicy", "Bypass", "-File", script_path] if script_path.endswith(".ps1") else [sys.executable, script_path]
-        
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.stdout: console.print(result.stdout)
-        if result.returncode != 0: console.print(f"[bold red]Error (Exit {result.returncode}):[/bold red]\n{result.stderr}")
-        else: console.print("[bold green]✓ Success[/bold green]")
+@click.argument('selectors', nargs=-1)
+@click.option('--all-tagged', 'tag', default=None, help='Also run every script tagged TAG ("# tags: ..." header)')
+@click.option('-j', '--jobs', type=int, default=4, show_default=True, help='Scripts to run at once')
+@click.option('--timeout', type=float, default=None, help='Kill a script after this many seconds')
+@click.pass_context
+def scripts_run(ctx, selectors, tag, jobs, timeout):
+    """Run scripts by ID (run 1 3 5), filename glob (run 'backup-*') or tag."""
+    import time
+    from script_runner import ScriptRunner, select_scripts, print_summary, succeeded
+    from script_stats import record_runs
+    if not selectors and not tag:
+        console.print("[red]Give script IDs, a filename glob, or --all-tagged TAG.[/red]")
+        return
+    try:
+        chosen = select_scripts(_script_items(), selectors, tag)
+    except ValueError as e:
+        console.print(f"[red]{e}.[/red]")
+        return
+
+    quarantined = [item['name'] for item in chosen if item['status'] == "QUARANTINE"]
+    if quarantined:
+        console.print(Panel(f"[bold red]QUARANTINE EXECUTION[/bold red]\nUnverified: {', '.join(quarantined)}", border_style="red"))
+        if not console.input("Type 'run' to proceed: ").lower() == 'run': return
+
+    if len(chosen) == 1:
+        console.print(Panel(f"Executing: [bold yellow]{chosen[0]['name']}[/bold yellow]", border_style="yellow"))
     else:
-        console.print("[red]Invalid Script ID.[/red]")
+        console.print(Panel(f"Executing [bold yellow]{len(chosen)}[/bold yellow] scripts, {min(jobs, len(chosen))} at a time", border_style="yellow"))
+    start = time.perf_counter()
+    try:
+        results = ScriptRunner(jobs, timeout).run(chosen)
+    except KeyboardInterrupt:
+        console.print("[yellow]Interrupted; running scripts were stopped.[/yellow]")
+        ctx.exit(130)
+    record_runs(results, "cli")
+    print_summary(results, time.perf_counter() - start)
+    if not all(succeeded(r) for r in results):
+        ctx.exit(1)
+
+
+@scripts.command(name='stats')
+@click.option('--since', default='30d', show_default=True, help='Only runs newer than this (7d, 12h, or 2024-05-01)')
+@click.option('--script', 'name', default=None, help='Show the recent runs of one script')
+@click.option('--limit', '-n', type=int, default=10, show_default=True, help='Slowest runs to list')
+def scripts_stats(since, name, limit):
+    """Run history: p50/p95 durations, trends and the slowest runs."""
+    from datetime import datetime
+    from script_stats import ScriptStats, exit_label, trend_label
+    stats = ScriptStats()
+    if name:
+        runs = stats.recent(name, limit)
+        if not runs:
+            console.print(f"[yellow]No recorded runs of {name}.[/yellow]")
+            return
+        table = Table(title=f"Recent Runs :: {name}", border_style="blue")
+        for col, justify in [("Started", "left"), ("Via", "left"), ("Time", "right"), ("CPU", "right"),
+                             ("Peak RSS", "right"), ("Exit", "right"), ("Output", "right")]:
+            table.add_column(col, justify=justify)
+        for r in runs:
+            exit_code = exit_label(r)
+            table.add_row(datetime.fromtimestamp(r['started_at']).strftime('%Y-%m-%d %H:%M'), r['source'],
+                          f"{r['wall']:.2f}s", f"{r['cpu']:.2f}s" if r['cpu'] is not None else "-",
+                          f"{r['peak_rss'] / 1e6:.0f} MB" if r['peak_rss'] else "-",
+                          exit_code, f"{r['output_bytes'] / 1024:.1f} KB",
+                          style=None if exit_code == "0" else "red")
+        console.print(table)
+        return
+
+    cutoff = _parse_since(since)
+    summary = stats.summary(cutoff)
+    if not summary:
+        console.print(f"[yellow]No script runs recorded in the last {since}.[/yellow]")
+        return
+    table = Table(title=f"Script Timings :: last {since}", border_style="blue")
+    table.add_column("Script", style="cyan")
+    for col in ["Runs", "Failed", "p50", "p95", "CPU p50", "Peak RSS", "Trend"]:
+        table.add_column(col, justify="right")
+    for s in summary:
+        table.add_row(s['script'], str(s['runs']), f"[red]{s['failures']}[/red]" if s['failures'] else "0",
+                      f"{s['p50']:.2f}s" if s['p50'] is not None else "-",
+                      f"{s['p95']:.2f}s" if s['p95'] is not None else "-",
+                      f"{s['cpu_p50']:.2f}s" if s['cpu_p50'] is not None else "-",
+                      f"{s['peak_rss'] / 1e6:.0f} MB" if s['peak_rss'] else "-", trend_label(s['trend']))
+    console.print(table)
+
+    slow = Table(title="Slowest Runs", border_style="yellow")
+    slow.add_column("Script", style="cyan")
+    slow.add_column("Started")
+    slow.add_column("Time", justify="right", style="bold")
+    slow.add_column("Exit", justify="right")
+    for r in stats.slowest(limit, cutoff):
+        slow.add_row(r['script'], datetime.fromtimestamp(r['started_at']).strftime('%Y-%m-%d %H:%M'),
+                     f"{r['wall']:.2f}s", exit_label(r))
+    console.print(slow)
+
+
+@scripts.group(name='schedule')
+def scripts_schedule():
+    """Run scripts on cron schedules ('scripts schedule daemon')."""
+    pass
+
+
+@scripts_schedule.command(name='add')
+@click.argument('script')
+@click.argument('cron')
+@click.option('--name', default=None, help='Job name (default: the script name)')
+@click.option('--jitter', type=int, default=0, show_default=True, help='Delay each run by a random 0..N seconds')
+@click.option('--catch-up', type=click.Choice(['once', 'skip']), default='once', show_default=True,
+              help='Runs missed while the daemon was down: run once at startup, or skip them')
+@click.option('--timeout', type=float, default=None, help='Kill a run after this many seconds')
+def scripts_schedule_add(script, cron, name, jitter, catch_up, timeout):
+    """Schedule SCRIPT (ID or filename) on a CRON expression, e.g. '0 3 * * mon-fri' or @daily."""
+    import time
+    from datetime import datetime
+    from script_scheduler import CronExpr, load_jobs, save_jobs, make_job, notify_daemon
+    registry = _script_registry()
+    registry.refresh()
+    item = registry.get(int(script)) if script.isdigit() else registry.find(script)
+    if item is None or item['status'] != "Verified":
+        console.print(f"[red]{script} is not a verified script in {SCRIPTS_DIR}.[/red]")
+        return
+    script = item['name']
+    try:
+        job = make_job(script, cron, jitter, catch_up, timeout)
+    except ValueError as e:
+        console.print(f"[red]{e}.[/red]")
+        return
+    jobs = load_jobs()
+    jobs[name or os.path.splitext(script)[0]] = job
+    save_jobs(jobs)
+    first = datetime.fromtimestamp(CronExpr(cron).next_after(time.time()))
+    console.print(f"[green]✓ Scheduled {script}[/green] ({cron}); next run {first:%Y-%m-%d %H:%M}")
+    if not notify_daemon():
+        console.print("[dim]No scheduler running. Start it with 'shortcut scripts schedule daemon'.[/dim]")
+
+
+@scripts_schedule.command(name='remove')
+@click.argument('name')
+def scripts_schedule_remove(name):
+    """Remove a scheduled job."""
+    from script_scheduler import load_jobs, save_jobs, notify_daemon
+    jobs = load_jobs()
+    if jobs.pop(name, None) is None:
+        console.print(f"[red]No scheduled job named {name}.[/red]")
+        return
+    save_jobs(jobs)
+    notify_daemon()
+    console.print(f"[green]✓ Removed {name}.[/green]")
+
+
+@scripts_schedule.command(name='list')
+def scripts_schedule_list():
+    """Scheduled jobs with their next and last runs."""
+    import time
+    from datetime import datetime
+    from script_scheduler import CronExpr, load_jobs, load_state, daemon_running
+    jobs, state = load_jobs(), load_state()
+    if not jobs:
+        console.print("[dim]Nothing scheduled. Add a job with 'scripts schedule add SCRIPT CRON'.[/dim]")
+        return
+    table = Table(title="Scheduled Scripts", border_style="blue")
+    table.add_column("Job", style="cyan")
+    table.add_column("Script")
+    table.add_column("Schedule", style="yellow")
+    table.add_column("Next Run")
+    table.add_column("Last Run")
+    table.add_column("Result", justify="right")
+    for name, job in sorted(jobs.items()):
+        job_state = state.get(name, {})
+        try:
+            next_run = f"{datetime.fromtimestamp(CronExpr(job['cron']).next_after(time.time())):%Y-%m-%d %H:%M}"
+        except ValueError:
+            next_run = "[red]invalid[/red]"
+        last_run = f"{datetime.fromtimestamp(job_state['last_run']):%Y-%m-%d %H:%M}" if job_state.get('last_run') else "-"
+        if not job_state.get('last_run'):
+            outcome = "-"
+        elif job_state.get('last_error') or job_state.get('last_exit') != 0:
+            outcome = f"[red]{job_state.get('last_error') or 'exit ' + str(job_state.get('last_exit'))}[/red]"
+        else:
+            outcome = f"[green]ok[/green] {job_state.get('last_seconds', 0):.1f}s"
+        if job_state.get('skipped'):
+            outcome += f" [dim]({job_state['skipped']} skipped)[/dim]"
+        schedule = f"{job['cron']} ±{job['jitter']}s" if job.get('jitter') else job['cron']
+        table.add_row(name, job['script'], schedule, next_run, last_run, outcome)
+    console.print(table)
+    if not daemon_running():
+        console.print("[yellow]Scheduler daemon is not running.[/yellow] [dim]Start it with 'scripts schedule daemon'.[/dim]")
+
+
+@scripts_schedule.command(name='daemon')
+@click.option('-j', '--concurrency', type=int, default=2, show_default=True, help='Scheduled scripts to run at once')
+def scripts_schedule_daemon(concurrency):
+    """Run scheduled scripts until stopped (Ctrl+C)."""
+    from script_scheduler import Scheduler
+    scheduler = Scheduler(SCRIPTS_DIR, concurrency)
+    console.print(f"[bold cyan]SCHEDULER[/bold cyan] :: running jobs from {scheduler.path}, {concurrency} at a time")
+    try:
+        scheduler.run()
+    except OSError as e:
+        console.print(f"[red]{e}.[/red]")
+    except KeyboardInterrupt:
+        pass
+    console.print(f"[dim]Scheduler stopped. {scheduler.stats['runs']} run(s), {scheduler.stats['failures']} failed, "
+                  f"{scheduler.stats['skipped']} skipped.[/dim]")
+
+
+@scripts_schedule.command(name='log')
+@click.argument('script', required=False)
+@click.option('--limit', '-n', type=int, default=20, show_default=True)
+def scripts_schedule_log(script, limit):
+    """Results of scheduled runs, newest first."""
+    from datetime import datetime
+    from script_stats import ScriptStats, exit_label
+    runs = ScriptStats().recent(script, limit, source="schedule")
+    if not runs:
+        console.print("[dim]No scheduled runs recorded yet.[/dim]")
+        return
+    table = Table(title="Scheduled Runs", border_style="blue")
+    table.add_column("Started")
+    table.add_column("Script", style="cyan")
+    table.add_column("Time", justify="right")
+    table.add_column("Peak RSS", justify="right")
+    table.add_column("Exit", justify="right")
+    table.add_column("Error")
+    for r in runs:
+        exit_code = exit_label(r)
+        table.add_row(datetime.fromtimestamp(r['started_at']).strftime('%Y-%m-%d %H:%M:%S'), r['script'],
+                      f"{r['wall']:.2f}s", f"{r['peak_rss'] / 1e6:.0f} MB" if r['peak_rss'] else "-", exit_code,
+                      r['error'] or "", style=None if exit_code == "0" else "red")
+    console.print(table)
 
 
 # ─────────────────────────────────────────────────────────────
@@ -297,12 +836,18 @@ def nexus_enter():
 @nexus.command(name='pack')
 @click.argument('path', type=click.Path(exists=True))
 @click.option('--output', '-o', default='context.nxs', help='Output artifact path')
-def nexus_pack(path, output):
+@click.option('--codec', type=click.Choice(['gzip', 'zstd', 'lz4', 'none']), default='gzip', help='Seed compression codec')
+@click.option('--workers', '-j', type=int, default=None, help='Compression workers (default: all cores)')
+@click.option('--dedup', is_flag=True, help='Store content-defined chunks in ~/.shortcut/chunks instead of a seed')
+@click.option('--indexed', is_flag=True, help='Compress files individually for random access (unpack --only, nexus ls)')
+def nexus_pack(path, output, codec, workers, dedup, indexed):
     """Pack a directory into a Sovereign Artifact (.nxs)."""
     from artifact_packager import SovereignArtifact
+    from chunk_store import ChunkStore
     packager = SovereignArtifact()
     try:
-        final_path = packager.pack(path, output)
+        final_path = packager.pack(path, output, codec=codec, workers=workers,
+                                   chunk_store=ChunkStore() if dedup else None, indexed=indexed)
         console.print(f"[bold green]✓ Artifact packed:[/bold green] {final_path}")
     except Exception as e:
         console.print(f"[bold red]Pack Error: {e}[/bold red]")
@@ -310,43 +855,110 @@ def nexus_pack(path, output):
 @nexus.command(name='unpack')
 @click.argument('artifact', type=click.Path(exists=True))
 @click.option('--detonate', is_flag=True, help='Immediately run the artifact logic')
-def nexus_unpack(artifact, detonate):
+@click.option('--only', multiple=True, help='Extract only paths matching this glob or directory (repeatable)')
+@click.option('--ram', is_flag=True, help='Detonate from a RAM-backed root that is wiped on exit')
+@click.option('--ram-cap', type=int, default=512, show_default=True, help='Size cap in MB for --ram')
+def nexus_unpack(artifact, detonate, only, ram, ram_cap):
     """Unpack (and optionally detonate) a Sovereign Artifact."""
     from artifact_packager import SovereignArtifact
     packager = SovereignArtifact(artifact)
+    if ram and not detonate:
+        console.print("[red]--ram only applies to --detonate (the root is wiped when it exits).[/red]")
+        return
     try:
+        if ram:
+            from volatile_root import VolatileRoot
+            with VolatileRoot(ram_cap * 1024 * 1024) as vroot:
+                if not vroot.ram_backed:
+                    console.print("[yellow]No RAM-backed filesystem available; using a private temp dir.[/yellow]")
+                payload = packager.inspect()["payload_bytes"]
+                if payload is not None and not only:
+                    vroot.ensure_fits(payload)
+                extraction = packager.unpack(vroot.path, only=list(only) or None, max_bytes=vroot.cap_bytes)
+                console.print(f"[bold green]✓ Artifact hydrated into RAM:[/bold green] {extraction['root_path']}")
+                _detonate(extraction['root_path'])
+            console.print("[dim]Volatile root shredded.[/dim]")
+            return
+
         # 1. Unpack
-        extraction = packager.unpack("extracted_context")
+        extraction = packager.unpack("extracted_context", only=list(only) or None)
         root_path = extraction['root_path']
         console.print(f"[bold green]✓ Artifact unpacked to:[/bold green] {root_path}")
         
         # 2. Detonate if requested
         if detonate:
-            console.print("[bold yellow]⚠ Initiating Detonation Sequence...[/bold yellow]")
-            # In a real scenario, we'd inspect the manifest for the entry point
-            # For now, we assume a standard forge.yml or script
-            from forge_integration import launch_forge_command
-            
-            # If the artifact contains a forge.yml, run it
-            if os.path.exists(os.path.join(root_path, "forge.yml")):
-                launch_forge_command(['workflow', 'run', 'default', '--config', os.path.join(root_path, "forge.yml")])
-            else:
-                console.print("[dim]No forge.yml found. Entering shell context...[/dim]")
-                os.system(f"cd {root_path} && cmd") # Simple context switch for now
+            _detonate(root_path)
                 
     except Exception as e:
         console.print(f"[bold red]Unpack Error: {e}[/bold red]")
 
+def _detonate(root_path):
+    """Run a hydrated context: its forge.yml if present, else a shell inside it."""
+    console.print("[bold yellow]⚠ Initiating Detonation Sequence...[/bold yellow]")
+    # In a real scenario, we'd inspect the manifest for the entry point
+    # For now, we assume a standard forge.yml or script
+    from forge_integration import launch_forge_command
+    
+    # If the artifact contains a forge.yml, run it
+    if os.path.exists(os.path.join(root_path, "forge.yml")):
+        launch_forge_command(['workflow', 'run', 'default', '--config', os.path.join(root_path, "forge.yml")])
+    else:
+        console.print("[dim]No forge.yml found. Entering shell context...[/dim]")
+        os.system(f"cd {root_path} && cmd") # Simple context switch for now
+
+@nexus.command(name='ls')
+@click.argument('artifact', type=click.Path(exists=True))
+@click.argument('patterns', nargs=-1)
+def nexus_ls(artifact, patterns):
+    """List the files inside an artifact without unpacking it."""
+    from artifact_packager import SovereignArtifact
+    try:
+        files = SovereignArtifact(artifact).list_files(list(patterns) or None)
+    except Exception as e:
+        console.print(f"[bold red]List Error: {e}[/bold red]")
+        return
+    table = Table(title=os.path.basename(artifact), border_style="blue")
+    table.add_column("Path", style="white")
+    table.add_column("Size", justify="right", style="cyan")
+    table.add_column("SHA-256", style="dim")
+    for f in files:
+        table.add_row(f['path'], f"{f['size']:,}", f['sha256'][:12])
+    console.print(table)
+    console.print(f"[dim]{len(files)} files, {sum(f['size'] for f in files) / 1e6:.1f} MB[/dim]")
+
+@nexus.command(name='bench')
+@click.option('--profile', '-p', multiple=True, type=click.Choice(['small_files', 'huge_files', 'mixed']), help='Profiles to run (default: all)')
+@click.option('--scale', type=float, default=1.0, show_default=True, help='Scale the synthetic trees up or down')
+@click.option('--codec', type=click.Choice(['gzip', 'zstd', 'lz4', 'none']), default='gzip', help='Seed compression codec')
+@click.option('--workers', '-j', type=int, default=None, help='Pack/unpack workers (default: all cores)')
+@click.option('--repeat', type=int, default=1, show_default=True, help='Runs per profile (best is kept)')
+@click.option('--output', '-o', default='nxs-bench.json', show_default=True, help='Where to write the JSON report')
+@click.option('--baseline', type=click.Path(exists=True), help='Earlier report to compare against')
+@click.option('--threshold', type=float, default=0.10, show_default=True, help='Allowed regression (fraction)')
+def nexus_bench(profile, scale, codec, workers, repeat, output, baseline, threshold):
+    """Benchmark pack/unpack/transfer on synthetic contexts."""
+    from artifact_bench import run_suite, compare, save_report, load_report, render_report
+    with console.status("[bold blue]Benchmarking artifact pipeline...[/bold blue]"):
+        report = run_suite(list(profile) or None, scale, codec, workers, repeat)
+    save_report(report, output)
+    regressions = compare(report, load_report(baseline), threshold) if baseline else []
+    render_report(report, regressions, console)
+    console.print(f"[dim]Report written to {output}[/dim]")
+    if regressions:
+        console.print(f"[bold red]✗ {len(regressions)} regression(s) beyond {threshold:.0%}[/bold red]")
+        sys.exit(1)
+
 @nexus.command(name='send')
 @click.argument('artifact', type=click.Path(exists=True))
 @click.argument('recipient')
-def nexus_send(artifact, recipient):
+@click.option('--peer', default=None, help='Stream to a mesh daemon (host:port) instead of the local inbox')
+def nexus_send(artifact, recipient, peer):
     """Send a Sovereign Artifact via Pidgeon Mesh."""
     from pidgeon import Pidgeon
     p = Pidgeon()
     
     # Use the new transfer logic
-    p.transfer_artifact(artifact, recipient)
+    p.transfer_artifact(artifact, recipient, peer=peer)
     
     p.send_pidgeon(recipient, "Incoming Sovereign Context", f"Transferring artifact: {artifact}")
     console.print("[bold green]✓ Context transmitted.[/bold green]")
@@ -382,6 +994,11 @@ def features_help():
   
   shortcut scripts list                 # List scripts
   shortcut scripts run 1                # Run script #1
+  shortcut scripts run 1 3 5 -j 3       # Run several side by side
+  shortcut scripts run --all-tagged nightly --timeout 600
+  shortcut scripts stats --since 7d     # Timings, trends, slowest runs
+  shortcut scripts schedule add backup.py "0 3 * * *" --jitter 300
+  shortcut scripts schedule daemon      # Run scheduled scripts
   shortcut scripts search KEYWORD       # Search GitHub
 
 [bold]For more info:[/bold]
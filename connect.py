@@ -32,26 +32,102 @@ class Connect:
                     json.dump([], f)
 
     def get_online_peers(self):
-        """Discover active Nexus users on the network."""
-        # Skeleton for peer discovery
-        return [
-            {"username": "dev_lead", "status": "Working on: Forge-Core", "ip": "192.168.1.15"},
-            {"username": "ops_ninja", "status": "Idle", "ip": "192.168.1.22"}
-        ]
+        """
+        Active Nexus users on the network, as last seen by `connect daemon`
+        (peer_discovery). Reads the cached table; never scans the network.
+        """
+        from peer_discovery import load_peers
+        return [{"username": p["username"], "status": p["status"], "ip": p["ip"], "port": p["port"],
+                 "node": p["node"], "last_seen": p["last_seen"]} for p in load_peers(self.peers_path)]
+
+    def _find_peer(self, username):
+        for peer in self.get_online_peers():
+            if username in (peer["username"], peer["node"]) and peer["port"]:
+                return peer
+        console.print(f"[red]{username} is not online.[/red] [dim]See 'connect peers'.[/dim]")
+        return None
+
+    def _agent(self, request):
+        """Ask the local `connect daemon` agent; None if no daemon is running."""
+        from peer_session import AgentClient
+        try:
+            with AgentClient() as agent:
+                return agent.request(request)
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
 
     def connect_to_peer(self, username):
         """Initiate a shared session with another user."""
         console.print(f"[cyan]Requesting connection to {username}...[/cyan]")
-        # This would establish a P2P socket and sync Omni-Sync buffers
+        peer = self._find_peer(username)
+        if peer is None:
+            return False
+        # The daemon's agent keeps the session open for later messages
+        reply = self._agent({"op": "open", "host": peer["ip"], "port": peer["port"]})
+        if reply is None:
+            console.print("[yellow]No local 'connect daemon' to hold the session.[/yellow]")
+            return False
+        if not reply["ok"]:
+            console.print(f"[red]Could not reach {username}: {reply['error']}[/red]")
+            return False
         return True
 
     def send_message(self, username, text):
-        """Send a message to a connected peer."""
-        console.print(f"[blue][You -> {username}]:[/blue] {text}")
+        """
+        Send a message to a connected peer. Goes through the local agent,
+        which reuses its session to the peer; without a running daemon a
+        one-off session is opened.
+        """
+        peer = self._find_peer(username)
+        if peer is None:
+            return False
+        reply = self._agent({"op": "send", "host": peer["ip"], "port": peer["port"], "to": username, "text": text})
+        if reply is None:
+            import asyncio
+            from peer_session import send_direct
+            try:
+                asyncio.run(send_direct(peer["ip"], peer["port"], username, text))
+            except (OSError, asyncio.TimeoutError) as e:
+                reply = {"ok": False, "error": str(e)}
+            else:
+                reply = {"ok": True, "rtt_ms": None}
+        if not reply["ok"]:
+            console.print(f"[red]Message to {username} failed: {reply['error']}[/red]")
+            return False
+        via = f"{reply['rtt_ms']:.1f} ms over session" if reply["rtt_ms"] is not None else "direct"
+        console.print(f"[blue][You -> {username}]:[/blue] {text} [dim]({via})[/dim]")
         return True
 
     def get_active_sessions(self):
-        """Show who is working where in the Nexus."""
-        return [
-            {"peer": "ops_ninja", "workflow": "s3-pruner", "status": "MERGED"}
-        ]
+        """
+        Shared workspaces and their merge state, as last saved by the
+        `connect daemon` sync service (session_sync).
+        """
+        from session_sync import load_sessions
+        return [{"peer": ", ".join(s.get("peers", [])), "workflow": name, "status": s.get("status", "WAITING"),
+                 "root": s.get("root"), "files": sum(1 for f in s.get("files", {}).values() if f["hash"]),
+                 "conflicts": s.get("conflicts", []), "last_sync": s.get("last_sync")}
+                for name, s in sorted(load_sessions(self.sessions_path).items())]
+
+    def share_workspace(self, name, root, peers):
+        """Start syncing `root` with `peers` as session `name`."""
+        reply = self._agent({"op": "share", "name": name, "root": os.path.abspath(root), "peers": list(peers)})
+        if reply is None:
+            from session_sync import share_offline
+            share_offline(name, root, list(peers), self.sessions_path)
+            console.print(f"[yellow]No 'connect daemon' running; {name} will start syncing when it does.[/yellow]")
+            return True
+        if not reply["ok"]:
+            console.print(f"[red]Could not share {name}: {reply['error']}[/red]")
+            return False
+        console.print(f"[green]Sharing {name}[/green] ({reply['files']} files) with {', '.join(peers)}")
+        return True
+
+    def unshare_workspace(self, name):
+        reply = self._agent({"op": "unshare", "name": name})
+        if reply is None:
+            from session_sync import unshare_offline
+            reply = {"ok": unshare_offline(name, self.sessions_path), "error": f"No session named {name!r}"}
+        if not reply["ok"]:
+            console.print(f"[red]{reply['error']}[/red]")
+        return reply["ok"]
@@ -0,0 +1,333 @@
+"""
+Contact Index - In-Memory Autocomplete over Pidgeon Contacts.
+
+Built lazily from the Pidgeon store on first query, then kept current by
+pulling only the contacts whose revision moved past the last one seen.
+Lookups never touch SQLite:
+
+- a sorted token list (full name, name words, full address, local part
+  and its pieces, domain) answers prefix queries by bisection;
+- every prefix shared by more than DENSE tokens keeps its best TOP_K
+  contacts ready, computed bottom-up by merging the lists of its
+  extensions, so short, common prefixes cost a dict lookup;
+- a trigram index over names and addresses, each posting list in rank
+  order, catches matches inside a word ("smit" in "goldsmith") when
+  prefixes alone don't fill a result, usually after a handful of checks.
+  It is built on the first such query.
+
+Results rank whole-name/address prefixes above word prefixes above
+substring matches, then by how often and how recently a contact was
+used. Run `python contact_index.py [contacts]` for a latency benchmark.
+"""
+
+import os
+import re
+import pickle
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+DENSE = 128
+TOP_K = 32
+DEFAULT_LIMIT = 10
+SNAPSHOT_VERSION = 1
+# Changes replayed on top of a snapshot before it is rewritten
+SNAPSHOT_EVERY = 500
+
+# Match tiers, best first
+_FULL, _WORD, _INNER = 0, 1, 2
+_SPLIT = re.compile(r"[\s._+\-@]+")
+_END = chr(0x10FFFF)
+
+
+def _tokens(name: str, email: str) -> set:
+    """(token, tier) pairs a contact can be found by."""
+    name, email = name.lower().strip(), email.lower().strip()
+    local, _, domain = email.partition("@")
+    full = {t for t in (name, email) if t}
+    words = {w for w in _SPLIT.split(name) + _SPLIT.split(local) + [domain] if w} - full
+    return {(t, _FULL) for t in full} | {(w, _WORD) for w in words}
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _best_per_contact(ranked) -> list:
+    """Sorted (tier, *rank, id) tuples, keeping each contact's best only."""
+    best = {}
+    for r in ranked:
+        if r[-1] not in best or r < best[r[-1]]:
+            best[r[-1]] = r
+    return sorted(best.values())
+
+
+class ContactIndex:
+    """
+    Ranked prefix/substring search over a PidgeonStore's contacts. With a
+    `snapshot` path, the built index is pickled there so a fresh process
+    (one CLI call) only loads it and pulls the changes since.
+    """
+
+    def __init__(self, store, snapshot: str = None):
+        self.store = store
+        self.snapshot = snapshot
+        self.rev = -1
+        self._rank = {}     # id -> (-use_count, -last_used, id); smaller is better
+        self._text = {}     # id -> (name, email, "name\0email" lowercased)
+        self._tokens = []   # sorted (token, tier, id)
+        self._top = {}      # dense prefix -> best TOP_K (tier, -use_count, -last_used, id)
+        self._grams = None  # trigram -> [(-use_count, -last_used, id)], best first; built on first use
+        self._unsaved = 0
+
+    # --- maintenance ----------------------------------------------------
+
+    def refresh(self) -> int:
+        """Pull contacts changed since the last refresh. Returns how many."""
+        if self.rev < 0 and self.snapshot:
+            self._load_snapshot()
+        if self.rev >= 0 and self.store.contacts_rev() == self.rev:
+            return 0
+        rows = self.store.contacts_since(max(self.rev, 0))
+        if self.rev < 0:
+            self._build(rows)
+            self._unsaved = SNAPSHOT_EVERY
+        else:
+            for row in rows:
+                self._update(row)
+            self._unsaved += len(rows)
+        self.rev = max([self.rev, 0] + [row["rev"] for row in rows[-1:]])
+        # A few changes are cheaper to replay than to re-pickle everything
+        if self.snapshot and self._unsaved >= SNAPSHOT_EVERY:
+            self._save_snapshot()
+        return len(rows)
+
+    def _load_snapshot(self):
+        try:
+            with open(self.snapshot, "rb") as f:
+                version, rev, self._rank, self._text, self._tokens, self._top = pickle.load(f)
+        except (OSError, ValueError, EOFError, pickle.UnpicklingError):
+            return
+        if version != SNAPSHOT_VERSION or rev > self.store.contacts_rev():
+            # Stale format, or a snapshot of a different database
+            self.__init__(self.store, self.snapshot)
+            return
+        self.rev = rev
+
+    def _save_snapshot(self):
+        tmp = f"{self.snapshot}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((SNAPSHOT_VERSION, self.rev, self._rank, self._text, self._tokens, self._top), f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self.snapshot)
+        self._unsaved = 0
+
+    def _load(self, row):
+        cid = row["id"]
+        self._rank[cid] = (-row["use_count"], -(row["last_used"] or 0), cid)
+        self._text[cid] = (row["name"], row["email"], f"{row['name']}\0{row['email']}".lower())
+
+    def _build(self, rows):
+        tokens = []
+        for row in rows:
+            self._load(row)
+            tokens.extend((t, tier, row["id"]) for t, tier in _tokens(row["name"], row["email"]))
+        tokens.sort()
+        self._tokens = tokens
+        self._top = {}
+        self._dense("", 0, len(tokens))
+
+    def _build_grams(self):
+        # Filled best contact first, so every posting list comes out sorted
+        grams = defaultdict(list)
+        for rank in sorted(self._rank.values()):
+            text = self._text[rank[2]][2]
+            for gram in _trigrams(text):
+                grams[gram].append(rank)
+        self._grams = dict(grams)
+
+    def _dense(self, prefix: str, lo: int, hi: int) -> list:
+        """Best TOP_K for `prefix` over tokens[lo:hi], caching dense prefixes."""
+        tokens, rank = self._tokens, self._rank
+        if hi - lo <= DENSE:
+            return _best_per_contact((tier,) + rank[cid] for _, tier, cid in tokens[lo:hi])[:TOP_K]
+        depth = len(prefix)
+        ranked = []
+        i = lo
+        while i < hi and len(tokens[i][0]) == depth:
+            ranked.append((tokens[i][1],) + rank[tokens[i][2]])
+            i += 1
+        while i < hi:
+            child = prefix + tokens[i][0][depth]
+            j = bisect_left(tokens, (child + _END,), i, hi)
+            ranked.extend(self._dense(child, i, j))
+            i = j
+        top = self._top[prefix] = _best_per_contact(ranked)[:TOP_K]
+        return top
+
+    def _update(self, row):
+        cid = row["id"]
+        old_name, old_email, old_text = self._text.get(cid, ("", "", ""))
+        old_rank = self._rank.get(cid)
+        old = _tokens(old_name, old_email)
+        self._load(row)
+        new = _tokens(row["name"], row["email"])
+        for token, tier in old - new:
+            i = bisect_left(self._tokens, (token, tier, cid))
+            if i < len(self._tokens) and self._tokens[i] == (token, tier, cid):
+                del self._tokens[i]
+            # The contact may have lost its standing there: recompute lazily
+            for n in range(len(token) + 1):
+                self._top.pop(token[:n], None)
+        for token, tier in new - old:
+            insort(self._tokens, (token, tier, cid))
+        if self._grams is not None:
+            if old_rank is not None:
+                for gram in _trigrams(old_text):
+                    postings = self._grams[gram]
+                    del postings[bisect_left(postings, old_rank)]
+            for gram in _trigrams(self._text[cid][2]):
+                insort(self._grams.setdefault(gram, []), self._rank[cid])
+
+        # Usage only grows, so elsewhere the contact can only climb:
+        # re-seat it in every cached list it belongs to
+        best = {}
+        for token, tier in new:
+            for n in range(len(token) + 1):
+                p = token[:n]
+                if best.get(p, _INNER) > tier:
+                    best[p] = tier
+        for p, tier in best.items():
+            top = self._top.get(p)
+            if top is None:
+                continue
+            top = [r for r in top if r[-1] != cid]
+            insort(top, (tier,) + self._rank[cid])
+            self._top[p] = top[:TOP_K]
+
+    # --- queries --------------------------------------------------------
+
+    def _prefix(self, q: str, limit: int) -> list:
+        top = self._top.get(q)
+        if top is None or limit > TOP_K:
+            lo = bisect_left(self._tokens, (q,))
+            hi = bisect_left(self._tokens, (q + _END,), lo)
+            if hi - lo > DENSE and limit <= TOP_K:
+                # Became dense through updates since the build
+                top = self._dense(q, lo, hi)
+            else:
+                top = _best_per_contact((tier,) + self._rank[cid] for _, tier, cid in self._tokens[lo:hi])
+        return [r[-1] for r in top[:limit]]
+
+    def _inner(self, q: str, limit: int, exclude: list) -> list:
+        if self._grams is None:
+            self._build_grams()
+        postings = [self._grams.get(g, ()) for g in _trigrams(q)]
+        if not postings:
+            return []
+        # Walk the rarest trigram's contacts best first; trigrams can
+        # co-occur without the substring, so each one is confirmed
+        found = []
+        for _, _, cid in min(postings, key=len):
+            if q in self._text[cid][2] and cid not in exclude:
+                found.append(cid)
+                if len(found) == limit:
+                    break
+        return found
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> list:
+        """Best `limit` contacts for `query`, as dicts (name, email, use_count, last_used)."""
+        if self.rev < 0:
+            self.refresh()
+        q = query.lower().strip()
+        ids = self._prefix(q, limit)
+        if len(ids) < limit and len(q) >= 3:
+            ids += self._inner(q, limit - len(ids), ids)
+        return [self._as_dict(cid) for cid in ids]
+
+    def __len__(self):
+        return len(self._rank)
+
+    def _as_dict(self, cid: int) -> dict:
+        name, email, _ = self._text[cid]
+        count, last, _ = self._rank[cid]
+        return {"name": name, "email": email, "use_count": -count, "last_used": -last or None}
+
+
+def benchmark_index(contacts: int = 100_000, queries: int = 2000) -> dict:
+    """Build and query latency over a synthetic address book."""
+    import time
+    import random
+    import tempfile
+    from pidgeon_store import PidgeonStore
+    from local_db import transaction
+
+    first = ["ana", "bruno", "carla", "dmitri", "elena", "farid", "grace", "hiro", "ines", "jonas",
+             "kofi", "lena", "marco", "nadia", "omar", "priya", "quinn", "rosa", "sven", "tariq"]
+    last = ["smith", "garcia", "nguyen", "okafor", "muller", "rossi", "kim", "silva", "cohen", "ivanova",
+            "tanaka", "haddad", "larsen", "novak", "dubois", "kowalski", "oconnor", "meyer", "santos", "yilmaz"]
+    domains = ["example.com", "mail.test", "corp.internal", "uni.edu", "studio.io"]
+    rnd = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PidgeonStore(tmp)
+        rows = []
+        for i in range(contacts):
+            f, l = rnd.choice(first), rnd.choice(last)
+            rows.append((f"{f.title()} {l.title()}", f"{f}.{l}{i}@{rnd.choice(domains)}",
+                         time.time() - rnd.random() * 1e7, rnd.randint(0, 50)))
+        with transaction(store.conn):
+            store.conn.executemany("INSERT INTO contacts (name, email, last_used, use_count) VALUES (?, ?, ?, ?)",
+                                   rows)
+
+        snapshot = os.path.join(tmp, "contacts.idx")
+        index = ContactIndex(store, snapshot)
+        start = time.perf_counter()
+        index.refresh()
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        ContactIndex(store, snapshot).refresh()
+        load = time.perf_counter() - start
+        start = time.perf_counter()
+        index._build_grams()
+        grams = time.perf_counter() - start
+
+        samples = [rnd.choice(first + last)[:rnd.randint(1, 6)] for _ in range(queries)]
+        samples += [f"{rnd.choice(first)}.{rnd.choice(last)}{rnd.randrange(contacts)}"[:rnd.randint(8, 16)]
+                    for _ in range(queries // 4)]
+        samples += [rnd.choice(last)[1:5] for _ in range(queries // 4)]   # inside a word
+        latencies = []
+        for q in samples:
+            t = time.perf_counter()
+            index.search(q)
+            latencies.append(time.perf_counter() - t)
+        latencies.sort()
+
+        store.touch_contact("new.person@example.com", "New Person")
+        t = time.perf_counter()
+        changed = index.refresh()
+        incremental = time.perf_counter() - t
+        assert changed == 1 and index.search("new pe")[0]["email"] == "new.person@example.com"
+        store.conn.close()
+
+    return {"contacts": contacts, "build_s": build, "load_s": load, "grams_s": grams, "queries": len(latencies),
+            "p50_us": latencies[len(latencies) // 2] * 1e6, "p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+            "max_us": latencies[-1] * 1e6, "incremental_ms": incremental * 1e3}
+
+
+if __name__ == "__main__":
+    import sys
+    from rich.console import Console
+    from rich.table import Table
+
+    n_contacts = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    r = benchmark_index(n_contacts)
+    table = Table(title=f"Contact Index :: {r['contacts']} contacts, {r['queries']} queries")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right", style="bold green")
+    table.add_row("Build", f"{r['build_s']:.2f}s")
+    table.add_row("Load from snapshot", f"{r['load_s']:.2f}s")
+    table.add_row("Substring index (first use)", f"{r['grams_s']:.2f}s")
+    table.add_row("Query p50", f"{r['p50_us']:.0f} µs")
+    table.add_row("Query p99", f"{r['p99_us']:.0f} µs")
+    table.add_row("Query max", f"{r['max_us']:.0f} µs")
+    table.add_row("Incremental refresh (1 change)", f"{r['incremental_ms']:.2f} ms")
+    Console().print(table)
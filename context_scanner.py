@@ -0,0 +1,200 @@
+"""
+Context Scanner - Filter-Aware Ingestion Walker.
+
+Walks a context tree with os.scandir on a pool of worker threads, pruning
+excluded directories before descending into them. Exclusions are the
+built-in heavy-directory rules plus the root .gitignore and .nxsignore,
+compiled once into a single matcher. The scan reports what it kept and
+what it skipped.
+"""
+
+import os
+import re
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+# gitignore syntax. build/ and dist/ only count at the context root, so
+# e.g. src/build_utils.py or docs/distribution.md are kept.
+DEFAULT_EXCLUDES = [
+    ".git/", "node_modules/", "venv/", ".venv/", "__pycache__/",
+    ".env", ".env.*", "/build/", "/dist/",
+]
+IGNORE_FILES = (".gitignore", ".nxsignore")
+
+ScanEntry = namedtuple("ScanEntry", "rel path kind size mtime mode")
+
+
+def _glob_to_regex(glob: str) -> str:
+    """Translate one gitignore glob (no leading/trailing slash) to a regex body."""
+    out, i, n = [], 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if glob.startswith("**/", i):
+            out.append("(?:.*/)?")
+            i += 3
+            continue
+        if glob.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+            continue
+        if glob.startswith("**", i):
+            out.append(".*")
+            i += 2
+            continue
+        if c == "*":
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = glob.find("]", i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1:end]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = end
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreMatcher:
+    """
+    gitignore-style matcher over posix paths relative to the context root.
+    Without negations every rule is folded into one alternation per kind
+    (file/dir), so a check is a single regex match. With negations the
+    rules are evaluated in order and the last match wins, as git does.
+    """
+
+    def __init__(self, patterns: list):
+        self.rules = []
+        for raw in patterns:
+            line = raw.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+            negate = line.startswith("!")
+            if negate:
+                line = line[1:]
+            elif line.startswith("\\"):
+                line = line[1:]
+            dir_only = line.endswith("/")
+            line = line.rstrip("/")
+            # A slash anywhere but the end anchors the rule to the root
+            anchored = "/" in line
+            body = _glob_to_regex(line.lstrip("/"))
+            regex = ("^" if anchored else "^(?:.*/)?") + body + "$"
+            self.rules.append((re.compile(regex), negate, dir_only))
+
+        self.has_negations = any(neg for _, neg, _ in self.rules)
+        if not self.has_negations:
+            file_rules = [r.pattern for r, _, d in self.rules if not d]
+            dir_rules = [r.pattern for r, _, _ in self.rules]
+            self._file_re = re.compile("|".join(f"(?:{p})" for p in file_rules)) if file_rules else None
+            self._dir_re = re.compile("|".join(f"(?:{p})" for p in dir_rules)) if dir_rules else None
+
+    def ignored(self, rel: str, is_dir: bool) -> bool:
+        if not self.has_negations:
+            regex = self._dir_re if is_dir else self._file_re
+            return bool(regex and regex.match(rel))
+        result = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel):
+                result = not negate
+        return result
+
+    @classmethod
+    def for_context(cls, root: str, extra: list = None, ignore_files=IGNORE_FILES):
+        """Built-in excludes, then the root ignore files, then `extra`."""
+        patterns = list(DEFAULT_EXCLUDES)
+        for name in ignore_files:
+            path = os.path.join(root, name)
+            if os.path.isfile(path):
+                with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                    patterns.extend(f.readlines())
+        patterns.extend(extra or [])
+        return cls(patterns)
+
+
+class ContextScanner:
+    """Parallel, pruning walk of a context directory."""
+
+    def __init__(self, root: str, extra_excludes: list = None, workers: int = None,
+                 ignore_files=IGNORE_FILES):
+        self.root = os.path.abspath(root)
+        self.matcher = IgnoreMatcher.for_context(self.root, extra_excludes, ignore_files)
+        self.workers = workers or min(16, (os.cpu_count() or 1) * 2)
+        self.stats = {}
+
+    def _scan_dir(self, path: str, rel_dir: str):
+        """List one directory. Returns (entries, subdirs, skipped_files, skipped_bytes, pruned)."""
+        entries, subdirs = [], []
+        skipped_files = skipped_bytes = 0
+        pruned = []
+        prefix = f"{rel_dir}/" if rel_dir else ""
+        with os.scandir(path) as it:
+            for de in it:
+                rel = prefix + de.name
+                try:
+                    is_link = de.is_symlink()
+                    is_dir = not is_link and de.is_dir(follow_symlinks=False)
+                    st = de.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if self.matcher.ignored(rel, is_dir):
+                    if is_dir:
+                        pruned.append(rel)
+                    else:
+                        skipped_files += 1
+                        skipped_bytes += st.st_size
+                    continue
+                kind = "link" if is_link else "dir" if is_dir else "file"
+                entries.append(ScanEntry(rel, de.path, kind, st.st_size if kind == "file" else 0,
+                                         st.st_mtime, st.st_mode & 0o7777))
+                if is_dir:
+                    subdirs.append((de.path, rel))
+        return entries, subdirs, skipped_files, skipped_bytes, pruned
+
+    def scan(self) -> list:
+        """
+        Return every kept entry sorted by path (parents before children).
+        Stats land in self.stats; bytes under pruned directories are not
+        counted because they are never walked.
+        """
+        start = time.perf_counter()
+        entries, pruned = [], []
+        skipped_files = skipped_bytes = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            pending = {pool.submit(self._scan_dir, self.root, "")}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    found, subdirs, s_files, s_bytes, s_pruned = future.result()
+                    entries.extend(found)
+                    skipped_files += s_files
+                    skipped_bytes += s_bytes
+                    pruned.extend(s_pruned)
+                    for path, rel in subdirs:
+                        pending.add(pool.submit(self._scan_dir, path, rel))
+
+        entries.sort(key=lambda e: e.rel)
+        files = [e for e in entries if e.kind == "file"]
+        self.stats = {
+            "files": len(files),
+            "bytes": sum(e.size for e in files),
+            "dirs": sum(1 for e in entries if e.kind == "dir"),
+            "skipped_files": skipped_files,
+            "skipped_bytes": skipped_bytes,
+            "pruned_dirs": sorted(pruned),
+            "seconds": time.perf_counter() - start,
+        }
+        return entries
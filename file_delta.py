@@ -0,0 +1,257 @@
+"""
+File Delta - rsync-Style Rolling-Checksum Deltas.
+
+The receiver describes the copy it already has as a signature: one
+(weak, strong) checksum pair per fixed-size block. The sender slides a
+window over its new version one byte at a time, rolling the weak
+checksum in O(1) per step, and wherever the weak and then the strong
+checksum match a block it emits a reference to that block instead of
+the bytes. Only changed regions travel as literals, so a small edit to a
+large file costs a few blocks, not the file.
+
+Weak checksums are zlib's Adler-32 (computed in C at every resync point,
+rolled in Python between them); strong ones are 16-byte BLAKE2b. Rolling
+is bounded by ROLL_BUDGET bytes per unmatched run; past that (a region
+rewritten wholesale) only block-aligned matches are tried until a block
+matches again.
+
+Wire encoding of the delta ops:
+
+    b"C" + !QI           copy `count` blocks of the basis from block `first`
+    b"L" + !I + bytes    literal data
+"""
+
+import os
+import mmap
+import zlib
+import struct
+import hashlib
+
+MIN_BLOCK = 2048
+MAX_BLOCK = 64 * 1024
+LITERAL_MAX = 60 * 1024
+ROLL_BUDGET = 4 * 1024 * 1024
+
+_SIG = struct.Struct("!I16s")
+_COPY = struct.Struct("!cQI")
+_LIT = struct.Struct("!cI")
+_MOD = 65521
+
+
+def block_size_for(size: int) -> int:
+    """rsync's heuristic: about sqrt(size), clamped, rounded to 1 KiB."""
+    return max(MIN_BLOCK, min(MAX_BLOCK, int(size ** 0.5) // 1024 * 1024))
+
+
+def _strong(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _map(f):
+    size = os.fstat(f.fileno()).st_size
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+
+
+def signature(path: str, block_size: int = None) -> tuple:
+    """(block_size, signature bytes) of the basis at `path` (empty if missing)."""
+    if not os.path.exists(path):
+        return block_size or MIN_BLOCK, b""
+    block_size = block_size or block_size_for(os.path.getsize(path))
+    out = bytearray()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            out += _SIG.pack(zlib.adler32(block), _strong(block))
+    return block_size, bytes(out)
+
+
+def _parse_signature(sig: bytes) -> dict:
+    blocks = {}
+    for index, (weak, strong) in enumerate(_SIG.iter_unpack(sig)):
+        blocks.setdefault(weak, {}).setdefault(strong, index)
+    return blocks
+
+
+def delta(path: str, block_size: int, sig: bytes, stats: dict = None):
+    """
+    Yield encoded ops that turn the signed basis into the file at `path`.
+    `stats` (if given) receives copied_bytes / literal_bytes.
+    """
+    stats = stats if stats is not None else {}
+    stats.update(copied_bytes=0, literal_bytes=0)
+    blocks = _parse_signature(sig)
+    with open(path, "rb") as f:
+        data = _map(f)
+        try:
+            yield from _delta(data, len(data), block_size, blocks, stats)
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
+
+
+def _literal(data, start: int, end: int, stats: dict):
+    for i in range(start, end, LITERAL_MAX):
+        piece = data[i:min(end, i + LITERAL_MAX)]
+        stats["literal_bytes"] += len(piece)
+        yield _LIT.pack(b"L", len(piece)) + piece
+
+
+def _delta(data, n: int, size: int, blocks: dict, stats: dict):
+    run_first, run_count = None, 0
+    literal_from = p = 0
+    rolled = 0
+    fresh = True
+    a = b = 0
+    while blocks and p + size <= n:
+        if fresh:
+            weak = zlib.adler32(data[p:p + size])
+            a, b = weak & 0xFFFF, weak >> 16
+            fresh = False
+        candidates = blocks.get((b << 16) | a)
+        index = candidates.get(_strong(data[p:p + size])) if candidates else None
+        if index is not None:
+            yield from _literal(data, literal_from, p, stats)
+            if run_first is not None and index == run_first + run_count:
+                run_count += 1
+            else:
+                if run_first is not None:
+                    yield _COPY.pack(b"C", run_first, run_count)
+                run_first, run_count = index, 1
+            stats["copied_bytes"] += size
+            p += size
+            literal_from = p
+            fresh = True
+            rolled = 0
+            continue
+        if run_first is not None:
+            yield _COPY.pack(b"C", run_first, run_count)
+            run_first = None
+        if rolled >= ROLL_BUDGET:
+            # Mostly new content: stop rolling, only try block-aligned spots
+            p += size
+            fresh = True
+            continue
+        if p + size >= n:
+            break
+        out, new = data[p], data[p + size]
+        a = (a - out + new) % _MOD
+        b = (b - size * out + a - 1) % _MOD
+        p += 1
+        rolled += 1
+    if run_first is not None:
+        yield _COPY.pack(b"C", run_first, run_count)
+    yield from _literal(data, literal_from, n, stats)
+
+
+class Patcher:
+    """Applies a stream of encoded ops (fed in arbitrary pieces) to a basis."""
+
+    def __init__(self, basis_path: str, out, block_size: int):
+        self.basis = open(basis_path, "rb") if basis_path and os.path.exists(basis_path) else None
+        self.out = out
+        self.block_size = block_size
+        self._buf = bytearray()
+        self.written = 0
+
+    def feed(self, data: bytes):
+        self._buf += data
+        buf = self._buf
+        pos = 0
+        while pos < len(buf):
+            op = buf[pos:pos + 1]
+            if op == b"C":
+                if len(buf) - pos < _COPY.size:
+                    break
+                _, first, count = _COPY.unpack_from(buf, pos)
+                pos += _COPY.size
+                self._copy(first, count)
+            elif op == b"L":
+                if len(buf) - pos < _LIT.size:
+                    break
+                _, length = _LIT.unpack_from(buf, pos)
+                if len(buf) - pos - _LIT.size < length:
+                    break
+                start = pos + _LIT.size
+                self.out.write(buf[start:start + length])
+                self.written += length
+                pos = start + length
+            else:
+                raise ValueError(f"Corrupt delta: unknown op {op!r}")
+        del buf[:pos]
+
+    def _copy(self, first: int, count: int):
+        if self.basis is None:
+            raise ValueError("Delta references a basis that does not exist")
+        self.basis.seek(first * self.block_size)
+        remaining = count * self.block_size
+        while remaining:
+            chunk = self.basis.read(min(remaining, 1024 * 1024))
+            if not chunk:
+                break  # the basis' last block may be short
+            self.out.write(chunk)
+            self.written += len(chunk)
+            remaining -= len(chunk)
+
+    def close(self):
+        if self._buf:
+            raise ValueError("Delta ended mid-op")
+        if self.basis:
+            self.basis.close()
+
+
+def benchmark_delta(size_mb: int = 64, edits: int = 3) -> dict:
+    """Delta size and speed for a large file with a few small edits."""
+    import time
+    import random
+    import tempfile
+
+    rnd = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        old, new, out = (os.path.join(tmp, n) for n in ("old.bin", "new.bin", "out.bin"))
+        data = bytearray(rnd.randbytes(size_mb * 1024 * 1024))
+        with open(old, "wb") as f:
+            f.write(data)
+        for _ in range(edits):
+            at = rnd.randrange(len(data))
+            data[at:at] = b"inserted line of text\n"  # shifts everything after it
+            at = rnd.randrange(len(data))
+            data[at:at + 100] = rnd.randbytes(100)
+        with open(new, "wb") as f:
+            f.write(data)
+
+        start = time.perf_counter()
+        block, sig = signature(old)
+        sig_s = time.perf_counter() - start
+        stats = {}
+        start = time.perf_counter()
+        ops = list(delta(new, block, sig, stats))
+        delta_s = time.perf_counter() - start
+        start = time.perf_counter()
+        with open(out, "wb") as f:
+            patcher = Patcher(old, f, block)
+            for op in ops:
+                patcher.feed(op)
+            patcher.close()
+        patch_s = time.perf_counter() - start
+        with open(out, "rb") as f:
+            assert f.read() == bytes(data), "patched file differs"
+
+    return {"file_bytes": len(data), "block": block, "signature_bytes": len(sig), "delta_bytes": sum(map(len, ops)),
+            "literal_bytes": stats["literal_bytes"], "signature_s": sig_s, "delta_s": delta_s, "patch_s": patch_s}
+
+
+if __name__ == "__main__":
+    import sys
+    from rich.console import Console
+    from rich.table import Table
+
+    mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    r = benchmark_delta(mb)
+    table = Table(title=f"File Delta :: {mb} MB file, 3 insertions + 3 overwrites")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right", style="bold green")
+    table.add_row("Block size", f"{r['block']} B")
+    table.add_row("Signature", f"{r['signature_bytes'] / 1024:.0f} KiB in {r['signature_s']:.2f}s")
+    table.add_row("Delta", f"{r['delta_bytes'] / 1024:.1f} KiB ({r['literal_bytes']} literal B) in {r['delta_s']:.2f}s")
+    table.add_row("Patch", f"{r['patch_s']:.2f}s")
+    table.add_row("Sent vs file", f"{(r['signature_bytes'] + r['delta_bytes']) / r['file_bytes'] * 100:.2f}%")
+    Console().print(table)
@@ -0,0 +1,51 @@
+"""
+Local DB - Shared SQLite Conventions for ~/.shortcut Stores.
+
+Every local store (mesh inbox, Pidgeon, spool, stats) opens its database
+through `connect()` so they all get the same settings: WAL journaling
+(readers never block the writer), a busy timeout instead of immediate
+"database is locked" errors, and rows addressable by column name.
+"""
+
+import os
+import sqlite3
+import contextlib
+
+BUSY_TIMEOUT_MS = 5000
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Open (creating if needed) a SQLite database with the shared settings."""
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Autocommit mode; multi-statement writes go through transaction()
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000, isolation_level=None,
+                           check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+@contextlib.contextmanager
+def transaction(conn: sqlite3.Connection):
+    """BEGIN IMMEDIATE ... COMMIT, rolled back on any exception."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def migrate(conn: sqlite3.Connection, migrations: list):
+    """
+    Apply schema migrations in order, tracked by PRAGMA user_version.
+    `migrations[i]` is the SQL script that takes the schema to version i+1.
+    """
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    for i, script in enumerate(migrations[version:], start=version + 1):
+        conn.executescript(f"BEGIN; {script}; PRAGMA user_version = {i}; COMMIT;")
@@ -0,0 +1,50 @@
+"""
+Mesh Auth - Shared-Key Challenge/Response Between Your Own Machines.
+
+Pidgeon daemons and Connect sessions only talk to peers holding the same
+mesh key (~/.shortcut/mesh.key, created by the first daemon you start;
+copy it to your other machines). The listening side sends a fresh nonce
+and the connecting side answers with an HMAC-SHA256 of that nonce and
+the fields it is vouching for, so the key never crosses the wire and a
+captured proof cannot be replayed against another nonce.
+"""
+
+import os
+import hmac
+import hashlib
+import secrets
+
+MESH_KEY_PATH = os.path.expanduser("~/.shortcut/mesh.key")
+
+
+def load_key(path: str = MESH_KEY_PATH, create: bool = False) -> bytes:
+    """The shared mesh key, or None if there is none (generated first if `create`)."""
+    try:
+        with open(path, "r") as f:
+            return bytes.fromhex(f.read().strip())
+    except FileNotFoundError:
+        if not create:
+            return None
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        return load_key(path)  # another daemon created it first
+    key = secrets.token_bytes(32)
+    with os.fdopen(fd, "w") as f:
+        f.write(key.hex() + "\n")
+    return key
+
+
+def new_nonce() -> str:
+    return secrets.token_hex(16)
+
+
+def prove(key: bytes, nonce: str, *fields) -> str:
+    """Answer to `nonce`, bound to `fields` so the proof cannot vouch for anything else."""
+    message = "\0".join([nonce, *(str(field) for field in fields)]).encode()
+    return hmac.new(key, message, hashlib.sha256).hexdigest()
+
+
+def verify(key: bytes, nonce: str, proof, *fields) -> bool:
+    return isinstance(proof, str) and hmac.compare_digest(prove(key, nonce, *fields), proof)
@@ -0,0 +1,151 @@
+"""
+Mesh Inbox - Indexed Store of Delivered Artifacts.
+
+Every artifact that lands in ~/.shortcut/mesh_inbox (local delivery or a
+mesh daemon transfer) gets a row in an SQLite index next to it: sender,
+ghost identity, size, content hash, arrival time and read state.
+Re-delivering the same content to the same ghost bumps a counter instead
+of adding a duplicate. Listing, "unread" and lookups by name or hash all
+run off indexes, so they stay fast with thousands of items.
+"""
+
+import os
+import time
+import hashlib
+
+from local_db import connect, migrate, transaction
+
+MESH_INBOX_DIR = os.path.expanduser("~/.shortcut/mesh_inbox")
+INDEX_NAME = ".index.db"
+
+_MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS items (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        path TEXT NOT NULL,
+        sender TEXT,
+        ghost TEXT NOT NULL DEFAULT '',
+        size INTEGER NOT NULL,
+        sha256 TEXT NOT NULL,
+        arrived_at REAL NOT NULL,
+        last_seen_at REAL NOT NULL,
+        deliveries INTEGER NOT NULL DEFAULT 1,
+        read INTEGER NOT NULL DEFAULT 0,
+        strategy TEXT
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS items_content ON items (sha256, ghost);
+    CREATE INDEX IF NOT EXISTS items_arrived ON items (arrived_at, id);
+    CREATE INDEX IF NOT EXISTS items_unread ON items (read, arrived_at, id);
+    CREATE INDEX IF NOT EXISTS items_sender ON items (sender, arrived_at, id);
+    CREATE INDEX IF NOT EXISTS items_name ON items (name, arrived_at);
+    CREATE INDEX IF NOT EXISTS items_path ON items (path)
+    """,
+]
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class MeshInbox:
+    """Index over one inbox directory (default: the local mesh inbox)."""
+
+    def __init__(self, inbox_dir: str = MESH_INBOX_DIR):
+        self.inbox_dir = inbox_dir
+        self.conn = connect(os.path.join(inbox_dir, INDEX_NAME))
+        migrate(self.conn, _MIGRATIONS)
+
+    def record(self, path: str, sender: str = None, ghost: str = None, sha256: str = None,
+               strategy: str = None) -> tuple:
+        """
+        Index a delivered artifact. Returns (item id, is_new); a repeat
+        delivery of the same content to the same ghost is folded into the
+        existing row (its read state is kept).
+        """
+        path = os.path.abspath(path)
+        now = time.time()
+        sha256 = sha256 or _sha256(path)
+        with transaction(self.conn):
+            # Same file name, new content: the old bytes are gone from disk
+            self.conn.execute("DELETE FROM items WHERE path = ? AND sha256 != ?", (path, sha256))
+            row = self.conn.execute(
+                """
+                INSERT INTO items (name, path, sender, ghost, size, sha256, arrived_at, last_seen_at, strategy)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (sha256, ghost) DO UPDATE SET
+                    deliveries = deliveries + 1, last_seen_at = excluded.arrived_at,
+                    name = excluded.name, path = excluded.path, strategy = excluded.strategy
+                RETURNING id, deliveries
+                """,
+                (os.path.basename(path), path, sender, ghost or "", os.path.getsize(path), sha256,
+                 now, now, strategy),
+            ).fetchall()[0]
+        return row["id"], row["deliveries"] == 1
+
+    def list(self, unread: bool = False, sender: str = None, limit: int = 50,
+             before: tuple = None) -> list:
+        """
+        Newest first. `before` is the (arrived_at, id) of the last row of
+        the previous page (keyset pagination, no OFFSET scans).
+        """
+        clauses, params = [], []
+        if unread:
+            clauses.append("read = 0")
+        if sender:
+            clauses.append("sender = ?")
+            params.append(sender)
+        if before:
+            clauses.append("(arrived_at, id) < (?, ?)")
+            params.extend(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return [dict(r) for r in self.conn.execute(
+            f"SELECT * FROM items {where} ORDER BY arrived_at DESC, id DESC LIMIT ?", (*params, limit))]
+
+    def find(self, ref: str) -> dict:
+        """Latest item matching an id, a file name, or a sha256 prefix (>= 8 chars)."""
+        if ref.isdigit():
+            row = self.conn.execute("SELECT * FROM items WHERE id = ?", (int(ref),)).fetchone()
+            if row:
+                return dict(row)
+        row = self.conn.execute(
+            "SELECT * FROM items WHERE name = ? ORDER BY arrived_at DESC LIMIT 1", (ref,)).fetchone()
+        if row is None and len(ref) >= 8:
+            row = self.conn.execute(
+                "SELECT * FROM items WHERE sha256 >= ? AND sha256 < ? ORDER BY arrived_at DESC LIMIT 1",
+                (ref.lower(), ref.lower() + "g")).fetchone()
+        return dict(row) if row else None
+
+    def mark_read(self, item_id: int, read: bool = True):
+        self.conn.execute("UPDATE items SET read = ? WHERE id = ?", (int(read), item_id))
+
+    def unread_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM items WHERE read = 0").fetchone()[0]
+
+    def rescan(self) -> dict:
+        """
+        Reconcile the index with the directory: index artifacts that were
+        dropped in without going through Pidgeon, forget ones deleted since.
+        """
+        indexed = {r["path"]: r["id"] for r in self.conn.execute("SELECT id, path FROM items")}
+        gone = [item_id for path, item_id in indexed.items() if not os.path.exists(path)]
+        self.conn.executemany("DELETE FROM items WHERE id = ?", [(i,) for i in gone])
+
+        added = duplicates = 0
+        with os.scandir(self.inbox_dir) as it:
+            for entry in it:
+                if not entry.is_file() or entry.name.startswith(".") or ".part" in entry.name \
+                        or os.path.abspath(entry.path) in indexed:
+                    continue
+                sha256 = _sha256(entry.path)
+                # A stray copy of content already indexed is a duplicate, not a new item
+                if self.conn.execute("SELECT 1 FROM items WHERE sha256 = ?", (sha256,)).fetchone():
+                    duplicates += 1
+                    continue
+                self.record(entry.path, sha256=sha256, strategy="rescan")
+                added += 1
+        return {"added": added, "removed": len(gone), "duplicates": duplicates}
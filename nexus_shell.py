@@ -59,7 +59,7 @@ class NexusShell:
                         
                         if type_code == "SED": self.current_workspace["seeds"].append(human_name)
                         elif type_code == "CTX": self.current_workspace["contexts"].append(human_name)
-                        elif type_code == "LGC": self.current_workspace["logistics"].append(human_name)
+                        elif type_code in ("LGC", "DLT"): self.current_workspace["logistics"].append(human_name)
                         elif type_code == "MSH": self.current_workspace["mesh"].append(human_name)
                 elif not item.startswith(".") and item not in ["venv", "__pycache__", "quarantine", "Setup-Yukora.ps1", "test_volatile_mind.py"]:
                     self.current_workspace["inertia"].append(item)
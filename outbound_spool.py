@@ -0,0 +1,297 @@
+"""
+Outbound Spool - Persistent Job Queue for Bridge & Pidgeon Deliveries.
+
+`bridge ship` (and `pidgeon send --queue`) write a job into an SQLite
+spool and return at once. A worker leases jobs, runs them on a bounded
+thread pool and marks them done, or schedules a retry with exponential
+backoff. A lease that is not renewed (the worker died) expires and the
+job is handed out again, so delivery is at-least-once and survives
+crashes. Jobs that exhaust their attempts stay in the spool as failed
+until `pidgeon queue retry`.
+
+    python outbound_spool.py work [--until-empty]   # foreground worker
+    python outbound_spool.py status
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from local_db import connect, migrate, transaction
+
+SPOOL_PATH = os.path.expanduser("~/.shortcut/spool/outbound.db")
+DEFAULT_CONCURRENCY = 4
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 5
+POLL_SECONDS = 1.0
+# A worker whose heartbeat is older than this is presumed dead
+HEARTBEAT_STALE = 15
+
+_MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        state TEXT NOT NULL DEFAULT 'queued',
+        attempts INTEGER NOT NULL DEFAULT 0,
+        max_attempts INTEGER NOT NULL,
+        next_run_at REAL NOT NULL,
+        lease_until REAL,
+        worker TEXT,
+        created_at REAL NOT NULL,
+        finished_at REAL,
+        last_error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, next_run_at);
+    CREATE INDEX IF NOT EXISTS jobs_lease ON jobs (state, lease_until);
+    CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at);
+    CREATE TABLE IF NOT EXISTS workers (
+        name TEXT PRIMARY KEY,
+        pid INTEGER NOT NULL,
+        started_at REAL NOT NULL,
+        heartbeat_at REAL NOT NULL
+    )
+    """,
+]
+
+
+class OutboundSpool:
+    """The spool database. Safe to share between processes."""
+
+    def __init__(self, path: str = SPOOL_PATH):
+        self.path = path
+        self.conn = connect(path)
+        migrate(self.conn, _MIGRATIONS)
+
+    def enqueue(self, kind: str, payload: dict, max_attempts: int = MAX_ATTEMPTS) -> int:
+        now = time.time()
+        cur = self.conn.execute(
+            "INSERT INTO jobs (kind, payload, max_attempts, next_run_at, created_at) VALUES (?, ?, ?, ?, ?)",
+            (kind, json.dumps(payload), max_attempts, now, now))
+        return cur.lastrowid
+
+    def claim(self, worker: str, limit: int, lease: float = LEASE_SECONDS) -> list:
+        """Lease up to `limit` runnable jobs (queued and due, or with an expired lease)."""
+        now = time.time()
+        with transaction(self.conn):
+            rows = self.conn.execute(
+                """
+                UPDATE jobs SET state = 'leased', lease_until = ?, worker = ?, attempts = attempts + 1
+                WHERE id IN (
+                    SELECT id FROM jobs WHERE state = 'queued' AND next_run_at <= ?
+                    UNION ALL
+                    SELECT id FROM jobs WHERE state = 'leased' AND lease_until < ?
+                    LIMIT ?)
+                RETURNING id, kind, payload, attempts, max_attempts
+                """, (now + lease, worker, now, now, limit)).fetchall()
+        return [{**dict(r), "payload": json.loads(r["payload"])} for r in rows]
+
+    def renew(self, job_ids: list, worker: str, lease: float = LEASE_SECONDS):
+        self.conn.executemany("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND state = 'leased'",
+                              [(time.time() + lease, i, worker) for i in job_ids])
+
+    def complete(self, job_id: int):
+        self.conn.execute("UPDATE jobs SET state = 'done', finished_at = ?, lease_until = NULL, last_error = NULL "
+                          "WHERE id = ?", (time.time(), job_id))
+
+    def fail(self, job: dict, error: str):
+        """Schedule a retry with exponential backoff, or give up after max_attempts."""
+        now = time.time()
+        if job["attempts"] >= job["max_attempts"]:
+            self.conn.execute("UPDATE jobs SET state = 'failed', finished_at = ?, lease_until = NULL, last_error = ? "
+                              "WHERE id = ?", (now, error, job["id"]))
+        else:
+            delay = RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1)
+            self.conn.execute("UPDATE jobs SET state = 'queued', next_run_at = ?, lease_until = NULL, last_error = ? "
+                              "WHERE id = ?", (now + delay, error, job["id"]))
+
+    def retry_failed(self) -> int:
+        """Put every failed job back in the queue with a fresh attempt budget."""
+        cur = self.conn.execute("UPDATE jobs SET state = 'queued', attempts = 0, next_run_at = ?, finished_at = NULL "
+                                "WHERE state = 'failed'", (time.time(),))
+        return cur.rowcount
+
+    def purge_done(self, older_than: float = 7 * 86400) -> int:
+        cur = self.conn.execute("DELETE FROM jobs WHERE state = 'done' AND finished_at < ?",
+                                (time.time() - older_than,))
+        return cur.rowcount
+
+    def heartbeat(self, worker: str):
+        now = time.time()
+        self.conn.execute(
+            """
+            INSERT INTO workers (name, pid, started_at, heartbeat_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (name) DO UPDATE SET heartbeat_at = excluded.heartbeat_at
+            """, (worker, os.getpid(), now, now))
+
+    def retire(self, worker: str):
+        self.conn.execute("DELETE FROM workers WHERE name = ?", (worker,))
+
+    def live_workers(self) -> list:
+        """Workers with a recent heartbeat, minus any on this host whose process is gone (e.g. killed)."""
+        import psutil
+        host = socket.gethostname()
+        workers = [dict(r) for r in self.conn.execute(
+            "SELECT * FROM workers WHERE heartbeat_at > ? ORDER BY started_at", (time.time() - HEARTBEAT_STALE,))]
+        return [w for w in workers if w["name"].rpartition(":")[0] != host or psutil.pid_exists(w["pid"])]
+
+    def status(self) -> dict:
+        """Depth per state, throughput over the last minute/hour, recent failures."""
+        now = time.time()
+        counts = {r["state"]: r["n"] for r in self.conn.execute(
+            "SELECT state, COUNT(*) AS n FROM jobs GROUP BY state")}
+        oldest = self.conn.execute(
+            "SELECT MIN(created_at) FROM jobs WHERE state IN ('queued', 'leased')").fetchone()[0]
+        done_1m, done_1h, latency = self.conn.execute(
+            "SELECT SUM(finished_at > ?), COUNT(*), AVG(finished_at - created_at) FROM jobs "
+            "WHERE state = 'done' AND finished_at > ?", (now - 60, now - 3600)).fetchone()
+        failures = [dict(r) for r in self.conn.execute(
+            "SELECT id, kind, attempts, last_error, state FROM jobs WHERE last_error IS NOT NULL "
+            "AND state != 'done' ORDER BY COALESCE(finished_at, next_run_at) DESC LIMIT 10")]
+        return {
+            "queued": counts.get("queued", 0), "leased": counts.get("leased", 0),
+            "done": counts.get("done", 0), "failed": counts.get("failed", 0),
+            "oldest_pending_age": now - oldest if oldest else None,
+            "done_last_minute": done_1m or 0, "done_last_hour": done_1h or 0,
+            "avg_latency": latency, "recent_failures": failures, "workers": self.live_workers(),
+        }
+
+
+# --- job handlers ---------------------------------------------------------
+
+_local = threading.local()
+
+
+def _pidgeon():
+    # One Pidgeon (and store connection) per worker thread
+    if not hasattr(_local, "pidgeon"):
+        from pidgeon import Pidgeon
+        _local.pidgeon = Pidgeon()
+    return _local.pidgeon
+
+
+def _run_pidgeon(payload: dict, spool: "OutboundSpool"):
+    if not _pidgeon().send_pidgeon(payload["to"], payload["subject"], payload["body"]):
+        raise RuntimeError(f"SMTP delivery to {payload['to']} failed")
+
+
+def _run_ship(payload: dict, spool: "OutboundSpool"):
+    from bridge_engine import BridgeEngine
+    ok = BridgeEngine().ship_workflow(payload["source_path"], payload["recipient"], dedup=payload.get("dedup", False),
+                                      full=payload.get("full", False), peer=payload.get("peer"),
+                                      output_dir=payload.get("output_dir"), spool=spool)
+    if not ok:
+        raise RuntimeError(f"Shipment of {payload['source_path']} to {payload['recipient']} failed")
+
+
+HANDLERS = {"pidgeon": _run_pidgeon, "ship": _run_ship}
+
+
+class SpoolWorker:
+    """Drains the spool with at most `concurrency` jobs running at once."""
+
+    def __init__(self, spool: OutboundSpool = None, concurrency: int = DEFAULT_CONCURRENCY,
+                 lease: float = LEASE_SECONDS, handlers: dict = None):
+        self.spool = spool or OutboundSpool()
+        self.concurrency = concurrency
+        self.lease = lease
+        self.handlers = handlers or HANDLERS
+        self.name = f"{socket.gethostname()}:{os.getpid()}"
+        self.stats = {"done": 0, "retried": 0, "failed": 0}
+
+    def _run(self, job: dict):
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            raise ValueError(f"No handler for job kind {job['kind']!r}")
+        # Handlers get their own spool connection: they may enqueue follow-ups
+        handler(job["payload"], OutboundSpool(self.spool.path))
+
+    def run(self, until_empty: bool = False, stop: threading.Event = None) -> dict:
+        stop = stop or threading.Event()
+        running = {}
+        last_beat = 0.0
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                while not stop.is_set():
+                    now = time.time()
+                    if now - last_beat > HEARTBEAT_STALE / 3:
+                        self.spool.heartbeat(self.name)
+                        self.spool.renew([job["id"] for job in running.values()], self.name, self.lease)
+                        last_beat = now
+
+                    free = self.concurrency - len(running)
+                    if free:
+                        for job in self.spool.claim(self.name, free, self.lease):
+                            running[pool.submit(self._run, job)] = job
+
+                    if not running:
+                        if until_empty and not self._pending():
+                            # Retire first, then look again: a job enqueued before the
+                            # retire saw us alive and started no worker of its own
+                            self.spool.retire(self.name)
+                            if not self._pending():
+                                break
+                            last_beat = 0.0
+                            continue
+                        stop.wait(POLL_SECONDS)
+                        continue
+
+                    done, _ = wait(running, timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job = running.pop(future)
+                        error = future.exception()
+                        if error is None:
+                            self.spool.complete(job["id"])
+                            self.stats["done"] += 1
+                        else:
+                            self.spool.fail(job, f"{error.__class__.__name__}: {error}")
+                            self.stats["failed" if job["attempts"] >= job["max_attempts"] else "retried"] += 1
+        finally:
+            self.spool.retire(self.name)
+        return self.stats
+
+    def _pending(self) -> bool:
+        return self.spool.conn.execute(
+            "SELECT 1 FROM jobs WHERE state IN ('queued', 'leased') LIMIT 1").fetchone() is not None
+
+
+def ensure_background_worker(spool: OutboundSpool = None) -> bool:
+    """
+    Start a detached worker (draining until the spool is empty) unless one
+    is alive already. Returns True if a worker was started.
+    """
+    spool = spool or OutboundSpool()
+    if spool.live_workers():
+        return False
+    kwargs = {"stdin": subprocess.DEVNULL, "stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL,
+              "cwd": os.path.dirname(os.path.abspath(__file__))}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    subprocess.Popen([sys.executable, os.path.abspath(__file__), "work", "--until-empty", "--spool", spool.path],
+                     **kwargs)
+    return True
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Outbound spool worker")
+    parser.add_argument("command", choices=["work", "status"])
+    parser.add_argument("--until-empty", action="store_true")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--spool", default=SPOOL_PATH)
+    args = parser.parse_args()
+
+    if args.command == "work":
+        SpoolWorker(OutboundSpool(args.spool), args.concurrency).run(until_empty=args.until_empty)
+    else:
+        print(json.dumps(OutboundSpool(args.spool).status(), indent=2))
@@ -0,0 +1,294 @@
+"""
+Output Capture - Bounded Streaming Capture for Child Processes.
+
+A script's stdout and stderr are read incrementally, a chunk at a time
+as the data arrives, and never accumulated whole. Chunks are split into
+lines (a line longer than MAX_LINE is cut into pieces, so a script that
+never prints a newline cannot grow memory either), and each line goes to:
+
+- a RingBuffer of the most recent lines: the live tail the TUI renders
+  and the context shown when a script fails;
+- a RotatingLog on disk with the full output, rotated at max_bytes
+  with `backups` older files kept. Each run gets its own log (named by
+  start time and pid, the newest LOG_RUNS kept per script), so
+  concurrent runs of one script never write into the same file;
+- an optional on_line callback (the runner's prefixed console output).
+
+Memory per capture is bounded by the tail plus one partial line per
+stream, no matter how much the script prints.
+
+start_pumps() drains a process's pipes: one thread selecting over
+non-blocking pipes on POSIX, one blocking reader thread per pipe on
+Windows, where pipes cannot be selected.
+"""
+
+import os
+import re
+import time
+import threading
+import selectors
+from collections import deque
+
+LOG_DIR = os.path.expanduser("~/.shortcut/logs/scripts")
+CHUNK = 64 * 1024
+MAX_LINE = 8 * 1024
+TAIL_LINES = 200
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+LOG_RUNS = 20
+
+
+class RingBuffer:
+    """The last `capacity` items. Appends are O(1) and thread-safe; older items fall off."""
+
+    def __init__(self, capacity: int = TAIL_LINES):
+        self._items = deque(maxlen=capacity)
+        self.total = 0
+
+    def append(self, item):
+        self._items.append(item)
+        self.total += 1
+
+    def skip(self, count: int):
+        """Count items that went past without being kept."""
+        self.total += count
+
+    @property
+    def capacity(self) -> int:
+        return self._items.maxlen
+
+    def snapshot(self) -> list:
+        return list(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def dropped(self) -> int:
+        return self.total - len(self._items)
+
+
+class RotatingLog:
+    """Append-only log file rotated to path.1 .. path.N once it reaches max_bytes."""
+
+    def __init__(self, path: str, max_bytes: int = LOG_MAX_BYTES, backups: int = LOG_BACKUPS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "ab")
+        self._size = self._file.tell()
+
+    def write(self, data: bytes):
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._size += len(data)
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, "wb")
+        self._size = 0
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class _LineSplitter:
+    def __init__(self):
+        self.partial = bytearray()
+
+    def feed(self, data: bytes) -> list:
+        pieces = data.split(b"\n")
+        self.partial += pieces[0]
+        if len(pieces) == 1:
+            return self._cut()
+        lines = [bytes(self.partial), *pieces[1:-1]]
+        self.partial = bytearray(pieces[-1])
+        out = []
+        for line in lines:
+            out.extend(line[i:i + MAX_LINE] for i in range(0, max(len(line), 1), MAX_LINE))
+        return out + self._cut()
+
+    def _cut(self) -> list:
+        out = []
+        while len(self.partial) >= MAX_LINE:
+            out.append(bytes(self.partial[:MAX_LINE]))
+            del self.partial[:MAX_LINE]
+        return out
+
+    def flush(self) -> list:
+        rest, self.partial = bytes(self.partial), bytearray()
+        return [rest] if rest else []
+
+
+class OutputCapture:
+    """
+    Fan a process's output out to the tail, the log and `on_line(stream,
+    line)`. Feed it raw chunks; call close() once the pipes are drained.
+    """
+
+    def __init__(self, name: str, log_path: str = None, tail_lines: int = TAIL_LINES, on_line=None,
+                 max_bytes: int = LOG_MAX_BYTES, backups: int = LOG_BACKUPS):
+        self.name = name
+        self.tail = RingBuffer(tail_lines)
+        self.log = RotatingLog(log_path, max_bytes, backups) if log_path else None
+        self.on_line = on_line
+        self.lines = 0
+        self.bytes = 0
+        self._splitters = {"stdout": _LineSplitter(), "stderr": _LineSplitter()}
+        self._lock = threading.Lock()
+        if self.log:
+            self.log.write(f"=== {name} :: {time.strftime('%Y-%m-%d %H:%M:%S')} ===\n".encode())
+
+    def feed(self, stream: str, data: bytes):
+        with self._lock:
+            self.bytes += len(data)
+            self._emit(stream, self._splitters[stream].feed(data))
+
+    def _emit(self, stream: str, lines: list):
+        if not lines:
+            return
+        self.lines += len(lines)
+        if self.log:
+            prefix = b"[stderr] " if stream == "stderr" else b""
+            self.log.write(b"".join(prefix + raw + b"\n" for raw in lines))
+        # Without a per-line listener only the lines that can stay in the tail need decoding
+        shown = lines if self.on_line else lines[-self.tail.capacity:]
+        self.tail.skip(len(lines) - len(shown))
+        for raw in shown:
+            line = raw.decode("utf-8", errors="replace").rstrip("\r")
+            self.tail.append((stream, line))
+            if self.on_line:
+                self.on_line(stream, line)
+
+    def close(self):
+        with self._lock:
+            for stream, splitter in self._splitters.items():
+                self._emit(stream, splitter.flush())
+            if self.log:
+                self.log.close()
+
+
+def log_path_for(name: str, log_dir: str = LOG_DIR, started_at: float = None, pid: int = None) -> str:
+    """The log of one run: <name>.<YYYYmmdd-HHMMSS>-<pid>.log."""
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(started_at or time.time()))
+    return os.path.join(log_dir, f"{name}.{stamp}-{pid or os.getpid()}.log")
+
+
+def prune_logs(name: str, log_dir: str = LOG_DIR, keep: int = LOG_RUNS) -> int:
+    """Delete all but the `keep` newest run logs of `name` (with their rotations). Returns files removed."""
+    pattern = re.compile(re.escape(name) + r"\.(\d{8}-\d{6}-\d+)\.log(\.\d+)?$")
+    try:
+        names = os.listdir(log_dir)
+    except OSError:
+        return 0
+    runs = {}
+    for entry in names:
+        match = pattern.match(entry)
+        if match:
+            runs.setdefault(match.group(1), []).append(entry)
+    removed = 0
+    for run in sorted(runs, key=lambda r: (r[:15], int(r[16:])))[:-keep or None]:
+        for entry in runs[run]:
+            try:
+                os.remove(os.path.join(log_dir, entry))
+                removed += 1
+            except OSError:
+                pass  # still open by a run on Windows: pruned next time
+    return removed
+
+
+def _select_pump(pipes: dict, capture: OutputCapture):
+    selector = selectors.DefaultSelector()
+    for name, pipe in pipes.items():
+        os.set_blocking(pipe.fileno(), False)
+        selector.register(pipe, selectors.EVENT_READ, name)
+    while selector.get_map():
+        for key, _ in selector.select():
+            try:
+                data = os.read(key.fd, CHUNK)
+            except BlockingIOError:
+                continue
+            if data:
+                capture.feed(key.data, data)
+            else:
+                selector.unregister(key.fileobj)
+                key.fileobj.close()
+    selector.close()
+
+
+def _read_pump(name: str, pipe, capture: OutputCapture):
+    for data in iter(lambda: os.read(pipe.fileno(), CHUNK), b""):
+        capture.feed(name, data)
+    pipe.close()
+
+
+def start_pumps(proc, capture: OutputCapture) -> list:
+    """Start draining proc.stdout/stderr into `capture`; join the returned threads before close()."""
+    pipes = {"stdout": proc.stdout, "stderr": proc.stderr}
+    if os.name == "posix":
+        threads = [threading.Thread(target=_select_pump, args=(pipes, capture), daemon=True)]
+    else:
+        threads = [threading.Thread(target=_read_pump, args=(name, pipe, capture), daemon=True)
+                   for name, pipe in pipes.items()]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def benchmark_capture(megabytes: int = 200) -> dict:
+    """Capture a script that prints `megabytes` of output; report throughput and peak RSS growth."""
+    import sys
+    import tempfile
+    import subprocess
+    import psutil
+
+    me = psutil.Process()
+    script = ("import sys\nline = b'x' * 99 + b'\\n'\nblock = line * 10000\n"
+              f"for _ in range({megabytes} * 1024 * 1024 // len(block)):\n    sys.stdout.buffer.write(block)\n"
+              "sys.stdout.buffer.write(b'y' * (3 * 1024 * 1024))\n")  # and one 3 MB line with no newline
+    with tempfile.TemporaryDirectory() as tmp:
+        rss_before = me.memory_info().rss
+        peak = rss_before
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        capture = OutputCapture("bench", os.path.join(tmp, "bench.log"), max_bytes=64 * 1024 * 1024)
+        threads = start_pumps(proc, capture)
+        while proc.poll() is None:
+            peak = max(peak, me.memory_info().rss)
+            time.sleep(0.02)
+        for thread in threads:
+            thread.join()
+        capture.close()
+        seconds = time.perf_counter() - start
+        logs = [f for f in os.listdir(tmp)]
+        log_bytes = sum(os.path.getsize(os.path.join(tmp, f)) for f in logs)
+    return {"bytes": capture.bytes, "lines": capture.lines, "seconds": seconds, "tail": len(capture.tail),
+            "rss_growth": peak - rss_before, "log_files": len(logs), "log_bytes": log_bytes}
+
+
+if __name__ == "__main__":
+    import sys
+    from rich.console import Console
+    from rich.table import Table
+
+    mb = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    r = benchmark_capture(mb)
+    table = Table(title=f"Output Capture :: script printing {mb} MB")
+    table.add_column("Metric", style="cyan")
+    table.add_column("Value", justify="right", style="bold green")
+    table.add_row("Captured", f"{r['bytes'] / 1e6:.0f} MB, {r['lines']:,} lines")
+    table.add_row("Throughput", f"{r['bytes'] / 1e6 / r['seconds']:.0f} MB/s")
+    table.add_row("Tail kept in memory", f"{r['tail']} lines")
+    table.add_row("Peak RSS growth", f"{r['rss_growth'] / 1e6:.1f} MB")
+    table.add_row("On disk (rotated)", f"{r['log_files']} files, {r['log_bytes'] / 1e6:.0f} MB")
+    Console().print(table)
@@ -0,0 +1,673 @@
+"""
+Peer Session - Persistent Multiplexed Connections Between Connect Peers.
+
+One TCP connection per peer carries any number of logical streams
+(messages, file deltas, presence), so talking to a peer costs one
+handshake per daemon lifetime rather than one per message.
+
+Frames are a 9-byte header (stream id, type, payload length) plus the
+payload. Each stream has a credit window: a sender may have at most
+WINDOW unacknowledged bytes in flight on a stream and waits for CREDIT
+frames beyond that, so a slow consumer on one stream throttles only
+that stream, not the connection. PING/PONG every HEARTBEAT_EVERY keeps
+NATs open and detects a dead peer; a session silent for DEAD_AFTER is
+torn down.
+
+Both ends prove they hold the mesh key (mesh_auth) before any stream
+is served: each HELLO carries a nonce, and each side answers the other's
+with an AUTH frame, an HMAC bound to its role and to the node and
+username it claims. `peer` on a started session is therefore an
+identity the peer has vouched for with the key.
+
+`connect daemon` runs a SessionServer for inbound sessions and a
+LocalAgent on a local socket. `connect msg` hands its message to the
+agent, which reuses (or opens once) the session to that peer.
+
+Run `python peer_session.py [messages]` for a loopback benchmark.
+"""
+
+import os
+import json
+import time
+import uuid
+import struct
+import socket
+import asyncio
+import getpass
+import itertools
+
+from mesh_auth import load_key, new_nonce, prove, verify
+
+SESSION_HOST = "0.0.0.0"
+SESSION_PORT = 47472
+AGENT_PATH = os.path.expanduser("~/.shortcut/connect/agent.sock")
+AGENT_PORT = 47473  # Windows: no AF_UNIX in asyncio, agent listens on loopback TCP
+MESSAGES_PATH = os.path.expanduser("~/.shortcut/connect/messages.jsonl")
+
+HEADER = struct.Struct("!IBI")
+OPEN, DATA, CLOSE, CREDIT, PING, PONG, HELLO, AUTH = range(8)
+MAX_FRAME = 64 * 1024
+WINDOW = 256 * 1024
+MAX_STREAMS = 256
+HEARTBEAT_EVERY = 5.0
+DEAD_AFTER = 15.0
+PROTOCOL = 2
+
+
+class SessionClosed(ConnectionError):
+    pass
+
+
+def _json_object(payload: bytes):
+    """The JSON object in `payload`, or None if it is not one."""
+    try:
+        obj = json.loads(payload)
+    except ValueError:
+        return None
+    return obj if isinstance(obj, dict) else None
+
+
+class Stream:
+    """One logical, flow-controlled byte channel inside a PeerSession."""
+
+    def __init__(self, session: "PeerSession", sid: int, kind: str):
+        self.session = session
+        self.sid = sid
+        self.kind = kind
+        self._inbox = asyncio.Queue()
+        self._send_credit = WINDOW
+        self._credit = asyncio.Event()
+        self._recv_budget = WINDOW
+        self._consumed = 0
+        self.closed = False
+
+    async def send(self, data: bytes):
+        """Send bytes, waiting for credit when the peer's window is full."""
+        for start in range(0, len(data), MAX_FRAME) or [0]:
+            piece = data[start:start + MAX_FRAME]
+            while self._send_credit < len(piece):
+                if self.closed or self.session.closed:
+                    raise SessionClosed("Stream closed")
+                self._credit.clear()
+                await self._credit.wait()
+            if self.closed or self.session.closed:
+                raise SessionClosed("Stream closed")
+            self._send_credit -= len(piece)
+            await self.session._write(self.sid, DATA, piece)
+
+    async def send_json(self, obj: dict):
+        data = json.dumps(obj).encode()
+        if len(data) > MAX_FRAME:
+            raise ValueError(f"Message of {len(data)} bytes exceeds the {MAX_FRAME} byte frame limit")
+        await self.send(data)
+
+    async def recv(self):
+        """Next payload, or None once the stream is closed."""
+        data = await self._inbox.get()
+        if data is None:
+            self._inbox.put_nowait(None)  # stay closed for later callers
+            return None
+        # Hand the window back once half of it has been consumed
+        self._consumed += len(data)
+        if self._consumed >= WINDOW // 2 and not self.session.closed:
+            granted, self._consumed = self._consumed, 0
+            self._recv_budget += granted
+            self.session._write_control(self.sid, CREDIT, struct.pack("!I", granted))
+        return data
+
+    async def recv_json(self):
+        data = await self.recv()
+        return None if data is None else json.loads(data)
+
+    async def close(self):
+        if not self.closed:
+            self._finish()
+            if not self.session.closed:
+                await self.session._write(self.sid, CLOSE, b"")
+            self.session._streams.pop(self.sid, None)
+
+    def _deliver(self, data: bytes):
+        self._recv_budget -= len(data)
+        if self._recv_budget < 0:
+            raise ValueError(f"Stream {self.sid} overran its window")
+        self._inbox.put_nowait(data)
+
+    def _grant(self, amount: int):
+        self._send_credit += amount
+        self._credit.set()
+
+    def _finish(self):
+        self.closed = True
+        self._inbox.put_nowait(None)
+        self._credit.set()
+
+
+class PeerSession:
+    """
+    Framing, stream multiplexing and heartbeats over one connection.
+    `on_stream(stream)` is awaited (as its own task) for every stream the
+    peer opens. `key` defaults to the local mesh key.
+    """
+
+    def __init__(self, reader, writer, initiator: bool, on_stream=None, hello: dict = None, key: bytes = None):
+        self.reader = reader
+        self.writer = writer
+        self.on_stream = on_stream
+        self.initiator = initiator
+        self.key = key if key is not None else load_key(create=True)
+        self.hello = {"v": PROTOCOL, "node": uuid.uuid4().hex, "username": getpass.getuser(), **(hello or {})}
+        self.peer = {}
+        self.closed = False
+        self.rtt = None
+        self._streams = {}
+        self._ids = itertools.count(1 if initiator else 2, 2)
+        self._tasks = []
+        self._last_rx = time.monotonic()
+        self._ping_sent = None
+        self.done = asyncio.get_running_loop().create_future()
+
+    async def _write(self, sid: int, ftype: int, payload: bytes):
+        if self.closed:
+            raise SessionClosed("Session closed")
+        # One write() per frame keeps frames whole without a lock
+        self.writer.write(HEADER.pack(sid, ftype, len(payload)) + payload)
+        await self.writer.drain()
+
+    def _write_control(self, sid: int, ftype: int, payload: bytes):
+        """
+        Queue a small control frame without waiting for drain(). The read
+        loop (and consumers reading in step with it) must never block on a
+        full send buffer: if both peers did, neither would read again.
+        """
+        if not self.closed:
+            self.writer.write(HEADER.pack(sid, ftype, len(payload)) + payload)
+
+    async def _read_frame(self):
+        sid, ftype, length = HEADER.unpack(await self.reader.readexactly(HEADER.size))
+        if length > MAX_FRAME:
+            raise ValueError(f"Frame of {length} bytes exceeds {MAX_FRAME}")
+        payload = await self.reader.readexactly(length) if length else b""
+        self._last_rx = time.monotonic()
+        return sid, ftype, payload
+
+    async def _handshake_frame(self, expected: int) -> dict:
+        sid, ftype, payload = await asyncio.wait_for(self._read_frame(), DEAD_AFTER)
+        obj = _json_object(payload) if ftype == expected else None
+        if obj is None:
+            await self.close()
+            raise SessionClosed("Peer does not speak the Connect session protocol")
+        return obj
+
+    def _proof(self, nonce: str, role: str, own_nonce: str, hello: dict) -> str:
+        return prove(self.key, nonce, "hello", role, own_nonce, hello.get("node"), hello.get("username"))
+
+    async def start(self):
+        """Exchange HELLOs and key proofs, then serve frames in the background."""
+        nonce = new_nonce()
+        await self._write(0, HELLO, json.dumps({**self.hello, "nonce": nonce}).encode())
+        peer = await self._handshake_frame(HELLO)
+        if peer.get("v") != PROTOCOL:
+            await self.close()
+            raise SessionClosed("Peer does not speak the Connect session protocol")
+        # Bound to our role, so a proof cannot be reflected back from a second session
+        role, peer_role = ("initiator", "acceptor") if self.initiator else ("acceptor", "initiator")
+        peer_nonce = str(peer.pop("nonce", ""))
+        await self._write(0, AUTH, json.dumps({"proof": self._proof(peer_nonce, role, nonce, self.hello)}).encode())
+        auth = await self._handshake_frame(AUTH)
+        if not verify(self.key, nonce, auth.get("proof"), "hello", peer_role, peer_nonce, peer.get("node"),
+                      peer.get("username")):
+            await self.close()
+            raise SessionClosed("Peer does not hold the mesh key")
+        self.peer = peer
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._read_loop()), loop.create_task(self._heartbeat())]
+        return self
+
+    async def open_stream(self, kind: str) -> Stream:
+        if len(self._streams) >= MAX_STREAMS:
+            raise SessionClosed(f"Too many open streams ({MAX_STREAMS})")
+        stream = Stream(self, next(self._ids), kind)
+        self._streams[stream.sid] = stream
+        await self._write(stream.sid, OPEN, json.dumps({"kind": kind}).encode())
+        return stream
+
+    async def _read_loop(self):
+        try:
+            while True:
+                sid, ftype, payload = await self._read_frame()
+                stream = self._streams.get(sid)
+                if ftype == DATA and stream:
+                    stream._deliver(payload)
+                elif ftype == CREDIT and stream:
+                    stream._grant(struct.unpack("!I", payload)[0])
+                elif ftype == OPEN:
+                    request = _json_object(payload)
+                    if request is None or sid in self._streams or len(self._streams) >= MAX_STREAMS:
+                        self._write_control(sid, CLOSE, b"")
+                        continue
+                    stream = self._streams[sid] = Stream(self, sid, str(request.get("kind", "")))
+                    if self.on_stream:
+                        self._tasks.append(asyncio.get_running_loop().create_task(self._serve(stream)))
+                elif ftype == CLOSE and stream:
+                    stream._finish()
+                    self._streams.pop(sid, None)
+                elif ftype == PING:
+                    self._write_control(0, PONG, payload)
+                elif ftype == PONG and self._ping_sent is not None:
+                    self.rtt = time.monotonic() - self._ping_sent
+                    self._ping_sent = None
+        except (asyncio.IncompleteReadError, ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            await self.close()
+
+    async def _serve(self, stream: Stream):
+        try:
+            await self.on_stream(stream)
+        except (SessionClosed, ConnectionError, ValueError):
+            pass
+        finally:
+            await stream.close()
+
+    async def _heartbeat(self):
+        while not self.closed:
+            await asyncio.sleep(HEARTBEAT_EVERY)
+            if time.monotonic() - self._last_rx > DEAD_AFTER:
+                await self.close()
+                return
+            try:
+                self._ping_sent = time.monotonic()
+                await self._write(0, PING, b"")
+            except (ConnectionError, OSError):
+                await self.close()
+                return
+
+    async def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for stream in list(self._streams.values()):
+            stream._finish()
+        self._streams.clear()
+        current = asyncio.current_task()
+        for task in self._tasks:
+            if task is not current:
+                task.cancel()
+        self.writer.close()
+        if not self.done.done():
+            self.done.set_result(True)
+
+
+async def open_session(host: str, port: int = SESSION_PORT, hello: dict = None, on_stream=None,
+                       key: bytes = None) -> PeerSession:
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return await PeerSession(reader, writer, initiator=True, on_stream=on_stream, hello=hello, key=key).start()
+
+
+class MessageChannel:
+    """Request/ack messaging over one "msg" stream; many sends in flight."""
+
+    def __init__(self, session: PeerSession):
+        self.session = session
+        self.stream = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._reader = None
+
+    async def open(self):
+        self.stream = await self.session.open_stream("msg")
+        self._reader = asyncio.get_running_loop().create_task(self._read_acks())
+        return self
+
+    async def _read_acks(self):
+        while True:
+            ack = await self.stream.recv_json()
+            if ack is None:
+                break
+            if not isinstance(ack, dict):
+                continue
+            future = self._pending.pop(ack.get("ack"), None)
+            if future and not future.done():
+                future.set_result(ack)
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(SessionClosed("Session closed before the message was acknowledged"))
+        self._pending.clear()
+
+    async def send(self, to: str, text: str, sender: str = None) -> dict:
+        """Deliver one message and wait for the peer's acknowledgement."""
+        mid = next(self._ids)
+        future = self._pending[mid] = asyncio.get_running_loop().create_future()
+        try:
+            await self.stream.send_json({"id": mid, "from": sender or getpass.getuser(), "to": to,
+                                         "text": text, "ts": time.time()})
+        except BaseException:
+            self._pending.pop(mid, None)
+            raise
+        return await future
+
+
+class SessionServer:
+    """
+    Accepts inbound sessions. `handlers` maps a stream kind to a
+    coroutine `handler(stream, session)`; "msg" is built in and passes
+    each message to `on_message(message, peer_hello)`.
+    """
+
+    def __init__(self, host: str = SESSION_HOST, port: int = SESSION_PORT, on_message=None, handlers: dict = None,
+                 hello: dict = None, key: bytes = None):
+        self.host = host
+        self.port = port
+        self.hello = hello
+        self.key = key
+        self.on_message = on_message
+        self.handlers = {"msg": self._serve_messages, **(handlers or {})}
+        self.sessions = set()
+        self.stats = {"sessions": 0, "messages": 0}
+        self._server = None
+
+    async def start(self) -> int:
+        self._server = await asyncio.start_server(self._accept, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        for session in list(self.sessions):
+            await session.close()
+
+    async def _accept(self, reader, writer):
+        writer.get_extra_info("socket").setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        session = PeerSession(reader, writer, initiator=False, hello=self.hello, key=self.key)
+        session.on_stream = lambda stream: self._dispatch(stream, session)
+        try:
+            await session.start()
+        except (SessionClosed, ConnectionError, asyncio.TimeoutError, ValueError):
+            writer.close()
+            return
+        self.sessions.add(session)
+        self.stats["sessions"] += 1
+        await session.done
+        self.sessions.discard(session)
+
+    async def _dispatch(self, stream: Stream, session: PeerSession):
+        handler = self.handlers.get(stream.kind)
+        if handler is not None:
+            await handler(stream, session)
+
+    async def _serve_messages(self, stream: Stream, session: PeerSession):
+        while True:
+            message = await stream.recv_json()
+            if not isinstance(message, dict):
+                return
+            self.stats["messages"] += 1
+            # The sender is whoever this session's peer is, not what the message claims
+            message = {**message, "from": session.peer.get("username"), "node": session.peer.get("node")}
+            if self.on_message:
+                self.on_message(message, session.peer)
+            await stream.send_json({"ack": message.get("id"), "received_at": time.time()})
+
+
+def record_message(message: dict, peer: dict, path: str = MESSAGES_PATH):
+    """Default on_message: append to the local message log."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps({**message, "node": peer.get("node")}) + "\n")
+
+
+class SessionPool:
+    """One live session (and message channel) per peer address."""
+
+    def __init__(self, hello: dict = None, key: bytes = None):
+        self.hello = hello
+        self.key = key
+        self._sessions = {}
+        self._channels = {}
+        self._locks = {}
+
+    async def session(self, host: str, port: int) -> PeerSession:
+        key = (host, port)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            session = self._sessions.get(key)
+            if session is None or session.closed:
+                session = self._sessions[key] = await open_session(host, port, self.hello, key=self.key)
+            return session
+
+    async def channel(self, host: str, port: int) -> MessageChannel:
+        session = await self.session(host, port)
+        async with self._locks.setdefault(("msg", host, port), asyncio.Lock()):
+            channel = self._channels.get((host, port))
+            if channel is None or channel.session is not session:
+                channel = self._channels[(host, port)] = await MessageChannel(session).open()
+            return channel
+
+    def sessions(self) -> list:
+        return [{"peer": f"{h}:{p}", "username": s.peer.get("username"), "rtt": s.rtt, "streams": len(s._streams)}
+                for (h, p), s in self._sessions.items() if not s.closed]
+
+    async def close(self):
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+        self._channels.clear()
+
+
+class LocalAgent:
+    """
+    Local socket front-end to a SessionPool, one JSON request per line:
+
+        {"op": "send", "host", "port", "to", "text"} -> {"ok", "rtt_ms"} | {"ok": false, "error"}
+        {"op": "open", "host", "port"}              -> {"ok", "peer"}
+        {"op": "sessions"}                          -> {"ok", "sessions"}
+
+    `ops` adds further ops: name -> coroutine(request) returning the reply.
+    """
+
+    def __init__(self, pool: SessionPool = None, path: str = AGENT_PATH, port: int = AGENT_PORT, ops: dict = None):
+        self.pool = pool or SessionPool()
+        self.ops = ops or {}
+        self.path = path
+        self.port = port
+        self._server = None
+
+    async def start(self):
+        if hasattr(socket, "AF_UNIX"):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            if os.path.exists(self.path):
+                os.remove(self.path)  # stale socket from a daemon that died
+            self._server = await asyncio.start_unix_server(self._handle, self.path)
+            os.chmod(self.path, 0o600)
+        else:
+            self._server = await asyncio.start_server(self._handle, "127.0.0.1", self.port)
+
+    async def stop(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        if hasattr(socket, "AF_UNIX") and os.path.exists(self.path):
+            os.remove(self.path)
+        await self.pool.close()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    reply = await self._serve(json.loads(line))
+                except (ConnectionError, OSError, asyncio.TimeoutError, ValueError, KeyError) as e:
+                    reply = {"ok": False, "error": f"{e.__class__.__name__}: {e}"}
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve(self, request: dict) -> dict:
+        if request["op"] == "send":
+            start = time.perf_counter()
+            channel = await self.pool.channel(request["host"], int(request["port"]))
+            await asyncio.wait_for(channel.send(request["to"], request["text"], request.get("from")), DEAD_AFTER)
+            return {"ok": True, "rtt_ms": (time.perf_counter() - start) * 1e3}
+        if request["op"] == "open":
+            channel = await self.pool.channel(request["host"], int(request["port"]))
+            return {"ok": True, "peer": channel.session.peer}
+        if request["op"] == "sessions":
+            return {"ok": True, "sessions": self.pool.sessions()}
+        if request["op"] in self.ops:
+            return await self.ops[request["op"]](request)
+        return {"ok": False, "error": f"Unknown op {request['op']!r}"}
+
+
+class AgentClient:
+    """Blocking client for the LocalAgent; keep one around to send many."""
+
+    def __init__(self, path: str = AGENT_PATH, port: int = AGENT_PORT, timeout: float = DEAD_AFTER):
+        if hasattr(socket, "AF_UNIX"):
+            self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.sock.settimeout(timeout)
+            self.sock.connect(path)
+        else:
+            self.sock = socket.create_connection(("127.0.0.1", port), timeout)
+        self.file = self.sock.makefile("rb")
+
+    def request(self, request: dict) -> dict:
+        self.sock.sendall(json.dumps(request).encode() + b"\n")
+        line = self.file.readline()
+        if not line:
+            raise ConnectionError("Agent closed the connection")
+        return json.loads(line)
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+async def send_direct(host: str, port: int, to: str, text: str, key: bytes = None) -> dict:
+    """One message over a throwaway session (no agent running)."""
+    session = await open_session(host, port, key=key)
+    try:
+        channel = await MessageChannel(session).open()
+        return await asyncio.wait_for(channel.send(to, text), DEAD_AFTER)
+    finally:
+        await session.close()
+
+
+def benchmark_sessions(messages: int = 2000, in_flight: int = 64) -> list:
+    """Loopback: per-message connections vs one session (sequential, pipelined) vs the agent."""
+    import secrets
+    import tempfile
+    import threading
+
+    def percentile(samples, q):
+        samples = sorted(samples)
+        return samples[min(len(samples) - 1, int(len(samples) * q))] * 1e3
+
+    results = []
+    key = secrets.token_bytes(32)
+    with tempfile.TemporaryDirectory() as tmp:
+        ready = threading.Event()
+        state = {}
+
+        def serve():
+            async def main():
+                server = SessionServer("127.0.0.1", 0, key=key)
+                state["port"] = await server.start()
+                agent = LocalAgent(SessionPool(key=key), path=os.path.join(tmp, "agent.sock"), port=0)
+                await agent.start()
+                if agent._server.sockets and agent._server.sockets[0].family == socket.AF_INET:
+                    state["agent_port"] = agent._server.sockets[0].getsockname()[1]
+                state["stop"] = asyncio.Event()
+                state["loop"] = asyncio.get_running_loop()
+                ready.set()
+                await state["stop"].wait()
+                await agent.stop()
+                await server.stop()
+            asyncio.run(main())
+
+        thread = threading.Thread(target=serve, daemon=True)
+        thread.start()
+        ready.wait()
+        port = state["port"]
+        direct_n = max(1, messages // 10)
+
+        async def client():
+            latencies = []
+            start = time.perf_counter()
+            for i in range(direct_n):
+                t = time.perf_counter()
+                await send_direct("127.0.0.1", port, "bench", f"direct {i}", key)
+                latencies.append(time.perf_counter() - t)
+            results.append(("connection per message", direct_n, time.perf_counter() - start, latencies))
+
+            session = await open_session("127.0.0.1", port, key=key)
+            channel = await MessageChannel(session).open()
+            latencies = []
+            start = time.perf_counter()
+            for i in range(messages):
+                t = time.perf_counter()
+                await channel.send("bench", f"sequential {i}")
+                latencies.append(time.perf_counter() - t)
+            results.append(("session, one at a time", messages, time.perf_counter() - start, latencies))
+
+            latencies = []
+            window = asyncio.Semaphore(in_flight)
+
+            async def one(i):
+                async with window:
+                    t = time.perf_counter()
+                    await channel.send("bench", f"pipelined {i}")
+                    latencies.append(time.perf_counter() - t)
+            start = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(messages)))
+            results.append((f"session, {in_flight} in flight", messages, time.perf_counter() - start, latencies))
+            await session.close()
+
+        asyncio.run(client())
+
+        latencies = []
+        start = time.perf_counter()
+        with AgentClient(os.path.join(tmp, "agent.sock"), state.get("agent_port", AGENT_PORT)) as agent:
+            for i in range(messages):
+                t = time.perf_counter()
+                reply = agent.request({"op": "send", "host": "127.0.0.1", "port": port, "to": "bench",
+                                       "text": f"agent {i}"})
+                assert reply["ok"], reply
+                latencies.append(time.perf_counter() - t)
+        results.append(("via local agent (connect msg)", messages, time.perf_counter() - start, latencies))
+
+        state["loop"].call_soon_threadsafe(state["stop"].set)
+        thread.join()
+
+    return [{"mode": mode, "messages": n, "seconds": secs, "msgs_per_sec": n / secs,
+             "p50_ms": percentile(lat, 0.5), "p99_ms": percentile(lat, 0.99)} for mode, n, secs, lat in results]
+
+
+if __name__ == "__main__":
+    import sys
+    from rich.console import Console
+    from rich.table import Table
+
+    n_messages = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    table = Table(title=f"Peer Sessions :: {n_messages} messages over loopback")
+    table.add_column("Mode", style="cyan")
+    table.add_column("Messages", justify="right")
+    table.add_column("Msgs/s", justify="right", style="bold green")
+    table.add_column("p50 ms", justify="right")
+    table.add_column("p99 ms", justify="right")
+    for r in benchmark_sessions(n_messages):
+        table.add_row(r["mode"], str(r["messages"]), f"{r['msgs_per_sec']:.0f}", f"{r['p50_ms']:.2f}",
+                      f"{r['p99_ms']:.2f}")
+    Console().print(table)
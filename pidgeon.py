@@ -7,56 +7,88 @@ Provides:
 """
 
 import os
-import json
 from rich.console import Console
 from rich.table import Table
 
+from pidgeon_store import PidgeonStore
+
 console = Console()
 
 class Pidgeon:
     def __init__(self):
         self.pidgeon_dir = os.path.expanduser("~/.shortcut/pidgeon")
-        self.contacts_path = os.path.join(self.pidgeon_dir, "contacts.json")
-        self.history_path = os.path.join(self.pidgeon_dir, "history.json")
-        self.ghost_map_path = os.path.join(self.pidgeon_dir, "ghost_identities.json")
+        self.last_delivery = None
         
         if not os.path.exists(self.pidgeon_dir):
             os.makedirs(self.pidgeon_dir)
-        self._init_storage()
-
-    def _init_storage(self):
-        for path in [self.contacts_path, self.history_path, self.ghost_map_path]:
-            if not os.path.exists(path):
-                with open(path, 'w') as f:
-                    json.dump({}, f if "ghost" in path else [])
+        # Contacts, history and ghost identities (imports the legacy JSON once)
+        self.store = PidgeonStore(self.pidgeon_dir)
+        # Autocomplete index, loaded on the first contact search
+        self.contact_index = None
 
     def get_actual_id(self, ghost_name: str) -> str:
         """Resolves a masked Ghost Name to the real Spectre ID."""
-        with open(self.ghost_map_path, 'r') as f:
-            mapping = json.load(f)
-            return mapping.get(ghost_name, ghost_name) # Fallback to input
+        return self.store.resolve_ghost(ghost_name) or ghost_name # Fallback to input
 
     def generate_ghost_name(self, real_id: str) -> str:
         """
         Creates a unique, illusive name for a specific relationship.
         In production, this would be derived from a hardware-rooted hash.
         """
-        ghosts = ["spectre-alpha", "phantom-node", "void-walker", "nebula-drift", "echo-point"]
-        import random
-        mask = f"{random.choice(ghosts)}-{random.randint(1000, 9999)}"
-        
-        # Save the relationship pointer
-        with open(self.ghost_map_path, 'r+') as f:
-            mapping = json.load(f)
-            mapping[mask] = real_id
-            f.seek(0)
-            json.dump(mapping, f, indent=2)
-            
-        return mask
+        # Save the relationship pointer (atomic; retried on collision)
+        return self.store.new_ghost(real_id)
+
+    def get_contacts(self, query: str = None, limit: int = None) -> list:
+        """
+        Contacts, most recently used first; with `query`, the best
+        autocomplete matches for it (see contact_index).
+        """
+        if not query:
+            return self.store.contacts(limit)
+        if self.contact_index is None:
+            from contact_index import ContactIndex
+            self.contact_index = ContactIndex(self.store, os.path.join(self.pidgeon_dir, "contacts.idx"))
+        self.contact_index.refresh()
+        return self.contact_index.search(query, limit or 10)
+
+    def get_history(self, grep: str = None, since: float = None, page: int = 1, limit: int = 20) -> list:
+        """A page of sent/failed messages, newest first (see PidgeonStore.history)."""
+        return self.store.history(grep=grep, since=since, page=page, limit=limit)
 
-    def transfer_artifact(self, artifact_path: str, recipient_mask: str):
+    def send_batch(self, messages: list, mailer=None) -> list:
+        """
+        Send many {"to", "subject", "body"} messages over pooled SMTP
+        connections. Ghost masks are resolved; history keeps what was typed.
+        All results land in history in a single write.
+        """
+        from pidgeon_mailer import PidgeonMailer
+        resolved = [{**m, "address": self.get_actual_id(m["to"])} for m in messages]
+        own_mailer = mailer is None
+        mailer = mailer or PidgeonMailer()
+        try:
+            results = mailer.send_batch(resolved)
+        finally:
+            if own_mailer:
+                mailer.close()
+        self.store.append_history(results)
+        return results
+
+    def send_pidgeon(self, to: str, subject: str, body: str) -> bool:
+        """Send one Pidgeon (email)."""
+        result = self.send_batch([{"to": to, "subject": subject, "body": body}])[0]
+        if result["status"] == "sent":
+            console.print(f"[green]✓ Pidgeon delivered to {to}.[/green]")
+            return True
+        console.print(f"[bold red]✗ Pidgeon to {to} failed after {result['attempts']} attempt(s): {result['error']}[/bold red]")
+        return False
+
+    def transfer_artifact(self, artifact_path: str, recipient_mask: str, peer: str = None):
         """
         Simulate the peer-to-peer transfer using a Ghost Identity.
+        Delivery into the mesh inbox is zero-copy where the filesystem
+        allows it. With `peer` ("host:port" of a `pidgeon daemon`), the
+        artifact is streamed to that daemon instead. The report of the
+        last delivery is kept on `self.last_delivery`.
         """
         # Resolve identity internally
         real_id = self.get_actual_id(recipient_mask)
@@ -65,12 +97,25 @@ class Pidgeon:
         console.print(f"[bold cyan]MESH[/bold cyan] :: Masked Route Established: [dim]{recipient_mask}[/dim]")
         console.print(f"[dim][SECURITY] Pidgeon resolving pointer to {real_id}...[/dim]")
         
-        # Simulation: Copy to a 'shared' mesh folder
-        mesh_dir = os.path.expanduser("~/.shortcut/mesh_inbox")
-        if not os.path.exists(mesh_dir): os.makedirs(mesh_dir)
-        
-        import shutil
-        shutil.copy(artifact_path, os.path.join(mesh_dir, filename))
+        import getpass
+        if peer:
+            from mesh_transport import send_artifact
+            self.last_delivery = send_artifact(peer, artifact_path, sender=getpass.getuser(),
+                                               recipient=recipient_mask)
+        else:
+            # Simulation: Place into a 'shared' mesh folder
+            mesh_dir = os.path.expanduser("~/.shortcut/mesh_inbox")
+            if not os.path.exists(mesh_dir): os.makedirs(mesh_dir)
+
+            from mesh_delivery import deliver
+            from mesh_inbox import MeshInbox
+            dest = os.path.join(mesh_dir, filename)
+            self.last_delivery = deliver(artifact_path, dest)
+            MeshInbox(mesh_dir).record(dest, sender=getpass.getuser(), ghost=recipient_mask,
+                                       sha256=self.last_delivery["sha256"],
+                                       strategy=self.last_delivery["strategy"])
         
         console.print(f"[green]✓ {filename} delivered to {recipient_mask}'s secure vault.[/green]")
+        console.print(f"[dim][MESH] via {self.last_delivery['strategy']} "
+                      f"({self.last_delivery['bytes'] / 1e6:.1f} MB, {self.last_delivery['seconds']:.2f}s, verified)[/dim]")
         return True
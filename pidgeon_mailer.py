@@ -0,0 +1,240 @@
+"""
+Pidgeon Mailer - Pooled, Batched SMTP Delivery.
+
+Messages are sent over a small pool of persistent SMTP connections, many
+messages per connection, from a bounded set of worker threads. Transient
+failures (4xx replies, dropped connections, timeouts) are retried with
+exponential backoff and jitter; permanent ones (5xx) fail immediately.
+Every message yields a result dict suitable for the history store.
+
+SMTP settings come from ~/.shortcut/pidgeon/smtp.json, overridden by
+PIDGEON_SMTP_HOST / _PORT / _USER / _PASSWORD / _STARTTLS / _FROM.
+
+Run `python pidgeon_mailer.py [messages] [pool]` for a messages/sec
+benchmark against a local SMTP stand-in.
+"""
+
+import os
+import json
+import time
+import random
+import socket
+import getpass
+import smtplib
+import threading
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+from concurrent.futures import ThreadPoolExecutor
+
+SMTP_CONFIG_PATH = os.path.expanduser("~/.shortcut/pidgeon/smtp.json")
+DEFAULT_POOL_SIZE = 4
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 0.5
+
+_TRANSIENT_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, socket.timeout)
+
+
+def load_smtp_config() -> dict:
+    config = {"host": "localhost", "port": 25, "user": None, "password": None, "starttls": False,
+              "from": f"{getpass.getuser()}@localhost", "timeout": 30}
+    if os.path.exists(SMTP_CONFIG_PATH):
+        with open(SMTP_CONFIG_PATH, "r") as f:
+            config.update(json.load(f))
+    for key in ("host", "port", "user", "password", "starttls", "from"):
+        value = os.environ.get(f"PIDGEON_SMTP_{key.upper()}")
+        if value is not None:
+            config[key] = value
+    config["port"] = int(config["port"])
+    config["starttls"] = str(config["starttls"]).lower() in ("1", "true", "yes")
+    return config
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, _TRANSIENT_ERRORS):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    return False
+
+
+class SMTPPool:
+    """
+    Up to `size` open SMTP connections shared by worker threads. A worker
+    that finds the pool at capacity waits until a connection is returned
+    or a broken one frees its slot.
+    """
+
+    def __init__(self, config: dict, size: int = DEFAULT_POOL_SIZE):
+        self.config = config
+        self.size = size
+        self._idle = []
+        self._open = 0
+        self._cond = threading.Condition()
+        self.connects = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.config["host"], self.config["port"], timeout=self.config.get("timeout", 30))
+        conn.ehlo()
+        if self.config.get("starttls"):
+            conn.starttls()
+            conn.ehlo()
+        if self.config.get("user"):
+            conn.login(self.config["user"], self.config["password"])
+        return conn
+
+    def acquire(self) -> smtplib.SMTP:
+        with self._cond:
+            while not self._idle and self._open >= self.size:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._open += 1
+        try:
+            conn = self._connect()
+        except BaseException:
+            self._free_slot()
+            raise
+        with self._cond:
+            self.connects += 1
+        return conn
+
+    def _free_slot(self):
+        with self._cond:
+            self._open -= 1
+            self._cond.notify()
+
+    def release(self, conn: smtplib.SMTP, broken: bool = False):
+        if broken:
+            try:
+                conn.close()
+            finally:
+                self._free_slot()
+            return
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            try:
+                conn.quit()
+            except (smtplib.SMTPException, OSError):
+                conn.close()
+
+
+class PidgeonMailer:
+    """Batch sender. Messages are dicts with "to", "subject" and "body"."""
+
+    def __init__(self, config: dict = None, pool_size: int = DEFAULT_POOL_SIZE,
+                 max_retries: int = MAX_RETRIES, backoff: float = BACKOFF_SECONDS):
+        self.config = config if config is not None else load_smtp_config()
+        self.config.setdefault("from", f"{getpass.getuser()}@localhost")
+        self.pool = SMTPPool(self.config, pool_size)
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def _build(self, message: dict) -> EmailMessage:
+        email = EmailMessage()
+        email["From"] = message.get("from") or self.config["from"]
+        email["To"] = message["address"]
+        email["Subject"] = message.get("subject", "")
+        email["Date"] = formatdate(localtime=True)
+        email["Message-ID"] = make_msgid(domain="pidgeon.local")
+        email.set_content(message.get("body", ""))
+        return email
+
+    def _send_one(self, message: dict) -> dict:
+        # "to" is what the user typed (maybe a ghost mask); "address" is
+        # where it actually goes
+        message = {"address": message["to"], **message}
+        result = {"recipient": message["to"], "subject": message.get("subject", ""),
+                  "body": message.get("body", ""), "status": "failed", "error": None, "attempts": 0}
+        email = self._build(message)
+        for attempt in range(1, self.max_retries + 1):
+            result["attempts"] = attempt
+            conn, broken = None, False
+            try:
+                conn = self.pool.acquire()
+                conn.send_message(email)
+                result.update(status="sent", error=None, sent_at=time.time())
+                return result
+            except (smtplib.SMTPException, OSError) as e:
+                # A reply error leaves the session usable; anything else doesn't
+                broken = not isinstance(e, (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused))
+                result["error"] = str(e) or e.__class__.__name__
+                if not _is_transient(e):
+                    break
+                if attempt < self.max_retries:
+                    time.sleep(self.backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+            finally:
+                if conn is not None:
+                    self.pool.release(conn, broken)
+        result["sent_at"] = time.time()
+        return result
+
+    def send_batch(self, messages: list, workers: int = None) -> list:
+        """Send every message; returns one result per message, in order."""
+        with ThreadPoolExecutor(max_workers=workers or self.pool.size) as pool:
+            return list(pool.map(self._send_one, messages))
+
+    def close(self):
+        self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def benchmark_mailer(messages: int = 500, pool_size: int = DEFAULT_POOL_SIZE) -> list:
+    """Connection-per-message vs pooled batch against a local stand-in."""
+    from smtp_standin import LocalSMTPServer
+
+    batch = [{"to": f"user{i}@example.test", "subject": f"Bench {i}", "body": "x" * 512} for i in range(messages)]
+    results = []
+    with LocalSMTPServer() as server:
+        config = {"host": "127.0.0.1", "port": server.port, "from": "bench@pidgeon.local"}
+
+        start = time.perf_counter()
+        for message in batch:
+            with PidgeonMailer(dict(config), pool_size=1) as mailer:
+                mailer.send_batch([dict(message)])
+        elapsed = time.perf_counter() - start
+        results.append({"mode": "connection per message", "connections": messages, "messages": messages,
+                        "seconds": elapsed, "msgs_per_sec": messages / elapsed})
+
+        with PidgeonMailer(dict(config), pool_size=pool_size) as mailer:
+            start = time.perf_counter()
+            sent = mailer.send_batch([dict(m) for m in batch])
+            elapsed = time.perf_counter() - start
+            connects = mailer.pool.connects
+        results.append({"mode": f"pooled batch (pool={pool_size})", "connections": connects,
+                        "messages": sum(r["status"] == "sent" for r in sent),
+                        "seconds": elapsed, "msgs_per_sec": messages / elapsed})
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    from rich.console import Console
+    from rich.table import Table
+
+    n_messages = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    n_pool = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_POOL_SIZE
+    table = Table(title=f"Pidgeon Mailer :: {n_messages} messages to a local SMTP stand-in")
+    table.add_column("Mode", style="cyan")
+    table.add_column("Connections", justify="right")
+    table.add_column("Sent", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Msgs/s", justify="right", style="bold green")
+    for r in benchmark_mailer(n_messages, n_pool):
+        table.add_row(r["mode"], str(r["connections"]), str(r["messages"]), f"{r['seconds']:.2f}",
+                      f"{r['msgs_per_sec']:.0f}")
+    Console().print(table)
@@ -0,0 +1,298 @@
+"""
+Pidgeon Store - Transactional Storage for Contacts, History and Ghosts.
+
+Replaces the whole-file JSON rewrites in ~/.shortcut/pidgeon with one
+SQLite database (WAL). Ghost resolution is a primary-key lookup, every
+write is an atomic transaction, and parallel `pidgeon send` processes
+share the store safely. The legacy JSON files are imported once, then
+renamed to *.json.migrated.
+"""
+
+import os
+import json
+import time
+import random
+import sqlite3
+
+from local_db import connect, migrate, transaction
+
+PIDGEON_DIR = os.path.expanduser("~/.shortcut/pidgeon")
+DB_NAME = "pidgeon.db"
+LEGACY_FILES = ("contacts.json", "history.json", "ghost_identities.json")
+
+GHOST_PREFIXES = ["spectre-alpha", "phantom-node", "void-walker", "nebula-drift", "echo-point"]
+
+_MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    CREATE TABLE IF NOT EXISTS ghosts (
+        mask TEXT PRIMARY KEY,
+        real_id TEXT NOT NULL,
+        created_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS ghosts_real_id ON ghosts (real_id);
+    CREATE TABLE IF NOT EXISTS contacts (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL DEFAULT '',
+        email TEXT NOT NULL UNIQUE COLLATE NOCASE,
+        last_used REAL,
+        use_count INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS history (
+        id INTEGER PRIMARY KEY,
+        sent_at REAL NOT NULL,
+        recipient TEXT NOT NULL,
+        subject TEXT NOT NULL DEFAULT '',
+        body TEXT NOT NULL DEFAULT '',
+        status TEXT NOT NULL DEFAULT 'sent',
+        error TEXT
+    );
+    CREATE INDEX IF NOT EXISTS history_sent_at ON history (sent_at, id)
+    """,
+    # Every insert/update of a contact stamps it with a new revision so
+    # in-memory indexes (contact_index) can pull just what changed
+    """
+    ALTER TABLE contacts ADD COLUMN rev INTEGER NOT NULL DEFAULT 0;
+    UPDATE contacts SET rev = id;
+    CREATE INDEX IF NOT EXISTS contacts_rev ON contacts (rev);
+    CREATE TRIGGER IF NOT EXISTS contacts_rev_insert AFTER INSERT ON contacts BEGIN
+        UPDATE contacts SET rev = (SELECT MAX(rev) FROM contacts) + 1 WHERE id = NEW.id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS contacts_rev_update AFTER UPDATE OF name, email, last_used, use_count ON contacts BEGIN
+        UPDATE contacts SET rev = (SELECT MAX(rev) FROM contacts) + 1 WHERE id = NEW.id;
+    END
+    """,
+    # History is an append-only log: ids follow arrival order
+    """
+    CREATE TRIGGER IF NOT EXISTS history_append_only BEFORE UPDATE ON history BEGIN
+        SELECT RAISE(ABORT, 'history is append-only');
+    END;
+    CREATE INDEX IF NOT EXISTS history_recipient ON history (recipient, id)
+    """,
+]
+
+# External-content full-text index over history, kept in step by triggers.
+# Created (and back-filled) only when this SQLite has FTS5; searches fall
+# back to LIKE otherwise.
+_HISTORY_FTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+        recipient, subject, body, content='history', content_rowid='id')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN
+        INSERT INTO history_fts (rowid, recipient, subject, body)
+        VALUES (NEW.id, NEW.recipient, NEW.subject, NEW.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON history BEGIN
+        INSERT INTO history_fts (history_fts, rowid, recipient, subject, body)
+        VALUES ('delete', OLD.id, OLD.recipient, OLD.subject, OLD.body);
+    END
+    """,
+    "INSERT INTO history_fts (history_fts) VALUES ('rebuild')",
+]
+HISTORY_PAGE = 20
+
+
+def _fts5_available(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _fts_query(text: str) -> str:
+    """
+    Every whitespace-separated term must match a whole word; `term*`
+    matches a word prefix (slower on common prefixes).
+    """
+    return " ".join('"{}"{}'.format(term.rstrip("*").replace('"', '""'), "*" if term.endswith("*") else "")
+                    for term in text.split() if term.rstrip("*"))
+
+
+def _to_timestamp(value) -> float:
+    """Legacy history timestamps may be epoch numbers or ISO strings."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        from datetime import datetime
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            pass
+    return time.time()
+
+
+class PidgeonStore:
+    """SQLite-backed Pidgeon state under `pidgeon_dir`."""
+
+    def __init__(self, pidgeon_dir: str = PIDGEON_DIR):
+        self.pidgeon_dir = pidgeon_dir
+        self.conn = connect(os.path.join(pidgeon_dir, DB_NAME))
+        migrate(self.conn, _MIGRATIONS)
+        self._import_legacy_json()
+        self.fts = self._ensure_fts()
+
+    def _ensure_fts(self) -> bool:
+        if self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'history_fts'").fetchone():
+            return True
+        if not _fts5_available(self.conn):
+            return False
+        with transaction(self.conn):
+            # Another process may have created it while we waited for the lock
+            if not self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'history_fts'").fetchone():
+                for statement in _HISTORY_FTS:
+                    self.conn.execute(statement)
+        return True
+
+    # --- one-time JSON import -------------------------------------------
+
+    def _load_legacy(self, name: str, default):
+        path = os.path.join(self.pidgeon_dir, name)
+        if not os.path.exists(path):
+            return default
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # generate_ghost_name's r+ rewrite could leave trailing garbage;
+            # salvage the leading document if there is one
+            with open(path, "r", errors="ignore") as f:
+                text = f.read()
+            try:
+                return json.JSONDecoder().raw_decode(text.lstrip())[0]
+            except ValueError:
+                return default
+
+    def _import_legacy_json(self):
+        if not any(os.path.exists(os.path.join(self.pidgeon_dir, n)) for n in LEGACY_FILES):
+            return
+        with transaction(self.conn):
+            # Re-checked under the write lock: exactly one process imports
+            if self.conn.execute("SELECT 1 FROM meta WHERE key = 'json_imported'").fetchone():
+                return
+            now = time.time()
+            ghosts = self._load_legacy("ghost_identities.json", {})
+            self.conn.executemany("INSERT OR IGNORE INTO ghosts (mask, real_id, created_at) VALUES (?, ?, ?)",
+                                  [(m, r, now) for m, r in ghosts.items()] if isinstance(ghosts, dict) else [])
+            contacts = [c for c in self._load_legacy("contacts.json", []) if isinstance(c, dict) and c.get("email")]
+            self.conn.executemany("INSERT OR IGNORE INTO contacts (name, email) VALUES (?, ?)",
+                                  [(c.get("name", ""), c["email"]) for c in contacts])
+            history = [h for h in self._load_legacy("history.json", []) if isinstance(h, dict)]
+            self.conn.executemany(
+                "INSERT INTO history (sent_at, recipient, subject, body, status) VALUES (?, ?, ?, ?, ?)",
+                [(_to_timestamp(h.get("timestamp") or h.get("sent_at")), h.get("to") or h.get("recipient", ""),
+                  h.get("subject", ""), h.get("body", ""), h.get("status", "sent")) for h in history])
+            self.conn.execute("INSERT INTO meta (key, value) VALUES ('json_imported', ?)", (str(now),))
+        for name in LEGACY_FILES:
+            path = os.path.join(self.pidgeon_dir, name)
+            if os.path.exists(path):
+                os.replace(path, path + ".migrated")
+
+    # --- ghost identities -----------------------------------------------
+
+    def resolve_ghost(self, mask: str) -> str:
+        """Real ID behind a ghost mask, or None."""
+        row = self.conn.execute("SELECT real_id FROM ghosts WHERE mask = ?", (mask,)).fetchone()
+        return row["real_id"] if row else None
+
+    def new_ghost(self, real_id: str, attempts: int = 32) -> str:
+        """Mint a mask not yet taken and bind it to `real_id` atomically."""
+        for _ in range(attempts):
+            mask = f"{random.choice(GHOST_PREFIXES)}-{random.randint(1000, 9999)}"
+            try:
+                self.conn.execute("INSERT INTO ghosts (mask, real_id, created_at) VALUES (?, ?, ?)",
+                                  (mask, real_id, time.time()))
+                return mask
+            except sqlite3.IntegrityError:
+                continue
+        raise RuntimeError("Ghost namespace exhausted: could not mint a unique mask")
+
+    # --- contacts & history ---------------------------------------------
+
+    def contacts(self, limit: int = None) -> list:
+        return [dict(r) for r in self.conn.execute(
+            "SELECT name, email, last_used, use_count FROM contacts ORDER BY last_used DESC, name LIMIT ?",
+            (-1 if limit is None else limit,))]
+
+    def contacts_since(self, rev: int) -> list:
+        """Contacts inserted or changed after revision `rev`, oldest change first."""
+        return self.conn.execute(
+            "SELECT id, name, email, last_used, use_count, rev FROM contacts WHERE rev > ? ORDER BY rev",
+            (rev,)).fetchall()
+
+    def contacts_rev(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(rev), 0) FROM contacts").fetchone()[0]
+
+    def touch_contact(self, email: str, name: str = ""):
+        """Record that `email` was just used (creating the contact if new)."""
+        self.conn.execute(
+            """
+            INSERT INTO contacts (name, email, last_used, use_count) VALUES (?, ?, ?, 1)
+            ON CONFLICT (email) DO UPDATE SET last_used = excluded.last_used, use_count = use_count + 1,
+                name = CASE WHEN contacts.name = '' THEN excluded.name ELSE contacts.name END
+            """, (name, email, time.time()))
+
+    def append_history(self, entries: list):
+        """
+        Insert message results in one transaction; recipients of messages
+        that went out are recorded as (recently used) contacts.
+        """
+        now = time.time()
+        with transaction(self.conn):
+            self.conn.executemany(
+                """
+                INSERT INTO contacts (email, last_used, use_count) VALUES (?, ?, 1)
+                ON CONFLICT (email) DO UPDATE SET last_used = excluded.last_used, use_count = use_count + 1
+                """, [(e["recipient"], now) for e in entries if e.get("status") == "sent" and "@" in e["recipient"]])
+            self.conn.executemany(
+                "INSERT INTO history (sent_at, recipient, subject, body, status, error) VALUES (?, ?, ?, ?, ?, ?)",
+                [(e.get("sent_at", time.time()), e["recipient"], e.get("subject", ""), e.get("body", ""),
+                  e.get("status", "sent"), e.get("error")) for e in entries])
+
+    def history(self, grep: str = None, since: float = None, recipient: str = None,
+                before: int = None, page: int = 1, limit: int = HISTORY_PAGE) -> list:
+        """
+        Messages newest first. `grep` is a full-text search (every term
+        as a whole word, `term*` as a prefix); `before` is the id of the
+        last message already seen, for keyset pagination. Pages never
+        load more than `limit` rows; `page` skips whole pages by id alone.
+        """
+        where, params = [], []
+        match = _fts_query(grep) if grep and self.fts else None
+        if match:
+            source = "history_fts JOIN history h ON h.id = history_fts.rowid"
+            where.append("history_fts MATCH ?")
+            params.append(match)
+            order = "history_fts.rowid"
+        else:
+            source, order = "history h", "h.id"
+            for term in (grep or "").replace("*", " ").split():
+                like = "%{}%".format(term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_"))
+                where.append("(h.subject LIKE ? ESCAPE '\\' OR h.body LIKE ? ESCAPE '\\' "
+                             "OR h.recipient LIKE ? ESCAPE '\\')")
+                params += [like, like, like]
+        if since is not None:
+            where.append("h.sent_at >= ?")
+            params.append(since)
+        if recipient:
+            where.append("h.recipient = ?")
+            params.append(recipient)
+        if before is not None:
+            where.append(f"{order} < ?")
+            params.append(before)
+        sql = f"FROM {source} {'WHERE ' + ' AND '.join(where) if where else ''} ORDER BY {order} DESC"
+
+        if page > 1:
+            row = self.conn.execute(f"SELECT {order} {sql} LIMIT 1 OFFSET ?",
+                                    params + [(page - 1) * limit - 1]).fetchone()
+            if row is None:
+                return []
+            where.append(f"{order} < ?")
+            params.append(row[0])
+            sql = f"FROM {source} WHERE {' AND '.join(where)} ORDER BY {order} DESC"
+        return [dict(r) for r in self.conn.execute(f"SELECT h.* {sql} LIMIT ?", params + [limit])]
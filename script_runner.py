@@ -0,0 +1,336 @@
+"""
+Script Runner - Concurrent Execution for Local Scripts.
+
+Runs a batch of scripts through a bounded pool of workers, one child
+process each, with an optional per-script timeout. Output is streamed
+as it is produced: every line carries its script's name as a prefix
+(stderr in red), so interleaved output from parallel scripts stays
+readable. A summary table with exit codes and timings closes the run.
+
+Python children run unbuffered so lines arrive when they are printed,
+not when a pipe buffer fills. Output goes through output_capture, so a
+chatty script costs a bounded tail in memory plus a rotating log file
+per script. A script that outlives its timeout is killed together with
+every process it started.
+
+Each result also carries the script's CPU time and peak RSS. On POSIX
+both come from the kernel's rusage of the reaped child (os.wait4); one
+shared psutil sampler also polls each running process tree, which
+covers Windows and catches the combined RSS of scripts that fan out.
+
+Scripts opt into tags with a header comment in their first lines:
+
+    # tags: nightly, cleanup
+"""
+
+import os
+import sys
+import time
+import fnmatch
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+from rich.console import Console
+from rich.table import Table
+from rich.text import Text
+from rich.panel import Panel
+
+from output_capture import LOG_DIR, TAIL_LINES, OutputCapture, log_path_for, prune_logs, start_pumps
+from script_registry import read_tags
+
+DEFAULT_WORKERS = 4
+FAILURE_TAIL = 10
+SAMPLE_EVERY = 0.1
+PALETTE = ["cyan", "magenta", "green", "yellow", "blue", "bright_cyan", "bright_magenta", "bright_green"]
+
+console = Console()
+
+
+def command_for(path: str) -> list:
+    """Interpreter command line for a script (a script dict may override it with "command")."""
+    if path.endswith(".ps1"):
+        return ["powershell", "-ExecutionPolicy", "Bypass", "-File", path]
+    return [sys.executable, path]
+
+
+def select_scripts(items: list, selectors=(), tag: str = None) -> list:
+    """
+    Resolve `scripts run` arguments against the listed scripts. A
+    selector is a script ID (the registry's "id", else the 1-based
+    position) or a filename glob; `tag` adds every script carrying it.
+    Raises ValueError naming the first selector that matches nothing.
+    Order follows the arguments; duplicates are dropped.
+    """
+    by_id = {item.get("id", i + 1): item for i, item in enumerate(items)}
+    chosen = []
+    for selector in selectors:
+        if selector.isdigit():
+            if int(selector) not in by_id:
+                raise ValueError(f"Invalid Script ID: {selector}")
+            chosen.append(by_id[int(selector)])
+            continue
+        matches = [item for item in items if fnmatch.fnmatch(item["name"], selector)]
+        if not matches:
+            raise ValueError(f"No script matches {selector!r}")
+        chosen.extend(matches)
+    if tag:
+        tagged = [item for item in items
+                  if tag.lower() in (item["tags"] if "tags" in item else read_tags(item["path"]))]
+        if not tagged:
+            raise ValueError(f"No script is tagged {tag!r}")
+        chosen.extend(tagged)
+    unique = {}
+    for item in chosen:
+        unique.setdefault(item["path"], item)
+    return list(unique.values())
+
+
+def _kill_tree(pid: int):
+    """Kill a process and its descendants. Reaping the process is left to its Popen."""
+    try:
+        parent = psutil.Process(pid)
+        procs = parent.children(recursive=True) + [parent]
+    except psutil.NoSuchProcess:
+        return
+    for proc in procs:
+        try:
+            proc.kill()
+        except psutil.NoSuchProcess:
+            pass
+
+
+class ScriptRunner:
+    """
+    Bounded-concurrency runner. `on_line(script, stream, line)` receives
+    every output line as it arrives ("stdout"/"stderr"); by default lines
+    are printed with a per-script prefix. Each result keeps the last
+    `tail_lines` lines; the full output goes to `log_dir` (None: no log).
+    A lone script inherits stdin unless `interactive` is False.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, timeout: float = None, on_line=None, output: Console = None,
+                 log_dir: str = LOG_DIR, tail_lines: int = TAIL_LINES, interactive: bool = True):
+        self.workers = max(1, workers)
+        self.interactive = interactive
+        self.timeout = timeout
+        self.on_line = on_line or self._print_line
+        self.log_dir = log_dir
+        self.tail_lines = tail_lines
+        self.console = output or console
+        self._lock = threading.Lock()
+        self._procs = {}
+        self._usage = {}
+        self._width = 0
+        self._colors = {}
+
+    def _print_line(self, script: dict, stream: str, line: str):
+        prefix = f"{script['name']:<{self._width}} │ "
+        text = Text.assemble((prefix, self._colors.get(script["path"], "cyan")),
+                             (line, "red" if stream == "stderr" else ""))
+        with self._lock:
+            self.console.print(text, highlight=False, soft_wrap=True)
+
+    def run(self, scripts: list) -> list:
+        """Run every script; returns one result dict per script, in input order."""
+        self._width = max((len(s["name"]) for s in scripts), default=0)
+        self._colors = {s["path"]: PALETTE[i % len(PALETTE)] for i, s in enumerate(scripts)}
+        # A lone script may be interactive; concurrent ones get no stdin
+        stdin = None if len(scripts) == 1 and self.interactive else subprocess.DEVNULL
+        stop = threading.Event()
+        sampler = threading.Thread(target=self._sample_loop, args=(stop,), name="script-sampler", daemon=True)
+        sampler.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="script") as pool:
+                futures = [pool.submit(self._run_one, script, stdin) for script in scripts]
+                try:
+                    return [future.result() for future in futures]
+                except KeyboardInterrupt:
+                    for future in futures:
+                        future.cancel()
+                    self.kill_all()
+                    raise
+        finally:
+            stop.set()
+
+    def kill_all(self):
+        with self._lock:
+            pids = list(self._procs)
+        for pid in pids:
+            _kill_tree(pid)
+
+    def _sample_loop(self, stop: threading.Event):
+        while not stop.wait(SAMPLE_EVERY):
+            with self._lock:
+                usages = list(self._usage.values())
+            for usage in usages:
+                _sample(usage)
+
+    def _wait(self, proc, result: dict):
+        """
+        Wait for exit, enforcing the timeout. Returns (cpu_seconds,
+        max_rss_bytes) from the child's rusage, or None without os.wait4.
+        """
+        if not hasattr(os, "wait4"):
+            try:
+                proc.wait(self.timeout)
+            except subprocess.TimeoutExpired:
+                result["timed_out"] = True
+                _kill_tree(proc.pid)
+                proc.wait()
+            return None
+
+        def expire():
+            result["timed_out"] = True
+            _kill_tree(proc.pid)
+
+        timer = threading.Timer(self.timeout, expire) if self.timeout is not None else None
+        if timer:
+            timer.daemon = True
+            timer.start()
+        try:
+            _, status, rusage = os.wait4(proc.pid, 0)
+        finally:
+            if timer:
+                timer.cancel()
+        proc.returncode = os.waitstatus_to_exitcode(status)  # reaped here, so Popen must not wait again
+        return rusage.ru_utime + rusage.ru_stime, rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+
+    def _run_one(self, script: dict, stdin) -> dict:
+        result = {"name": script["name"], "path": script["path"], "exit_code": None, "timed_out": False,
+                  "error": None, "lines": 0, "bytes": 0, "started_at": time.time(), "seconds": 0.0,
+                  "tail": [], "log": None, "cpu_seconds": None, "peak_rss": None}
+        start = time.perf_counter()
+        env = {**os.environ, "PYTHONUNBUFFERED": "1"}
+        try:
+            proc = subprocess.Popen(script.get("command") or command_for(script["path"]), stdin=stdin,
+                                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+        except OSError as e:
+            result["error"] = str(e)
+            return result
+        usage = {"proc": _ps(proc.pid), "peak_rss": 0, "cpu": 0.0}
+        _sample(usage)
+        with self._lock:
+            self._procs[proc.pid] = proc
+            self._usage[proc.pid] = usage
+        # One file per run: concurrent runs of the same script must not share a log
+        log = log_path_for(script["name"], self.log_dir, result["started_at"], proc.pid) if self.log_dir else None
+        capture = OutputCapture(script["name"], log, self.tail_lines,
+                                on_line=lambda stream, line: self.on_line(script, stream, line))
+        readers = start_pumps(proc, capture)
+        try:
+            exact = self._wait(proc, result)
+        finally:
+            with self._lock:
+                self._procs.pop(proc.pid, None)
+                self._usage.pop(proc.pid, None)
+        cpu, peak = exact or (usage["cpu"], 0)
+        for reader in readers:
+            reader.join(5)  # a detached grandchild may still hold the pipe
+        capture.close()
+        if log:
+            prune_logs(script["name"], self.log_dir)
+        result.update(exit_code=proc.returncode, seconds=time.perf_counter() - start, lines=capture.lines,
+                      bytes=capture.bytes, tail=capture.tail.snapshot(), log=log, cpu_seconds=cpu,
+                      peak_rss=max(peak, usage["peak_rss"]))
+        return result
+
+
+def _ps(pid: int):
+    try:
+        return psutil.Process(pid)
+    except psutil.Error:
+        return None
+
+
+def _sample(usage: dict):
+    """One reading of a running script's process tree: summed RSS and CPU so far."""
+    proc = usage["proc"]
+    if proc is None:
+        return
+    try:
+        tree = [proc] + proc.children(recursive=True)
+        times = proc.cpu_times()
+    except psutil.Error:
+        return
+    rss, cpu = 0, times.user + times.system + getattr(times, "children_user", 0) + getattr(times, "children_system", 0)
+    for p in tree:
+        try:
+            rss += p.memory_info().rss
+            if p is not proc:
+                t = p.cpu_times()
+                cpu += t.user + t.system
+        except psutil.Error:
+            pass
+    usage["peak_rss"] = max(usage["peak_rss"], rss)
+    usage["cpu"] = max(usage["cpu"], cpu)
+
+
+def succeeded(result: dict) -> bool:
+    return result["exit_code"] == 0 and not result["timed_out"] and not result["error"]
+
+
+def print_summary(results: list, wall: float, output: Console = None):
+    output = output or console
+    table = Table(title="Run Summary", border_style="blue")
+    table.add_column("Script", style="white")
+    table.add_column("Result")
+    table.add_column("Exit", justify="right")
+    table.add_column("Time", justify="right", style="yellow")
+    table.add_column("CPU", justify="right", style="dim")
+    table.add_column("Peak RSS", justify="right", style="dim")
+    table.add_column("Output", justify="right", style="dim")
+    for r in results:
+        if r["error"]:
+            outcome = f"[red]✕ {r['error']}[/red]"
+        elif r["timed_out"]:
+            outcome = "[red]⏱ Timed out[/red]"
+        elif r["exit_code"] == 0:
+            outcome = "[green]✓ Success[/green]"
+        else:
+            outcome = "[red]✕ Failed[/red]"
+        table.add_row(r["name"], outcome, "-" if r["exit_code"] is None else str(r["exit_code"]),
+                      f"{r['seconds']:.2f}s", "-" if r["cpu_seconds"] is None else f"{r['cpu_seconds']:.2f}s",
+                      f"{r['peak_rss'] / 1e6:.0f} MB" if r["peak_rss"] else "-", f"{r['lines']} lines")
+    output.print(table)
+    for r in results:
+        if not succeeded(r) and r["tail"]:
+            lines = "\n".join(line for _, line in r["tail"][-FAILURE_TAIL:])
+            footer = f"[dim]Full output: {r['log']}[/dim]" if r["log"] else None
+            output.print(Panel(Text(lines), title=f"[red]{r['name']}[/red] (last lines)", subtitle=footer,
+                               border_style="red"))
+    ok = sum(1 for r in results if succeeded(r))
+    busy = sum(r["seconds"] for r in results)
+    output.print(f"[bold]{ok}/{len(results)} succeeded[/bold] in {wall:.2f}s "
+                  f"[dim]({busy:.2f}s of script time)[/dim]")
+
+
+def benchmark_runner(count: int = 8, seconds: float = 0.5) -> list:
+    """Wall time for `count` scripts that each print and sleep, one at a time vs pooled."""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scripts = []
+        for i in range(count):
+            path = os.path.join(tmp, f"job{i}.py")
+            with open(path, "w") as f:
+                f.write(f"import time\nfor n in range(5):\n    print('step', n)\n    time.sleep({seconds / 5})\n")
+            scripts.append({"name": f"job{i}.py", "path": path})
+        rows = []
+        for workers in (1, DEFAULT_WORKERS, count):
+            start = time.perf_counter()
+            results = ScriptRunner(workers, on_line=lambda *args: None, log_dir=None).run(scripts)
+            assert all(succeeded(r) and r["lines"] == 5 for r in results)
+            rows.append((workers, time.perf_counter() - start))
+        return rows
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    table = Table(title=f"Script Runner :: {count} scripts x 0.5s")
+    table.add_column("Workers", justify="right", style="cyan")
+    table.add_column("Wall time", justify="right", style="bold green")
+    for workers, wall in benchmark_runner(count):
+        table.add_row(str(workers), f"{wall:.2f}s")
+    console.print(table)
@@ -0,0 +1,387 @@
+"""
+Script Scheduler - Cron Jobs for Local Scripts.
+
+Jobs live in ~/.shortcut/scripts/schedule.json; each runs one script
+from the scripts directory on a standard five-field cron expression
+(minute hour day-of-month month day-of-week, with lists, ranges, steps,
+month/day names and the @hourly/@daily/@weekly/@monthly/@yearly
+macros). `scripts schedule daemon` runs them all from a single process:
+
+- Due times sit in a heap and the daemon sleeps exactly until the next
+  one. Nothing is polled. `scripts schedule add/remove` nudge a running
+  daemon over a loopback datagram so it reloads the file immediately.
+  The same port doubles as the single-instance lock.
+- `jitter` delays each run by a random 0..N seconds, so jobs that share
+  a schedule do not all start in the same second.
+- A job never overlaps itself. If its previous run is still going (or
+  still waiting for a slot), the new occurrence is skipped and logged.
+- `concurrency` caps how many scheduled scripts run at once. Runs
+  beyond it wait for a free slot.
+- Occurrences missed while the daemon was down are caught up per job:
+  "once" runs the job a single time at startup, "skip" just resumes the
+  schedule.
+
+Runs are recorded in the script_stats store with source "schedule",
+so they show up in `scripts stats` and `scripts schedule log`. The
+daemon keeps its own per-job state (last fire time and result) in
+schedule-state.json, separate from the job definitions that the CLI
+edits.
+"""
+
+import os
+import json
+import time
+import heapq
+import random
+import socket
+import selectors
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from rich.console import Console
+
+SCHEDULE_PATH = os.path.expanduser("~/.shortcut/scripts/schedule.json")
+STATE_PATH = os.path.expanduser("~/.shortcut/scripts/schedule-state.json")
+CONTROL_PORT = 47474
+DEFAULT_CONCURRENCY = 2
+CATCH_UP_POLICIES = ("once", "skip")
+SEARCH_YEARS = 8  # no match this far ahead means never (e.g. 0 0 30 2 *)
+
+console = Console()
+
+_MACROS = {
+    "@yearly": "0 0 1 1 *", "@annually": "0 0 1 1 *", "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0", "@daily": "0 0 * * *", "@midnight": "0 0 * * *", "@hourly": "0 * * * *",
+}
+_MONTHS = {name: i for i, name in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], start=1)}
+_DAYS = {name: i for i, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])}
+
+
+def _parse_field(field: str, low: int, high: int, names: dict = None) -> set:
+    values = set()
+    for part in field.lower().split(","):
+        spec, slash, step = part.partition("/")
+        step = int(step) if slash else 1
+        if step < 1:
+            raise ValueError(f"bad step in '{part}'")
+        if spec == "*":
+            start, end = low, high
+        else:
+            bounds = [names[b] if names and b in names else int(b) for b in spec.split("-", 1)]
+            start = bounds[0]
+            # "a-b", plain "a", or "a/n" which runs from a to the top of the range
+            end = bounds[1] if len(bounds) == 2 else (high if slash else start)
+        if not low <= start <= end <= high:
+            raise ValueError(f"'{part}' is outside {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronExpr:
+    """A parsed cron expression; next_after() finds the next matching minute."""
+
+    def __init__(self, expr: str):
+        self.expr = expr.strip()
+        fields = _MACROS.get(self.expr.lower(), self.expr).split()
+        if len(fields) != 5:
+            raise ValueError(f"'{expr}' needs 5 fields (minute hour day month weekday) or a macro like @daily")
+        try:
+            self.minutes = _parse_field(fields[0], 0, 59)
+            self.hours = _parse_field(fields[1], 0, 23)
+            self.days = _parse_field(fields[2], 1, 31)
+            self.months = _parse_field(fields[3], 1, 12, _MONTHS)
+            weekdays = _parse_field(fields[4], 0, 7, _DAYS)
+        except (ValueError, KeyError) as e:
+            raise ValueError(f"bad cron expression '{expr}': {e}") from None
+        self.weekdays = {d % 7 for d in weekdays}  # 0 and 7 are both Sunday
+        # Classic cron: when both day fields are restricted a day matching either one counts
+        self._any_day = fields[2] == "*" or fields[4] == "*"
+
+    def _day_matches(self, dt: datetime) -> bool:
+        dom = dt.day in self.days
+        dow = (dt.weekday() + 1) % 7 in self.weekdays
+        return (dom and dow) if self._any_day else (dom or dow)
+
+    def next_after(self, ts: float) -> float:
+        """Timestamp of the first matching minute strictly after `ts` (local time)."""
+        dt = datetime.fromtimestamp(ts).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt.year + SEARCH_YEARS
+        # Skip whole months, days and hours that cannot match instead of stepping minute by minute
+        while dt.year <= limit:
+            if dt.month not in self.months:
+                dt = (dt.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + timedelta(days=1)
+            elif dt.hour not in self.hours:
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+            else:
+                later = [m for m in self.minutes if m >= dt.minute]
+                if later:
+                    return dt.replace(minute=min(later)).timestamp()
+                dt = dt.replace(minute=0) + timedelta(hours=1)
+        raise ValueError(f"'{self.expr}' never matches")
+
+    def __str__(self):
+        return self.expr
+
+
+def load_jobs(path: str = SCHEDULE_PATH) -> dict:
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get("jobs", {}) if isinstance(data, dict) else {}
+
+
+def save_jobs(jobs: dict, path: str = SCHEDULE_PATH):
+    _write_json(path, {"saved_at": time.time(), "jobs": jobs})
+
+
+def load_state(path: str = STATE_PATH) -> dict:
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_json(path: str, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def make_job(script: str, cron: str, jitter: int = 0, catch_up: str = "once", timeout: float = None) -> dict:
+    """Validated job definition; raises ValueError for a bad expression or policy."""
+    CronExpr(cron).next_after(time.time())
+    if catch_up not in CATCH_UP_POLICIES:
+        raise ValueError(f"catch-up policy must be one of {', '.join(CATCH_UP_POLICIES)}")
+    return {"script": script, "cron": cron, "jitter": max(0, int(jitter)), "catch_up": catch_up,
+            "timeout": timeout, "created_at": time.time()}
+
+
+def notify_daemon(port: int = CONTROL_PORT) -> bool:
+    """Ask a running daemon to reload the schedule. False if none is listening (best effort over UDP)."""
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        try:
+            sock.sendto(b"reload", ("127.0.0.1", port))
+        except OSError:
+            return False
+    return daemon_running(port)
+
+
+def daemon_running(port: int = CONTROL_PORT) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        try:
+            sock.bind(("127.0.0.1", port))
+        except OSError:
+            return True
+    return False
+
+
+class Scheduler:
+    """
+    The daemon. `scripts_dir` is where job scripts are looked up at run
+    time, so an edited script is picked up without a reload.
+    """
+
+    def __init__(self, scripts_dir: str, concurrency: int = DEFAULT_CONCURRENCY, path: str = SCHEDULE_PATH,
+                 state_path: str = STATE_PATH, port: int = CONTROL_PORT, stats_path: str = None,
+                 output: Console = None):
+        self.scripts_dir = scripts_dir
+        self.concurrency = max(1, concurrency)
+        self.path = path
+        self.state_path = state_path
+        self.port = port
+        self.stats_path = stats_path
+        self.console = output or console
+        self.jobs = {}
+        self.state = load_state(state_path)
+        self.stats = {"runs": 0, "failures": 0, "skipped": 0, "caught_up": 0}
+        self._heap = []
+        self._generation = 0
+        self._active = set()  # jobs running or waiting for a slot
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._pool = None
+        self._sock = None
+
+    # -- schedule -------------------------------------------------------
+
+    def reload(self, catch_up: bool = False):
+        """Re-read the job file and rebuild the heap. Running jobs are unaffected."""
+        self.jobs = {}
+        for name, job in load_jobs(self.path).items():
+            try:
+                self.jobs[name] = dict(job, expr=CronExpr(job["cron"]))
+            except (KeyError, ValueError) as e:
+                self._log(f"[red]{name}: {e}; ignored[/red]")
+        self._generation += 1
+        self._heap = []
+        now = time.time()
+        for name, job in self.jobs.items():
+            last = self.state.setdefault(name, {}).setdefault("last_due", now)
+            if catch_up and job.get("catch_up", "once") == "once" and job["expr"].next_after(last) <= now:
+                self.stats["caught_up"] += 1
+                self._log(f"[yellow]{name}: missed a run while stopped; catching up[/yellow]")
+                self._push(name, now, now, catch_up=True)
+            self._schedule_next(name, now)
+        self._save_state()
+
+    def _schedule_next(self, name: str, after: float):
+        due = self.jobs[name]["expr"].next_after(after)
+        self._push(name, due, due + random.uniform(0, self.jobs[name].get("jitter") or 0))
+
+    def _push(self, name: str, due: float, at: float, catch_up: bool = False):
+        heapq.heappush(self._heap, (at, due, name, self._generation, catch_up))
+
+    def next_runs(self) -> list:
+        """(run_at, job) pairs for the current schedule, soonest first."""
+        return sorted((at, name) for at, _, name, gen, catch_up in self._heap
+                      if gen == self._generation and not catch_up)
+
+    # -- daemon ---------------------------------------------------------
+
+    def run(self):
+        """Run until stop() (or Ctrl+C). Raises OSError if another daemon holds the control port."""
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            self._sock.bind(("127.0.0.1", self.port))
+        except OSError:
+            self._sock.close()
+            raise OSError(f"a scheduler daemon is already running (port {self.port} is taken)") from None
+        selector = selectors.DefaultSelector()
+        selector.register(self._sock, selectors.EVENT_READ)
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="scheduled")
+        try:
+            self.reload(catch_up=True)
+            while not self._stop.is_set():
+                self._fire_due()
+                timeout = max(0.0, self._heap[0][0] - time.time()) if self._heap else None
+                if selector.select(timeout):
+                    message = self._sock.recv(64)
+                    if message == b"reload":
+                        self.reload()
+                        self._log(f"[dim]Schedule reloaded: {len(self.jobs)} job(s)[/dim]")
+        finally:
+            selector.close()
+            self._sock.close()
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._save_state()
+
+    def stop(self):
+        self._stop.set()
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(b"stop", ("127.0.0.1", self.port))
+
+    def _fire_due(self):
+        now = time.time()
+        while self._heap and self._heap[0][0] <= now:
+            _, due, name, generation, catch_up = heapq.heappop(self._heap)
+            if generation != self._generation:
+                continue
+            if not catch_up:
+                # Next occurrence after the one firing now; a late wake-up skips anything already past
+                self._schedule_next(name, max(due, now))
+            with self._lock:
+                job_state = self.state.setdefault(name, {})
+                job_state["last_due"] = max(due, job_state.get("last_due") or 0)
+                busy = name in self._active
+                if busy:
+                    self.stats["skipped"] += 1
+                    job_state["skipped"] = job_state.get("skipped", 0) + 1
+                else:
+                    self._active.add(name)
+            if busy:
+                self._log(f"[yellow]{name}: previous run still going; skipped[/yellow]")
+            else:
+                self._pool.submit(self._run_job, name, dict(self.jobs[name]))
+        self._save_state()
+
+    def _run_job(self, name: str, job: dict):
+        from script_runner import ScriptRunner, succeeded
+        from script_stats import STATS_PATH, record_runs
+        path = os.path.join(self.scripts_dir, job["script"])
+        self._log(f"[cyan]{name}[/cyan] :: starting {job['script']}")
+        # Failures to start are results too: logged below and kept for `scripts schedule log`
+        failed = {"name": job["script"], "path": path, "exit_code": None, "timed_out": False,
+                  "seconds": 0.0, "started_at": time.time()}
+        try:
+            if not os.path.isfile(path):
+                result = {**failed, "error": f"{path} not found"}
+            else:
+                try:
+                    result = ScriptRunner(workers=1, timeout=job.get("timeout"), on_line=lambda *args: None,
+                                          interactive=False).run([{"name": job["script"], "path": path}])[0]
+                except Exception as e:
+                    result = {**failed, "error": f"{e.__class__.__name__}: {e}"}
+            record_runs([result], "schedule", self.stats_path or STATS_PATH)
+        finally:
+            with self._lock:
+                self._active.discard(name)
+        ok = succeeded(result)
+        with self._lock:
+            self.stats["runs"] += 1
+            self.stats["failures"] += 0 if ok else 1
+            self.state.setdefault(name, {}).update(
+                last_run=time.time(), last_exit=result["exit_code"], last_seconds=result["seconds"],
+                last_error=result.get("error") or ("timed out" if result["timed_out"] else None))
+        if ok:
+            self._log(f"[green]{name}[/green] :: done in {result['seconds']:.2f}s")
+        else:
+            reason = result.get("error") or ("timed out" if result["timed_out"] else f"exit {result['exit_code']}")
+            log = f" [dim]({result['log']})[/dim]" if result.get("log") else ""
+            self._log(f"[red]{name}[/red] :: failed, {reason}{log}")
+        self._save_state()
+
+    def _save_state(self):
+        with self._lock:
+            state = json.loads(json.dumps(self.state))
+        try:
+            _write_json(self.state_path, state)
+        except OSError:
+            pass
+
+    def _log(self, message: str):
+        self.console.print(f"[dim]{datetime.now().strftime('%H:%M:%S')}[/dim] {message}", highlight=False)
+
+
+def benchmark_scheduler(expressions: int = 10_000) -> dict:
+    """Time cron parsing and next-run lookups, including sparse expressions that skip whole months."""
+    exprs = ["*/5 * * * *", "0 3 * * 1-5", "30 2 29 2 *", "0 0 1 jan,jul *", "15 9-17/2 * * mon,wed,fri", "@daily"]
+    start = time.perf_counter()
+    parsed = [CronExpr(exprs[i % len(exprs)]) for i in range(expressions)]
+    parse_s = time.perf_counter() - start
+    now = time.time()
+    start = time.perf_counter()
+    for expr in parsed:
+        expr.next_after(now)
+    next_s = time.perf_counter() - start
+    leap = CronExpr("30 2 29 2 *")
+    start = time.perf_counter()
+    ts = now
+    for _ in range(5):
+        ts = leap.next_after(ts)
+    leap_s = time.perf_counter() - start
+    return {"expressions": expressions, "parse_s": parse_s, "next_s": next_s, "leap_s": leap_s,
+            "leap_next": datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M")}
+
+
+if __name__ == "__main__":
+    import sys
+    from rich.table import Table
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    r = benchmark_scheduler(n)
+    table = Table(title=f"Script Scheduler :: {n:,} cron expressions")
+    table.add_column("Operation", style="cyan")
+    table.add_column("Per call", justify="right", style="bold green")
+    table.add_row("Parse", f"{r['parse_s'] / n * 1e6:.1f} µs")
+    table.add_row("Next run", f"{r['next_s'] / n * 1e6:.1f} µs")
+    table.add_row(f"Five Feb 29 runs ahead (→ {r['leap_next']})", f"{r['leap_s'] / 5 * 1e6:.0f} µs")
+    console.print(table)
@@ -0,0 +1,213 @@
+"""
+Script Stats - Execution History and Timing Database.
+
+Every script run (`scripts run`, the TUI, the GUI and the scheduler) is
+appended to a local SQLite time series: when it started, wall and CPU
+time, peak RSS, exit code and output size. `scripts stats` summarises it per script
+(runs, failures, p50/p95 duration, CPU, peak memory), shows whether the
+latest runs are trending slower than the ones before them, and lists
+the slowest individual runs.
+
+A script that could not be started at all (missing file, launcher
+error) is recorded with its error: it counts as a failure but not
+towards the timings.
+
+Recording is best effort: a locked or unwritable database never fails
+the run it describes.
+"""
+
+import os
+import math
+import time
+import sqlite3
+
+from local_db import connect, migrate, transaction
+
+STATS_PATH = os.path.expanduser("~/.shortcut/scripts/stats.db")
+TREND_RUNS = 5  # latest runs compared against the ones before them
+TREND_FLAT = 0.10  # a change within ±10% counts as steady
+
+_MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS runs (
+        id INTEGER PRIMARY KEY,
+        script TEXT NOT NULL,
+        path TEXT,
+        source TEXT NOT NULL,
+        started_at REAL NOT NULL,
+        wall REAL NOT NULL,
+        cpu REAL,
+        peak_rss INTEGER,
+        exit_code INTEGER,
+        timed_out INTEGER NOT NULL DEFAULT 0,
+        output_bytes INTEGER NOT NULL DEFAULT 0,
+        output_lines INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE INDEX IF NOT EXISTS runs_started_at ON runs (started_at);
+    CREATE INDEX IF NOT EXISTS runs_script ON runs (script, started_at)
+    """,
+    "ALTER TABLE runs ADD COLUMN error TEXT",
+]
+
+
+def percentile(values: list, q: float):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    return values[max(0, math.ceil(q / 100 * len(values)) - 1)]
+
+
+def _median(values: list):
+    return percentile(sorted(values), 50)
+
+
+class ScriptStats:
+    def __init__(self, path: str = STATS_PATH):
+        self.path = path
+        self.conn = connect(path)
+        migrate(self.conn, _MIGRATIONS)
+
+    def record(self, result: dict, source: str) -> bool:
+        return self.record_many([result], source)
+
+    def record_many(self, results: list, source: str) -> bool:
+        """Store ScriptRunner results. Returns False (and drops them) if the store is unavailable."""
+        rows = [(r["name"], r.get("path"), source, r.get("started_at") or time.time(), r.get("seconds", 0.0),
+                 r.get("cpu_seconds"), r.get("peak_rss"), r.get("exit_code"), int(bool(r.get("timed_out"))),
+                 r.get("bytes", 0), r.get("lines", 0), r.get("error")) for r in results]
+        try:
+            with transaction(self.conn):
+                self.conn.executemany(
+                    "INSERT INTO runs (script, path, source, started_at, wall, cpu, peak_rss, exit_code, timed_out, "
+                    "output_bytes, output_lines, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error:
+            return False
+        return True
+
+    def summary(self, since: float = None) -> list:
+        """
+        Per-script aggregates for runs started after `since`, slowest p95
+        first. `trend` is the relative change of the median of the last
+        TREND_RUNS runs against the median of the runs before them (None
+        until there are enough runs). Runs that never started count as
+        failures only; p50/p95 are None for a script with no started runs.
+        """
+        rows = self.conn.execute(
+            "SELECT script, started_at, wall, cpu, peak_rss, exit_code, timed_out, error FROM runs "
+            "WHERE started_at >= ? ORDER BY script, started_at", (since or 0,)).fetchall()
+        groups = {}
+        for row in rows:
+            groups.setdefault(row["script"], []).append(row)
+        out = []
+        for script, runs in groups.items():
+            walls = [r["wall"] for r in runs if not r["error"]]
+            ordered = sorted(walls)
+            cpus = sorted(r["cpu"] for r in runs if r["cpu"] is not None)
+            recent, earlier = walls[-TREND_RUNS:], walls[:-TREND_RUNS]
+            trend = None
+            if earlier and _median(earlier):
+                trend = _median(recent) / _median(earlier) - 1
+            out.append({
+                "script": script,
+                "runs": len(runs),
+                "failures": sum(1 for r in runs if r["exit_code"] != 0 or r["timed_out"] or r["error"]),
+                "p50": percentile(ordered, 50),
+                "p95": percentile(ordered, 95),
+                "cpu_p50": percentile(cpus, 50),
+                "peak_rss": max((r["peak_rss"] or 0 for r in runs), default=0),
+                "total": sum(walls),
+                "trend": trend,
+                "last_run": runs[-1]["started_at"],
+            })
+        out.sort(key=lambda s: s["p95"] or 0, reverse=True)
+        return out
+
+    def slowest(self, limit: int = 10, since: float = None) -> list:
+        return [dict(r) for r in self.conn.execute(
+            "SELECT * FROM runs WHERE started_at >= ? AND error IS NULL ORDER BY wall DESC LIMIT ?",
+            (since or 0, limit))]
+
+    def recent(self, script: str = None, limit: int = 20, source: str = None) -> list:
+        """Latest runs, newest first, optionally of one script and/or from one source."""
+        where, args = [], []
+        for column, value in [("script", script), ("source", source)]:
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(value)
+        clause = f"WHERE {' AND '.join(where)} " if where else ""
+        return [dict(r) for r in self.conn.execute(
+            f"SELECT * FROM runs {clause}ORDER BY started_at DESC LIMIT ?", (*args, limit))]
+
+    def close(self):
+        self.conn.close()
+
+
+def record_runs(results: list, source: str, path: str = STATS_PATH) -> bool:
+    """Open the store, record `results` and close it. Never raises for storage problems."""
+    try:
+        stats = ScriptStats(path)
+    except (sqlite3.Error, OSError):
+        return False
+    try:
+        return stats.record_many(results, source)
+    finally:
+        stats.close()
+
+
+def exit_label(run: dict) -> str:
+    """What the Exit column shows for a recorded run."""
+    if run.get("error"):
+        return "error"
+    return "timeout" if run["timed_out"] else str(run["exit_code"])
+
+
+def trend_label(trend) -> str:
+    if trend is None:
+        return "[dim]-[/dim]"
+    if abs(trend) < TREND_FLAT:
+        return "[dim]≈ steady[/dim]"
+    return f"[red]↑ {trend:+.0%}[/red]" if trend > 0 else f"[green]↓ {trend:+.0%}[/green]"
+
+
+def benchmark_stats(runs: int = 100_000, scripts: int = 200) -> dict:
+    """Record `runs` synthetic runs, then time the `scripts stats` queries."""
+    import random
+    import tempfile
+
+    rnd = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        stats = ScriptStats(os.path.join(tmp, "stats.db"))
+        now = time.time()
+        batch = [{"name": f"script-{rnd.randrange(scripts)}.py", "path": None, "started_at": now - rnd.random() * 90 * 86400,
+                  "seconds": rnd.lognormvariate(0, 1), "cpu_seconds": rnd.random(), "peak_rss": rnd.randrange(10**8),
+                  "exit_code": 0 if rnd.random() > 0.05 else 1, "timed_out": False, "bytes": 100, "lines": 2}
+                 for _ in range(runs)]
+        start = time.perf_counter()
+        for i in range(0, runs, 1000):
+            stats.record_many(batch[i:i + 1000], "bench")
+        record_s = time.perf_counter() - start
+        start = time.perf_counter()
+        summary = stats.summary(now - 7 * 86400)
+        week_s = time.perf_counter() - start
+        start = time.perf_counter()
+        stats.summary()
+        stats.slowest(10)
+        all_s = time.perf_counter() - start
+        stats.close()
+    return {"runs": runs, "record_s": record_s, "week_s": week_s, "week_scripts": len(summary), "all_s": all_s}
+
+
+if __name__ == "__main__":
+    import sys
+    from rich.console import Console
+    from rich.table import Table
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    r = benchmark_stats(n)
+    table = Table(title=f"Script Stats :: {n:,} recorded runs")
+    table.add_column("Operation", style="cyan")
+    table.add_column("Time", justify="right", style="bold green")
+    table.add_row("Record (batches of 1000)", f"{r['record_s']:.2f}s")
+    table.add_row(f"Summary, last 7 days ({r['week_scripts']} scripts)", f"{r['week_s'] * 1000:.0f} ms")
+    table.add_row("Summary + slowest, all time", f"{r['all_s'] * 1000:.0f} ms")
+    Console().print(table)
@@ -0,0 +1,226 @@
+"""
+Seed Codecs - Parallel Compression Engine for .nxs Seeds.
+
+The seed tarball is cut into fixed-size blocks which are compressed on
+every available core and written back in order as independent members
+(gzip members / zstd frames / lz4 frames). Concatenated members are a
+valid stream for every codec, so a seed can be read back with the stock
+single-stream decompressors.
+
+Run `python seed_codecs.py <context>` for a throughput benchmark against
+the legacy single-threaded `w:gz` path.
+"""
+
+import io
+import os
+import gzip
+import time
+import tarfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+try:
+    import lz4.frame
+    LZ4_AVAILABLE = True
+except ImportError:
+    LZ4_AVAILABLE = False
+
+DEFAULT_CODEC = "gzip"
+CHUNK_SIZE = 4 * 1024 * 1024
+
+# codec name -> (seed member suffix, default level)
+CODECS = {
+    "gzip": (".gz", 6),
+    "zstd": (".zst", 3),
+    "lz4": (".lz4", 0),
+    "none": ("", None),
+}
+
+
+def available_codecs() -> list:
+    """Codecs usable in this interpreter (zstd/lz4 need optional packages)."""
+    names = ["gzip", "none"]
+    if ZSTD_AVAILABLE: names.insert(1, "zstd")
+    if LZ4_AVAILABLE: names.insert(-1, "lz4")
+    return names
+
+
+def seed_member_name(codec: str) -> str:
+    """Name of the seed member inside the .nxs zip for a given codec."""
+    _check_codec(codec)
+    return f"seed.tar{CODECS[codec][0]}"
+
+
+def _check_codec(codec: str):
+    if codec not in CODECS:
+        raise ValueError(f"Unknown seed codec: {codec} (expected one of {', '.join(CODECS)})")
+    if codec == "zstd" and not ZSTD_AVAILABLE:
+        raise RuntimeError("zstd codec requires the 'zstandard' package (pip install zstandard)")
+    if codec == "lz4" and not LZ4_AVAILABLE:
+        raise RuntimeError("lz4 codec requires the 'lz4' package (pip install lz4)")
+
+
+def compress_block(data: bytes, codec: str, level: int = None) -> bytes:
+    """Compress one block into a self-contained member of the codec's stream format."""
+    level = CODECS[codec][1] if level is None else level
+    if codec == "gzip":
+        # mtime=0 keeps members deterministic and takes zlib's one-shot path
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    if codec == "lz4":
+        return lz4.frame.compress(data, compression_level=level)
+    return data
+
+
+class ParallelCompressWriter(io.RawIOBase):
+    """
+    Write-only stream that compresses blocks on a worker pool.
+
+    zlib, zstd and lz4 all release the GIL while compressing, so a thread
+    pool scales across cores without pickling blocks into child processes
+    (which would also re-import the CLI on Windows spawn).
+    In-flight blocks are capped at `2 * workers`, keeping memory bounded.
+    """
+
+    def __init__(self, sink, codec: str = DEFAULT_CODEC, level: int = None,
+                 workers: int = None, chunk_size: int = CHUNK_SIZE):
+        _check_codec(codec)
+        self.sink = sink
+        self.codec = codec
+        self.level = level
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._buffer = bytearray()
+        self._pending = deque()
+        self._pool = ThreadPoolExecutor(max_workers=self.workers) if codec != "none" else None
+
+    def writable(self):
+        return True
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError("write to closed ParallelCompressWriter")
+        self._buffer += data
+        self.bytes_in += len(data)
+        while len(self._buffer) >= self.chunk_size:
+            block = bytes(self._buffer[:self.chunk_size])
+            del self._buffer[:self.chunk_size]
+            self._submit(block)
+        return len(data)
+
+    def _submit(self, block: bytes):
+        if self._pool is None:
+            self._emit(block)
+            return
+        self._pending.append(self._pool.submit(compress_block, block, self.codec, self.level))
+        while len(self._pending) >= self.workers * 2:
+            self._emit(self._pending.popleft().result())
+
+    def _emit(self, data: bytes):
+        self.sink.write(data)
+        self.bytes_out += len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self._buffer or (self.bytes_in == 0 and self.codec != "none"):
+                # Always emit at least one member so the stream is well-formed
+                self._submit(bytes(self._buffer))
+                self._buffer.clear()
+            while self._pending:
+                self._emit(self._pending.popleft().result())
+        finally:
+            if self._pool:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+            super().close()
+
+
+def open_seed_reader(raw, codec: str = DEFAULT_CODEC):
+    """
+    Wrap a readable binary stream with the matching decompressor.
+    Multi-member/multi-frame streams written by ParallelCompressWriter are
+    read transparently, as are legacy single-member gzip seeds.
+    """
+    _check_codec(codec)
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+    if codec == "lz4":
+        return lz4.frame.LZ4FrameFile(raw, mode="rb")
+    return raw
+
+
+class _NullSink:
+    """Counts bytes written and discards them."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+        return len(data)
+
+
+def benchmark_codecs(context_path: str, codecs: list = None, workers: int = None) -> list:
+    """
+    Measure seed compression throughput for a context directory.
+    The first row is the legacy single-threaded `tarfile` `w:gz` path;
+    one row follows per parallel codec. Output is discarded, so the numbers
+    reflect tar + compression cost only.
+    """
+    results = []
+
+    sink = _NullSink()
+    start = time.perf_counter()
+    with tarfile.open(fileobj=sink, mode="w|gz") as tar:
+        tar.add(context_path, arcname="root")
+    elapsed = time.perf_counter() - start
+    raw_size = tar.offset
+    results.append({"codec": "gzip (legacy w:gz)", "workers": 1, "seconds": elapsed,
+                    "raw_bytes": raw_size, "compressed_bytes": sink.size,
+                    "mb_per_sec": raw_size / elapsed / 1e6 if elapsed else 0.0})
+
+    for codec in codecs or available_codecs():
+        sink = _NullSink()
+        start = time.perf_counter()
+        writer = ParallelCompressWriter(sink, codec, workers=workers)
+        with writer, tarfile.open(fileobj=writer, mode="w|") as tar:
+            tar.add(context_path, arcname="root")
+        elapsed = time.perf_counter() - start
+        results.append({"codec": codec, "workers": writer.workers, "seconds": elapsed,
+                        "raw_bytes": writer.bytes_in, "compressed_bytes": sink.size,
+                        "mb_per_sec": writer.bytes_in / elapsed / 1e6 if elapsed else 0.0})
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    from rich.console import Console
+    from rich.table import Table
+
+    if len(sys.argv) < 2:
+        print("Usage: python seed_codecs.py <context_path> [workers]")
+        sys.exit(1)
+
+    rows = benchmark_codecs(sys.argv[1], workers=int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    table = Table(title=f"Seed Compression :: {sys.argv[1]}")
+    table.add_column("Codec", style="cyan")
+    table.add_column("Workers", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Ratio", justify="right")
+    table.add_column("MB/s", justify="right", style="bold green")
+    for r in rows:
+        ratio = r["compressed_bytes"] / r["raw_bytes"] if r["raw_bytes"] else 0.0
+        table.add_row(r["codec"], str(r["workers"]), f"{r['seconds']:.2f}", f"{ratio:.2%}", f"{r['mb_per_sec']:.1f}")
+    Console().print(table)
@@ -0,0 +1,212 @@
+"""
+Seed Hydrator - Parallel Extraction Engine for .nxs Seeds.
+
+The seed is decompressed once, in order, on the calling thread. File
+writes fan out over a thread pool (open/write/close release the GIL),
+parent directories are created once per directory instead of once per
+file, and permissions/timestamps are applied in batches after the data
+has landed. Large files are streamed inline so memory stays bounded.
+
+Run `python seed_hydrator.py [files] [size]` for a files/sec and MB/s
+benchmark against `tarfile.extractall`.
+"""
+
+import io
+import os
+import time
+import errno
+import shutil
+import tarfile
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Files up to this size are read into memory and written by the pool.
+INLINE_LIMIT = 1024 * 1024
+# Cap on file bytes buffered for the pool at any one time.
+MAX_PENDING_BYTES = 64 * 1024 * 1024
+# Metadata updates are applied in batches of this many paths per task.
+META_BATCH = 512
+
+
+def _write_file(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _apply_meta(batch: list):
+    for path, mode, mtime in batch:
+        os.chmod(path, mode)
+        os.utime(path, (mtime, mtime))
+
+
+class SeedHydrator:
+    """
+    Extracts a tar stream under `target`, stripping the leading `strip`
+    component ("root" for .nxs seeds). With `max_bytes`, extraction stops
+    with ENOSPC as soon as the file payload would exceed it.
+    """
+
+    def __init__(self, target: str, strip: str = "root", workers: int = None, max_bytes: int = None):
+        self.target = os.path.abspath(target)
+        self.max_bytes = max_bytes
+        self.strip = strip.rstrip("/") + "/" if strip else ""
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.stats = {"files": 0, "dirs": 0, "links": 0, "bytes": 0, "skipped": 0, "seconds": 0.0}
+        self._made_dirs = set()
+
+    def _local_path(self, name: str):
+        """
+        Map a member name to (path under target, relative posix name).
+        Returns (None, None) for members outside the stripped prefix.
+        """
+        if self.strip:
+            if name.rstrip("/") == self.strip[:-1]:
+                return self.target, ""
+            if not name.startswith(self.strip):
+                return None, None
+            name = name[len(self.strip):]
+        rel = os.path.normpath(name)
+        if os.path.isabs(rel) or rel == ".." or rel.startswith(".." + os.sep):
+            raise ValueError(f"Refusing to write outside the artifact root: {name}")
+        return os.path.join(self.target, rel), name.rstrip("/")
+
+    def _ensure_dir(self, path: str):
+        if path not in self._made_dirs:
+            os.makedirs(path, exist_ok=True)
+            self._made_dirs.add(path)
+            self.stats["dirs"] += 1
+
+    def hydrate(self, reader, only=None) -> dict:
+        """
+        Extract every member of the uncompressed tar stream `reader`.
+        `only` is an optional predicate on the stripped relative path.
+        Returns stats including files/sec and MB/s.
+        """
+        start = time.perf_counter()
+        self._ensure_dir(self.target)
+        file_meta, dir_meta, links = [], [], []
+        pending, pending_bytes = deque(), 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool, \
+                tarfile.open(fileobj=reader, mode="r|") as tar:
+            for member in tar:
+                path, rel = self._local_path(member.name)
+                if path is None:
+                    continue
+                if only and rel and not only(rel):
+                    self.stats["skipped"] += 1
+                    continue
+
+                if member.isdir():
+                    self._ensure_dir(path)
+                    dir_meta.append((path, member.mode, member.mtime))
+                elif member.isfile():
+                    if self.max_bytes is not None and self.stats["bytes"] + member.size > self.max_bytes:
+                        raise OSError(errno.ENOSPC, f"Seed exceeds the {self.max_bytes / 1e6:.1f} MB "
+                                                    f"hydration cap at {rel}")
+                    self._ensure_dir(os.path.dirname(path))
+                    src = tar.extractfile(member)
+                    if member.size <= INLINE_LIMIT and self.workers > 1:
+                        data = src.read()
+                        pending.append((pool.submit(_write_file, path, data), len(data)))
+                        pending_bytes += len(data)
+                        while pending_bytes > MAX_PENDING_BYTES:
+                            future, size = pending.popleft()
+                            future.result()
+                            pending_bytes -= size
+                    else:
+                        with open(path, "wb") as dst:
+                            shutil.copyfileobj(src, dst, INLINE_LIMIT)
+                    file_meta.append((path, member.mode, member.mtime))
+                    self.stats["files"] += 1
+                    self.stats["bytes"] += member.size
+                elif member.issym() or member.islnk():
+                    links.append((path, member))
+
+            for future, _ in pending:
+                future.result()
+
+            # Links last, once every target exists
+            for path, member in links:
+                self._ensure_dir(os.path.dirname(path))
+                if member.issym():
+                    resolved = os.path.normpath(os.path.join(os.path.dirname(path), member.linkname))
+                    if os.path.isabs(member.linkname) or not (resolved + os.sep).startswith(self.target + os.sep):
+                        raise ValueError(f"Refusing link outside the artifact root: {member.name} -> {member.linkname}")
+                    if not os.path.lexists(path):
+                        os.symlink(member.linkname, path)
+                else:
+                    source, _ = self._local_path(member.linkname)
+                    if source is None:
+                        raise ValueError(f"Refusing hard link outside the artifact root: {member.name}")
+                    if os.path.lexists(path): os.remove(path)
+                    os.link(source, path)
+                self.stats["links"] += 1
+
+            batches = [file_meta[i:i + META_BATCH] for i in range(0, len(file_meta), META_BATCH)]
+            for future in [pool.submit(_apply_meta, b) for b in batches]:
+                future.result()
+
+        # Directory times last (deepest first) so file writes don't bump them
+        dir_meta.sort(key=lambda m: m[0].count(os.sep), reverse=True)
+        _apply_meta(dir_meta)
+
+        elapsed = time.perf_counter() - start
+        self.stats["seconds"] = elapsed
+        self.stats["files_per_sec"] = self.stats["files"] / elapsed if elapsed else 0.0
+        self.stats["mb_per_sec"] = self.stats["bytes"] / elapsed / 1e6 if elapsed else 0.0
+        return self.stats
+
+
+def _synthetic_seed(files: int, size: int) -> bytes:
+    """Build an uncompressed seed tar of `files` files spread over 100 dirs."""
+    buf = io.BytesIO()
+    payload = os.urandom(size)
+    with tarfile.open(fileobj=buf, mode="w") as tar:
+        for i in range(files):
+            info = tarfile.TarInfo(f"root/d{i % 100:03d}/f{i:06d}.bin")
+            info.size = size
+            info.mode = 0o644
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(payload))
+    return buf.getvalue()
+
+
+def benchmark_hydration(files: int = 20000, size: int = 4096, workers: int = None) -> list:
+    """Compare serial `tarfile.extractall` with SeedHydrator on a synthetic seed."""
+    seed = _synthetic_seed(files, size)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        dest = os.path.join(tmp, "serial")
+        start = time.perf_counter()
+        with tarfile.open(fileobj=io.BytesIO(seed), mode="r|") as tar:
+            tar.extractall(dest)
+        elapsed = time.perf_counter() - start
+        results.append({"engine": "tarfile.extractall", "workers": 1, "files": files,
+                        "bytes": files * size, "seconds": elapsed,
+                        "files_per_sec": files / elapsed, "mb_per_sec": files * size / elapsed / 1e6})
+
+        hydrator = SeedHydrator(os.path.join(tmp, "parallel", "root"), workers=workers)
+        stats = hydrator.hydrate(io.BytesIO(seed))
+        results.append({"engine": "SeedHydrator", "workers": hydrator.workers, **stats})
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+    from rich.console import Console
+    from rich.table import Table
+
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    n_size = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+    table = Table(title=f"Seed Hydration :: {n_files} files x {n_size} bytes")
+    table.add_column("Engine", style="cyan")
+    table.add_column("Workers", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Files/s", justify="right", style="bold green")
+    table.add_column("MB/s", justify="right", style="bold green")
+    for r in benchmark_hydration(n_files, n_size):
+        table.add_row(r["engine"], str(r["workers"]), f"{r['seconds']:.2f}",
+                      f"{r['files_per_sec']:.0f}", f"{r['mb_per_sec']:.1f}")
+    Console().print(table)
@@ -0,0 +1,882 @@
+"""
+Session Sync - Live Workspace Merging for Connect Sessions.
+
+A sync session pairs a local directory with the same-named session on
+one or more peers. A watcher (inotify through ctypes on Linux, a periodic
+scan elsewhere) notices changed files, and each one is pushed to every
+peer over a "sync" stream on the peer's persistent session
+(peer_session). Files travel as rsync-style deltas (file_delta): the
+peer signs the copy it has and gets back only the blocks it lacks, so a
+small edit to a large file costs kilobytes.
+
+Every file remembers, per peer, the content hash both sides last agreed
+on, and each offer carries it as its base. The receiver fast-forwards
+when its copy is still that base; otherwise it has a conflict. Both
+sides settle a conflict the same way, so they converge: the version from
+the higher node id keeps the path and the other is saved beside it as
+`name.conflict-<hash8>.ext`, which then syncs like any new file. Deletes
+follow the same rule, and an edit beats a delete.
+
+Only the peers a session was shared with may join it: the node or
+username a peer proved on its session (see peer_session) must be in the
+session's peer list, and a pushing side checks that the session it
+opened really is the peer it meant to reach.
+
+Session state (root, peers, per-file hashes, conflicts, status) lives in
+~/.shortcut/connect/sessions.json, read by `connect sessions` and
+Connect.get_active_sessions.
+
+Run `python session_sync.py [size_mb]` for a loopback benchmark.
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import struct
+import select
+import asyncio
+import hashlib
+import tempfile
+import threading
+
+from rich.console import Console
+
+from context_scanner import ContextScanner, IgnoreMatcher
+from file_delta import Patcher, delta, signature
+from peer_session import DEAD_AFTER, SessionClosed
+
+SESSIONS_PATH = os.path.expanduser("~/.shortcut/connect/sessions.json")
+SYNC_DIR = ".nexus-sync"  # per-root scratch space for in-flight transfers; never synced
+POLL_EVERY = 2.0
+DEBOUNCE = 0.2
+RETRY_EVERY = 5.0
+SAVE_EVERY = 1.0
+SEND_CHUNK = 1024 * 1024
+
+console = Console(stderr=True)
+
+
+def _file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def conflict_name(rel: str, digest: str) -> str:
+    """Where the losing side of a conflict is kept; content-addressed so both peers agree."""
+    stem, ext = os.path.splitext(rel)
+    return f"{stem}.conflict-{digest[:8]}{ext}"
+
+
+def _safe_rel(rel: str) -> str:
+    """Reject peer-supplied paths that would land outside the session root."""
+    norm = os.path.normpath(rel).replace(os.sep, "/")
+    if os.path.isabs(rel) or norm.startswith("../") or norm in ("..", ".") or norm.split("/")[0] == SYNC_DIR:
+        raise ValueError(f"Refusing path {rel!r}")
+    return norm
+
+
+# ─────────────────────────────────────────────────────────────
+# Watchers: call on_change(rels) from their own thread; None = rescan all
+# ─────────────────────────────────────────────────────────────
+
+class PollingWatcher:
+    """Rescans the tree every `interval` seconds; works everywhere."""
+
+    def __init__(self, root: str, on_change, extra_excludes: list = None, interval: float = POLL_EVERY):
+        self.root = root
+        self.on_change = on_change
+        self.extra_excludes = extra_excludes
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _snapshot(self) -> dict:
+        entries = ContextScanner(self.root, self.extra_excludes).scan()
+        return {e.rel: (e.size, e.mtime) for e in entries if e.kind == "file"}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sync-poll", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        before = self._snapshot()
+        while not self._stop.wait(self.interval):
+            after = self._snapshot()
+            changed = [rel for rel in after.keys() | before.keys() if after.get(rel) != before.get(rel)]
+            before = after
+            if changed:
+                self.on_change(sorted(changed))
+
+    def stop(self):
+        self._stop.set()
+
+
+class InotifyWatcher:
+    """Linux inotify through ctypes: one watch per directory, added as directories appear."""
+
+    IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x2, 0x8, 0x40, 0x80
+    IN_CREATE, IN_DELETE, IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR = 0x100, 0x200, 0x4000, 0x8000, 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self, root: str, on_change, extra_excludes: list = None):
+        import ctypes
+        import ctypes.util
+        self.root = root
+        self.on_change = on_change
+        self.matcher = IgnoreMatcher.for_context(root, extra_excludes)
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._wds = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._watch_tree("")
+
+    def _watch_tree(self, rel_dir: str) -> list:
+        """Watch `rel_dir` and everything below it; returns the files found there."""
+        import ctypes
+        files = []
+        top = os.path.join(self.root, rel_dir)
+        for dirpath, dirnames, filenames in os.walk(top):
+            rel = os.path.relpath(dirpath, self.root).replace(os.sep, "/")
+            rel = "" if rel == "." else rel
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(dirpath), self.MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {dirpath}")
+            self._wds[wd] = rel
+            prefix = f"{rel}/" if rel else ""
+            dirnames[:] = [d for d in dirnames if not self.matcher.ignored(prefix + d, True)]
+            files.extend(prefix + f for f in filenames if not self.matcher.ignored(prefix + f, False))
+        return files
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sync-inotify", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        pending = set()
+        deadline = None
+        while not self._stop.is_set():
+            timeout = 0.5 if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], timeout)
+            if ready:
+                try:
+                    data = os.read(self.fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                if self._parse(data, pending) is None:
+                    pending = None  # queue overflowed: events were lost
+                deadline = deadline or time.monotonic() + DEBOUNCE
+            elif deadline is not None:
+                self.on_change(None if pending is None else sorted(pending))
+                pending, deadline = set(), None
+        os.close(self.fd)
+
+    def _parse(self, data: bytes, pending):
+        pos = 0
+        while pos < len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, pos)
+            name = data[pos + self._EVENT.size:pos + self._EVENT.size + length].rstrip(b"\0")
+            pos += self._EVENT.size + length
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            if mask & self.IN_IGNORED:
+                self._wds.pop(wd, None)
+                continue
+            if wd not in self._wds or not name:
+                continue
+            base = self._wds[wd]
+            rel = f"{base}/{os.fsdecode(name)}" if base else os.fsdecode(name)
+            is_dir = bool(mask & self.IN_ISDIR)
+            if self.matcher.ignored(rel, is_dir) or pending is None:
+                continue
+            if is_dir and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                try:
+                    pending.update(self._watch_tree(rel))
+                except OSError:
+                    return None
+            elif is_dir or not mask & self.IN_CREATE:
+                pending.add(rel)  # a directory that went away is reported by its path
+        return pending
+
+    def stop(self):
+        self._stop.set()
+
+
+def make_watcher(root: str, on_change, extra_excludes: list = None):
+    """inotify where available, polling otherwise (or when out of watches)."""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root, on_change, extra_excludes)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, on_change, extra_excludes)
+
+
+# ─────────────────────────────────────────────────────────────
+# Sessions
+# ─────────────────────────────────────────────────────────────
+
+class _Outbox:
+    """Ordered set of paths waiting to be pushed to one peer."""
+
+    def __init__(self):
+        self.paths = {}
+        self.ready = asyncio.Event()
+
+    def add(self, rel: str):
+        self.paths[rel] = None
+        self.ready.set()
+
+    async def next(self) -> str:
+        while not self.paths:
+            self.ready.clear()
+            await self.ready.wait()
+        rel = next(iter(self.paths))
+        del self.paths[rel]
+        return rel
+
+
+class SyncSession:
+    """
+    One shared directory. `files` maps a relative path to
+    {hash, size, mtime, synced: {peer node: hash}}; hash None = deleted.
+    """
+
+    def __init__(self, service: "SyncService", name: str, root: str, peers: list, state: dict = None):
+        state = state or {}
+        self.service = service
+        self.name = name
+        self.root = os.path.abspath(root)
+        self.peers = list(peers)
+        self.files = state.get("files", {})
+        self.conflicts = state.get("conflicts", [])
+        self.last_sync = state.get("last_sync")
+        self.stats = {"sent_bytes": 0, "received_bytes": 0, "synced_bytes": 0, "files_sent": 0, "files_received": 0}
+        self.connected = {}
+        self._outboxes = {}
+        self._tasks = []
+        self._watcher = None
+        self._busy = 0
+
+    # --- local state ----------------------------------------------------
+
+    def _path(self, rel: str) -> str:
+        return os.path.join(self.root, *rel.split("/"))
+
+    async def refresh(self, rel: str):
+        """Current hash of `rel` (None if gone), rehashing only when size/mtime moved."""
+        try:
+            st = os.stat(self._path(rel))
+        except (FileNotFoundError, NotADirectoryError):
+            st = None
+        rec = self.files.get(rel)
+        if st is None or not os.path.isfile(self._path(rel)):
+            if rec and rec["hash"] is not None:
+                rec.update(hash=None, size=0, mtime=0)
+                self.service.dirty = True
+            return None
+        if rec and rec["hash"] and rec["size"] == st.st_size and rec["mtime"] == st.st_mtime:
+            return rec["hash"]
+        digest = await asyncio.to_thread(_file_hash, self._path(rel))
+        self._record(rel, digest)
+        return digest
+
+    def _record(self, rel: str, digest, synced: dict = None):
+        rec = self.files.setdefault(rel, {"hash": None, "size": 0, "mtime": 0, "synced": {}})
+        rec["hash"] = digest
+        if digest is not None:
+            st = os.stat(self._path(rel))
+            rec["size"], rec["mtime"] = st.st_size, st.st_mtime
+        rec["synced"].update(synced or {})
+        self.service.dirty = True
+
+    def _blocker(self, rel: str):
+        """The local path that keeps `rel` from being written as a file (a file
+        where it needs a directory, or a directory at `rel` itself), or None."""
+        parts = rel.split("/")
+        for i in range(1, len(parts)):
+            prefix = "/".join(parts[:i])
+            if os.path.lexists(self._path(prefix)) and not os.path.isdir(self._path(prefix)):
+                return prefix
+        return rel if os.path.isdir(self._path(rel)) else None
+
+    def _clash(self, rel: str, node: str, blocker: str):
+        """Record that `node`'s `rel` cannot land here; it shows until `blocker` is moved."""
+        if not any(c["path"] == rel and c["copy"] == blocker and c["peer"] == node for c in self.conflicts):
+            self.conflicts.append({"path": rel, "copy": blocker, "peer": node, "at": time.time()})
+            self.service.dirty = True
+
+    def _agreed(self, rel: str, node: str, digest):
+        rec = self.files.get(rel)
+        if rec is None:
+            return
+        rec["synced"][node] = digest
+        self.last_sync = time.time()
+        if rec["hash"] is None and not any(rec["synced"].values()):
+            del self.files[rel]  # deletion has reached everyone
+        self.service.dirty = True
+
+    async def rescan(self):
+        """Pick up everything that changed while nobody was watching."""
+        entries = await asyncio.to_thread(lambda: ContextScanner(self.root, [f"/{SYNC_DIR}/"]).scan())
+        present = {e.rel for e in entries if e.kind == "file"}
+        for rel in sorted(present | set(self.files)):
+            await self.refresh(rel)
+
+    def changed(self, rels):
+        """Watcher callback (on the loop): queue paths for every peer."""
+        if rels is None:
+            self._tasks.append(asyncio.get_running_loop().create_task(self._rescan_all()))
+            return
+        for rel in rels:
+            nested = [r for r in self.files if r.startswith(rel + "/")]  # a directory moved or removed
+            for path in [rel, *nested]:
+                for outbox in self._outboxes.values():
+                    outbox.add(path)
+
+    async def _rescan_all(self):
+        await self.rescan()
+        self.changed(list(self.files))
+
+    def accepts(self, peer: dict) -> bool:
+        """True if `peer` (an authenticated session HELLO) is one of this session's peers."""
+        return any(p in (peer.get("node"), peer.get("username")) for p in self.peers)
+
+    def pending_for(self, node: str) -> list:
+        return [rel for rel, rec in self.files.items() if rec["hash"] != rec["synced"].get(node)]
+
+    @property
+    def status(self) -> str:
+        if any(os.path.exists(self._path(c["copy"])) for c in self.conflicts):
+            return "CONFLICT"
+        if not self.connected:
+            return "WAITING"
+        if self._busy or any(o.paths for o in self._outboxes.values()):
+            return "SYNCING"
+        return "MERGED"
+
+    def state(self) -> dict:
+        live = [c for c in self.conflicts if os.path.exists(self._path(c["copy"]))]
+        return {"root": self.root, "peers": self.peers, "status": self.status, "last_sync": self.last_sync,
+                "connected": sorted(self.connected), "conflicts": live, "stats": self.stats, "files": self.files}
+
+    # --- lifecycle --------------------------------------------------------
+
+    async def start(self):
+        os.makedirs(os.path.join(self.root, SYNC_DIR), exist_ok=True)
+        await self.rescan()
+        loop = asyncio.get_running_loop()
+        self._watcher = make_watcher(self.root, lambda rels: loop.call_soon_threadsafe(self.changed, rels),
+                                     [f"/{SYNC_DIR}/"])
+        self._watcher.start()
+        for peer in self.peers:
+            self._outboxes[peer] = _Outbox()
+            self._tasks.append(loop.create_task(self._push_loop(peer)))
+
+    async def stop(self):
+        if self._watcher:
+            self._watcher.stop()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    # --- pushing ------------------------------------------------------------
+
+    async def _push_loop(self, peer: str):
+        outbox = self._outboxes[peer]
+        while True:
+            address = self.service.resolve(peer)
+            if address is None:
+                await asyncio.sleep(RETRY_EVERY)
+                continue
+            stream = None
+            try:
+                session = await self.service.pool.session(*address)
+                if peer not in (session.peer.get("node"), session.peer.get("username")):
+                    raise ConnectionError(f"{address[0]}:{address[1]} is not {peer}")
+                stream = await session.open_stream("sync")
+                await stream.send_json({"op": "join", "session": self.name})
+                reply = await asyncio.wait_for(stream.recv_json(), DEAD_AFTER)
+                if not reply or reply.get("op") != "joined":
+                    raise ConnectionError((reply or {}).get("error", "stream closed"))
+                node = session.peer.get("node")
+                self.connected[peer] = node
+                for rel in self.pending_for(node):
+                    outbox.add(rel)
+                while True:
+                    rel = await outbox.next()
+                    self._busy += 1
+                    try:
+                        await self._push(stream, node, rel)
+                    except BaseException:
+                        outbox.add(rel)
+                        raise
+                    finally:
+                        self._busy -= 1
+            except (SessionClosed, ConnectionError, OSError, asyncio.TimeoutError, ValueError):
+                self.connected.pop(peer, None)
+                await asyncio.sleep(RETRY_EVERY)
+            finally:
+                if stream is not None:
+                    await stream.close()
+
+    async def _push(self, stream, node: str, rel: str):
+        digest = await self.refresh(rel)
+        rec = self.files.get(rel)
+        base = rec["synced"].get(node) if rec else None
+        if digest == base:
+            return
+        if digest is None:
+            await stream.send_json({"op": "delete", "path": rel, "base": base})
+            reply = await stream.recv_json()
+            if reply and reply["op"] == "deleted":
+                self._agreed(rel, node, None)
+            return  # "kept": the peer edited it; their offer brings it back
+        await stream.send_json({"op": "offer", "path": rel, "hash": digest, "size": rec["size"], "base": base})
+        reply = await stream.recv_json()
+        if reply is None:
+            raise SessionClosed("Stream closed")
+        if reply["op"] == "have":
+            self._agreed(rel, node, digest)
+            return
+        if reply["op"] != "sig":
+            return  # refused (error)
+        sig = await _recv_blob(stream)
+        sent = await _send_delta(stream, self._path(rel), reply["block"], sig)
+        reply = await stream.recv_json()
+        if reply is None:
+            raise SessionClosed("Stream closed")
+        self.stats["sent_bytes"] += sent
+        if reply["op"] == "done":
+            self.stats["files_sent"] += 1
+            self.stats["synced_bytes"] += rec["size"]
+            if reply.get("into") == "path":
+                self._agreed(rel, node, digest)
+            # "conflict": the peer kept its own version; ours is now its conflict copy
+
+    # --- receiving -------------------------------------------------------------
+
+    async def receive(self, stream, peer: dict):
+        """Serve one peer's pushes on an already-joined "sync" stream."""
+        node = peer.get("node", "")
+        while True:
+            message = await stream.recv_json()
+            if message is None:
+                return
+            self._busy += 1
+            try:
+                rel = _safe_rel(message["path"])
+                if message["op"] == "offer":
+                    await self._receive_offer(stream, node, rel, message)
+                elif message["op"] == "delete":
+                    await self._receive_delete(stream, node, rel, message)
+                else:
+                    raise ValueError(f"Unknown op {message['op']!r}")
+            except SessionClosed:
+                raise
+            except (OSError, KeyError, TypeError, ValueError) as e:
+                # Refuse this path rather than drop the stream: a dropped stream
+                # makes the sender re-queue it and resend the whole file forever
+                await stream.send_json({"op": "error", "error": str(e) or type(e).__name__})
+            finally:
+                self._busy -= 1
+
+    async def _receive_offer(self, stream, node: str, rel: str, offer: dict):
+        local = await self.refresh(rel)
+        if local == offer["hash"]:
+            self._agreed(rel, node, local)
+            await stream.send_json({"op": "have"})
+            return
+        blocker = self._blocker(rel)
+        if blocker is not None:
+            self._clash(rel, node, blocker)
+            raise FileExistsError(f"{blocker!r} is in the way of {rel!r}")
+        target, basis = rel, self._path(rel)
+        if local is not None and local != offer["base"]:
+            copy = conflict_name(rel, local if node > self.service.node else offer["hash"])
+            if node > self.service.node:
+                # Their version takes the path; ours moves aside (and is pushed back as a new file)
+                if os.path.exists(self._path(copy)):
+                    os.remove(self._path(rel))
+                else:
+                    os.replace(self._path(rel), self._path(copy))
+                    self._record(copy, local)
+                    self.changed([copy])
+                self.files[rel]["hash"] = None
+                basis = self._path(copy)
+            else:
+                target = copy
+            self.conflicts.append({"path": rel, "copy": copy, "peer": node, "at": time.time()})
+        block, sig = await asyncio.to_thread(signature, basis)
+        await stream.send_json({"op": "sig", "block": block, "into": "path" if target == rel else "conflict"})
+        await _send_blob(stream, sig)
+        self.stats["sent_bytes"] += len(sig)
+
+        tmp = os.path.join(self.root, SYNC_DIR, f"{os.getpid()}-{id(stream)}.part")
+        received, complete, ok = 0, False, False
+        try:
+            with open(tmp, "wb") as f:
+                out = _HashingWriter(f)
+                patcher = Patcher(basis, out, block)
+                while True:
+                    data = await stream.recv()
+                    if data is None:
+                        raise SessionClosed("Stream closed mid-transfer")
+                    if not data:
+                        complete = True
+                        break
+                    received += len(data)
+                    await asyncio.to_thread(patcher.feed, data)
+                patcher.close()
+            if out.hash.hexdigest() != offer["hash"]:
+                await stream.send_json({"op": "error", "error": "content changed during transfer"})
+                return
+            os.makedirs(os.path.dirname(self._path(target)), exist_ok=True)
+            os.replace(tmp, self._path(target))
+            ok = True
+        except SessionClosed:
+            raise
+        except (OSError, ValueError):
+            if not complete:
+                await _skip_blob(stream)  # stay in step so the error reply is read as one
+            raise
+        finally:
+            if not ok and os.path.exists(tmp):
+                os.remove(tmp)
+        # A conflict copy is new to the sender too, so it is not agreed with them yet
+        self._record(target, offer["hash"], {node: offer["hash"]} if target == rel else None)
+        self.last_sync = time.time()
+        self.stats["received_bytes"] += received
+        self.stats["files_received"] += 1
+        self.changed([target])  # relay to any other peers
+        await stream.send_json({"op": "done", "into": "path" if target == rel else "conflict"})
+
+    async def _receive_delete(self, stream, node: str, rel: str, message: dict):
+        local = await self.refresh(rel)
+        if local is not None and local != message["base"]:
+            await stream.send_json({"op": "kept"})
+            self.changed([rel])
+            return
+        if local is not None:
+            os.remove(self._path(rel))
+            self._record(rel, None)
+            self.changed([rel])
+        self._agreed(rel, node, None)
+        await stream.send_json({"op": "deleted"})
+
+
+class _HashingWriter:
+    def __init__(self, f):
+        self.f = f
+        self.hash = hashlib.sha256()
+
+    def write(self, data):
+        self.hash.update(data)
+        self.f.write(data)
+
+
+async def _send_blob(stream, data: bytes):
+    if data:
+        await stream.send(data)
+    await stream.send(b"")  # end of blob
+
+
+async def _skip_blob(stream):
+    """Discard frames up to the empty end-of-blob frame."""
+    while True:
+        data = await stream.recv()
+        if data is None:
+            raise SessionClosed("Stream closed mid-transfer")
+        if not data:
+            return
+
+
+async def _recv_blob(stream) -> bytes:
+    """Frames up to the empty end-of-blob frame."""
+    parts = []
+    while True:
+        data = await stream.recv()
+        if data is None:
+            raise SessionClosed("Stream closed mid-transfer")
+        if not data:
+            return b"".join(parts)
+        parts.append(data)
+
+
+def _take(ops, limit: int) -> bytes:
+    out = bytearray()
+    for op in ops:
+        out += op
+        if len(out) >= limit:
+            break
+    return bytes(out)
+
+
+async def _send_delta(stream, path: str, block: int, sig: bytes) -> int:
+    """Stream the delta in SEND_CHUNK pieces, computing each off the loop."""
+    ops = delta(path, block, sig)
+    sent = 0
+    try:
+        while True:
+            chunk = await asyncio.to_thread(_take, ops, SEND_CHUNK)
+            if not chunk:
+                break
+            await stream.send(chunk)
+            sent += len(chunk)
+    finally:
+        ops.close()
+    await stream.send(b"")
+    return sent
+
+
+# ─────────────────────────────────────────────────────────────
+# Service: all sessions of one daemon
+# ─────────────────────────────────────────────────────────────
+
+def load_sessions(path: str = SESSIONS_PATH) -> dict:
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get("sessions", {}) if isinstance(data, dict) else {}  # [] = pre-sync placeholder
+
+
+def save_sessions(sessions: dict, path: str = SESSIONS_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # A unique temp name: the daemon and `connect share` may save at the same time
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump({"saved_at": time.time(), "sessions": sessions}, f)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+class SyncService:
+    """
+    Runs every session in sessions.json inside `connect daemon`. Register
+    `serve_stream` as the SessionServer "sync" handler and `share` /
+    `unshare` as LocalAgent ops. `resolve(peer)` maps a username or node
+    id to a (host, port) session address, or None while it is offline.
+    """
+
+    def __init__(self, pool, node: str, resolve, path: str = SESSIONS_PATH):
+        self.pool = pool
+        self.node = node
+        self.resolve = resolve
+        self.path = path
+        self.sessions = {}
+        self.dirty = False
+        self._saver = None
+
+    async def start(self):
+        for name, state in load_sessions(self.path).items():
+            await self._start_session(name, state["root"], state.get("peers", []), state)
+        self._saver = asyncio.get_running_loop().create_task(self._save_loop())
+
+    async def _start_session(self, name: str, root: str, peers: list, state: dict = None):
+        session = self.sessions[name] = SyncSession(self, name, root, peers, state)
+        await session.start()
+        self.dirty = True
+        return session
+
+    async def stop(self):
+        if self._saver:
+            self._saver.cancel()
+        for session in self.sessions.values():
+            await session.stop()
+        self.save()
+
+    def snapshot(self) -> dict:
+        """Every session's state, deep-copied so it can be written while the loop keeps mutating the live one."""
+        return copy.deepcopy({name: s.state() for name, s in self.sessions.items()})
+
+    def save(self):
+        save_sessions(self.snapshot(), self.path)
+        self.dirty = False
+
+    async def _save_loop(self):
+        last, failed = None, None
+        while True:
+            await asyncio.sleep(SAVE_EVERY)
+            statuses = [s.status for s in self.sessions.values()]
+            if not (self.dirty or statuses != last):
+                continue
+            try:
+                # Snapshot on the loop; only the file write happens in the thread
+                sessions, self.dirty = self.snapshot(), False
+                await asyncio.to_thread(save_sessions, sessions, self.path)
+                last, failed = statuses, None
+            except Exception as e:
+                self.dirty = True
+                if str(e) != failed:  # once per distinct error, not every SAVE_EVERY
+                    console.print(f"[red]Could not save sync sessions to {self.path}: {e}[/red]")
+                    failed = str(e)
+
+    async def share(self, request: dict) -> dict:
+        """Agent op: {"op": "share", "name", "root", "peers"}."""
+        name, root = request["name"], os.path.abspath(request["root"])
+        if not os.path.isdir(root):
+            return {"ok": False, "error": f"{root} is not a directory"}
+        old = self.sessions.pop(name, None)
+        if old is not None:
+            await old.stop()
+        state = old.state() if old is not None and old.root == root else None
+        session = await self._start_session(name, root, request.get("peers", []), state)
+        return {"ok": True, "files": sum(1 for r in session.files.values() if r["hash"])}
+
+    async def unshare(self, request: dict) -> dict:
+        session = self.sessions.pop(request["name"], None)
+        if session is None:
+            return {"ok": False, "error": f"No session named {request['name']!r}"}
+        await session.stop()
+        self.dirty = True
+        return {"ok": True}
+
+    async def serve_stream(self, stream, peer_session):
+        """SessionServer handler for "sync" streams."""
+        join = await stream.recv_json()
+        session = self.sessions.get((join or {}).get("session"))
+        # A session the peer is not part of looks the same as a missing one
+        if session is None or not session.accepts(peer_session.peer):
+            await stream.send_json({"op": "error", "error": "no such session here"})
+            return
+        await stream.send_json({"op": "joined"})
+        await session.receive(stream, peer_session.peer)
+
+
+def share_offline(name: str, root: str, peers: list, path: str = SESSIONS_PATH):
+    """Register a session without a running daemon; it starts with `connect daemon`."""
+    sessions = load_sessions(path)
+    sessions.setdefault(name, {}).update(root=os.path.abspath(root), peers=peers, status="WAITING")
+    save_sessions(sessions, path)
+
+
+def unshare_offline(name: str, path: str = SESSIONS_PATH) -> bool:
+    sessions = load_sessions(path)
+    if sessions.pop(name, None) is None:
+        return False
+    save_sessions(sessions, path)
+    return True
+
+
+def benchmark_sync(size_mb: int = 64) -> list:
+    """Two loopback daemons share a directory: initial copy, a small edit, a conflict."""
+    import random
+    import secrets
+    import tempfile
+    from peer_session import SessionPool, SessionServer
+
+    async def wait_for(check, timeout=60.0):
+        deadline = time.monotonic() + timeout
+        while not check():
+            if time.monotonic() > deadline:
+                raise TimeoutError("sync did not converge")
+            await asyncio.sleep(0.02)
+
+    def content(path):
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    async def run(tmp):
+        nodes, addresses = {}, {}
+        key = secrets.token_bytes(32)
+        for name in ("a", "b"):
+            root = os.path.join(tmp, name)
+            os.makedirs(root)
+            hello = {"node": name, "username": name}
+            pool = SessionPool(hello, key)
+            service = SyncService(pool, name, lambda peer: addresses.get(peer), os.path.join(tmp, f"{name}.json"))
+            server = SessionServer("127.0.0.1", 0, handlers={"sync": service.serve_stream}, hello=hello, key=key)
+            addresses[name] = ("127.0.0.1", await server.start())
+            nodes[name] = (root, service, server)
+        (root_a, a, _), (root_b, b, _) = nodes["a"], nodes["b"]
+        await a.start()
+        await b.start()
+
+        rnd = random.Random(7)
+        big = os.path.join(root_a, "data", "big.bin")
+        os.makedirs(os.path.dirname(big))
+        with open(big, "wb") as f:
+            f.write(rnd.randbytes(size_mb * 1024 * 1024))
+        rows = []
+        await a.share({"name": "ws", "root": root_a, "peers": ["b"]})
+        await b.share({"name": "ws", "root": root_b, "peers": ["a"]})
+        ws_a, ws_b = a.sessions["ws"], b.sessions["ws"]
+        mirror = os.path.join(root_b, "data", "big.bin")
+
+        def synced(expected):
+            return lambda: (ws_b.files.get("data/big.bin", {}).get("hash") == expected
+                            and ws_a.status == ws_b.status == "MERGED")
+
+        def sent():
+            return ws_a.stats["sent_bytes"] + ws_b.stats["sent_bytes"]
+
+        start = time.perf_counter()
+        await wait_for(synced(content(big)))
+        rows.append(("initial copy", size_mb * 1024 * 1024, sent(), time.perf_counter() - start))
+
+        before = sent()
+        with open(big, "r+b") as f:
+            f.seek(size_mb * 1024 * 1024 // 2)
+            f.write(b"a small edit in the middle of a large file")
+        start = time.perf_counter()
+        await wait_for(synced(content(big)))
+        rows.append(("small edit", os.path.getsize(big), sent() - before, time.perf_counter() - start))
+        assert content(mirror) == content(big), "mirror differs"
+
+        # Both sides edit the same file while b's watcher is paused: b's push conflicts at a
+        note_a, note_b = os.path.join(root_a, "notes.txt"), os.path.join(root_b, "notes.txt")
+        with open(note_a, "w") as f:
+            f.write("shared\n")
+        await wait_for(lambda: os.path.exists(note_b) and ws_a.status == ws_b.status == "MERGED")
+        ws_b._watcher.stop()
+        with open(note_b, "w") as f:
+            f.write("b's edit\n")
+        with open(note_a, "w") as f:
+            f.write("a's edit\n")
+        await asyncio.sleep(DEBOUNCE * 3)
+        ws_b.changed(["notes.txt"])
+        start, before = time.perf_counter(), sent()
+        await wait_for(lambda: len(os.listdir(root_a)) == len(os.listdir(root_b)) == 4
+                       and content(note_a) == content(note_b))
+        rows.append(("conflicting edits", os.path.getsize(note_a), sent() - before, time.perf_counter() - start))
+
+        for _, service, server in nodes.values():
+            await service.stop()
+            await service.pool.close()
+            await server.stop()
+        return rows, sorted(os.listdir(root_a)), ws_a.status
+
+    with tempfile.TemporaryDirectory() as tmp:
+        return asyncio.run(run(tmp))
+
+
+if __name__ == "__main__":
+    from rich.console import Console
+    from rich.table import Table
+
+    mb = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    rows, listing, status = benchmark_sync(mb)
+    table = Table(title=f"Session Sync :: two loopback peers, {mb} MB file")
+    table.add_column("Step", style="cyan")
+    table.add_column("File size", justify="right")
+    table.add_column("Bytes on the wire", justify="right", style="bold green")
+    table.add_column("Time", justify="right", style="yellow")
+    for step, size, sent, seconds in rows:
+        table.add_row(step, f"{size:,}", f"{sent:,}", f"{seconds * 1000:.0f} ms")
+    Console().print(table)
+    Console().print(f"[dim]Peer A after the conflict: {', '.join(listing)} ({status})[/dim]")
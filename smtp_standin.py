@@ -0,0 +1,100 @@
+"""
+SMTP Stand-In - Minimal Local SMTP Server for Pidgeon Tests & Benchmarks.
+
+Speaks just enough SMTP (EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT)
+to accept mail from smtplib on a loopback port and keep it in memory.
+`fail_every` makes every Nth transaction answer 451 and `drop_every`
+hangs up on every Nth transaction instead of answering, so retry and
+broken-connection paths can be exercised without a real relay.
+
+    with LocalSMTPServer() as server:
+        mailer = PidgeonMailer({"host": "127.0.0.1", "port": server.port})
+        ...
+        server.messages  # [(mail_from, [rcpt...], raw bytes), ...]
+"""
+
+import threading
+import socketserver
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+
+    def _reply(self, line: str):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        server = self.server
+        self._reply("220 pidgeon-standin ESMTP ready")
+        mail_from, rcpts = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            cmd = line.decode(errors="replace").strip()
+            verb = cmd[:4].upper()
+            if verb in ("EHLO", "HELO"):
+                if verb == "EHLO":
+                    self._reply("250-pidgeon-standin")
+                    self._reply("250 8BITMIME")
+                else:
+                    self._reply("250 pidgeon-standin")
+            elif verb == "MAIL":
+                mail_from, rcpts = cmd[10:].strip("<> "), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                rcpts.append(cmd[8:].strip("<> "))
+                self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk == b".\r\n":
+                        break
+                    data.append(chunk[1:] if chunk.startswith(b"..") else chunk)
+                with server.lock:
+                    server.transactions += 1
+                    failing = server.fail_every and server.transactions % server.fail_every == 0
+                    dropping = server.drop_every and server.transactions % server.drop_every == 0
+                    if not (failing or dropping):
+                        server.messages.append((mail_from, rcpts, b"".join(data)))
+                if dropping:
+                    return
+                self._reply("451 Transient stand-in failure" if failing else "250 Queued")
+                mail_from, rcpts = None, []
+            elif verb == "RSET":
+                mail_from, rcpts = None, []
+                self._reply("250 OK")
+            elif verb == "NOOP":
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class LocalSMTPServer(socketserver.ThreadingTCPServer):
+    """Threaded loopback SMTP sink. Use as a context manager."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, fail_every: int = 0, drop_every: int = 0):
+        super().__init__((host, port), _SMTPHandler)
+        self.port = self.server_address[1]
+        self.fail_every = fail_every
+        self.drop_every = drop_every
+        self.messages = []
+        self.transactions = 0
+        self.lock = threading.Lock()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+        self.server_close()
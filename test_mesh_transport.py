@@ -0,0 +1,91 @@
+import os
+import json
+import asyncio
+import secrets
+
+import pytest
+
+from mesh_transport import MESH_HOST, MeshDaemon, _file_sha256, _interrupted_send, _recv_json, send_file
+
+CHUNK = 64 * 1024
+KEY = secrets.token_bytes(32)
+
+
+def _artifact(tmp_path, name="artifact.nxs", size=10 * CHUNK + 123):
+    path = tmp_path / name
+    path.write_bytes(os.urandom(size))
+    return str(path)
+
+
+async def _daemon(tmp_path, key=KEY):
+    daemon = MeshDaemon(str(tmp_path / "inbox"), port=0, key=key)
+    await daemon.start()
+    return daemon
+
+
+def test_interrupted_transfer_resumes(tmp_path):
+    path = _artifact(tmp_path)
+
+    async def run():
+        daemon = await _daemon(tmp_path)
+        try:
+            await _interrupted_send(MESH_HOST, daemon.port, path, 4, KEY, chunk_size=CHUNK)
+            result = await send_file(MESH_HOST, daemon.port, path, "alice", chunk_size=CHUNK, key=KEY)
+        finally:
+            await daemon.stop()
+        return daemon, result
+
+    daemon, result = asyncio.run(run())
+    assert result["resumed_from"] == 4
+    assert daemon.stats["resumed"] == 1 and daemon.stats["transfers"] == 1
+    received = os.path.join(daemon.inbox, "artifact.nxs")
+    assert _file_sha256(received) == result["sha256"]
+    assert os.listdir(daemon.partial_dir) == []
+
+
+def test_forged_proof_is_refused(tmp_path):
+    path = _artifact(tmp_path)
+
+    async def run():
+        daemon = await _daemon(tmp_path)
+        try:
+            with pytest.raises(ConnectionError, match="mesh key"):
+                await send_file(MESH_HOST, daemon.port, path, "mallory", chunk_size=CHUNK, retries=1,
+                                key=secrets.token_bytes(32))
+        finally:
+            await daemon.stop()
+        return daemon
+
+    daemon = asyncio.run(run())
+    assert daemon.stats["refused_peers"] == 1
+    assert os.listdir(daemon.inbox) == [".partial"]
+    assert os.listdir(daemon.partial_dir) == []
+
+
+@pytest.mark.parametrize("offer", [b"[1]\n", b"42\n", b"null\n", b"{not json\n",
+                                   b'{"op": "offer", "sha256": "00", "name": "x", "size": 1}\n'])
+def test_malformed_offer_is_refused_and_closed(tmp_path, offer):
+    async def run():
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        daemon = await _daemon(tmp_path)
+        try:
+            reader, writer = await asyncio.open_connection(MESH_HOST, daemon.port)
+            assert (await _recv_json(reader))["op"] == "challenge"
+            writer.write(offer)
+            await writer.drain()
+            replies = (await asyncio.wait_for(reader.read(), 5)).splitlines()
+            writer.close()
+
+            # The daemon is still serving
+            path = _artifact(tmp_path)
+            result = await send_file(MESH_HOST, daemon.port, path, "alice", chunk_size=CHUNK, key=KEY)
+        finally:
+            await daemon.stop()
+        return daemon, replies, result, errors
+
+    daemon, replies, result, errors = asyncio.run(run())
+    assert errors == []
+    assert all(json.loads(line)["op"] == "error" for line in replies)
+    assert result["attempts"] == 1
+    assert os.listdir(daemon.partial_dir) == []
@@ -0,0 +1,41 @@
+import os
+import sys
+import socket
+import subprocess
+
+from outbound_spool import OutboundSpool, SpoolWorker
+
+
+class _LateEnqueueSpool(OutboundSpool):
+    """Enqueues a job as the worker retires: after its last empty check, while it still looks alive."""
+
+    def retire(self, worker: str):
+        if not getattr(self, "_enqueued", False):
+            self._enqueued = True
+            assert self.live_workers(), "the enqueuer would see a live worker and start none"
+            self.enqueue("note", {"n": 1})
+        super().retire(worker)
+
+
+def test_worker_picks_up_a_job_enqueued_while_it_retires(tmp_path):
+    spool = _LateEnqueueSpool(str(tmp_path / "outbound.db"))
+    ran = []
+    stats = SpoolWorker(spool, concurrency=1, handlers={"note": lambda payload, _: ran.append(payload)}) \
+        .run(until_empty=True)
+    assert ran == [{"n": 1}]
+    assert stats["done"] == 1
+    assert spool.status()["queued"] == 0
+    assert spool.live_workers() == []
+
+
+def test_killed_local_worker_is_not_live(tmp_path):
+    spool = OutboundSpool(str(tmp_path / "outbound.db"))
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    host = socket.gethostname()
+    # Fresh heartbeats all round; only the process check can tell the dead one apart
+    for name, pid in ((f"{host}:{dead.pid}", dead.pid), (f"{host}:{os.getpid()}", os.getpid()),
+                      ("elsewhere:1", 1)):
+        spool.heartbeat(name)
+        spool.conn.execute("UPDATE workers SET pid = ? WHERE name = ?", (pid, name))
+    assert sorted(w["name"] for w in spool.live_workers()) == sorted([f"{host}:{os.getpid()}", "elsewhere:1"])
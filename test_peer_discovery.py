@@ -0,0 +1,53 @@
+import json
+import math
+import socket
+import time
+
+from peer_discovery import PROTOCOL, PeerDiscovery
+
+GROUP = "239.255.47.47"
+PORT = 47671
+
+
+def _daemon(tmp_path, i):
+    return PeerDiscovery(f"peer{i}", port=47000 + i, discovery_port=PORT, interface="127.0.0.1",
+                         peers_path=str(tmp_path / f"peers{i}.json"), node=f"node{i}", announce_every=0.2)
+
+
+def _junk(*datagrams):
+    tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+    tx.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+    tx.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton("127.0.0.1"))
+    try:
+        for data in datagrams:
+            tx.sendto(data, (GROUP, PORT))
+    finally:
+        tx.close()
+
+
+def _wait(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_junk_datagrams_do_not_stop_discovery(tmp_path):
+    a = _daemon(tmp_path, 0)
+    with a:
+        nan_ttl = {"v": PROTOCOL, "op": "announce", "node": "nan", "username": "nan", "ttl": math.nan}
+        _junk(b"[1]", b"42", b"\"hello\"", b"null", b"{not json", json.dumps(nan_ttl).encode())
+        assert _wait(lambda: a.stats["rejected"] >= 5)
+        assert all(t.is_alive() for t in a._threads)
+
+        # A NaN ttl falls back to the default rather than never expiring
+        assert _wait(lambda: any(p["node"] == "nan" for p in a.peers()))
+        nan = next(p for p in a.peers() if p["node"] == "nan")
+        assert math.isfinite(nan["expires_at"]) and nan["expires_at"] <= time.time() + 3600
+
+        # The listener still hears real peers after the junk
+        with _daemon(tmp_path, 1) as b:
+            assert _wait(lambda: {p["node"] for p in a.peers()} >= {"node1"})
+            assert _wait(lambda: {p["node"] for p in b.peers()} == {"node0"})
@@ -0,0 +1,99 @@
+import json
+import asyncio
+import secrets
+
+import pytest
+
+from peer_session import AUTH, HEADER, HELLO, OPEN, PROTOCOL, MessageChannel, SessionServer, open_session
+
+KEY = secrets.token_bytes(32)
+
+
+def _frame(sid, ftype, payload: bytes) -> bytes:
+    return HEADER.pack(sid, ftype, len(payload)) + payload
+
+
+async def _server():
+    errors = []
+    asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+    server = SessionServer("127.0.0.1", 0, hello={"username": "server"}, key=KEY)
+    await server.start()
+    return server, errors
+
+
+async def _closed(reader) -> bool:
+    """True once the server has hung up (after whatever it sent first)."""
+    await asyncio.wait_for(reader.read(), 5)
+    return reader.at_eof()
+
+
+@pytest.mark.parametrize("hello", [b"[1]", b"42", b"null", b"{not json"])
+def test_malformed_hello_closes_the_connection(hello):
+    async def run():
+        server, errors = await _server()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(_frame(0, HELLO, hello))
+            await writer.drain()
+            closed = await _closed(reader)
+            writer.close()
+        finally:
+            await server.stop()
+        return server, errors, closed
+
+    server, errors, closed = asyncio.run(run())
+    assert closed
+    assert errors == []
+    assert server.stats["sessions"] == 0
+
+
+def test_malformed_auth_closes_the_connection():
+    async def run():
+        server, errors = await _server()
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.port)
+            writer.write(_frame(0, HELLO, json.dumps({"v": PROTOCOL, "node": "n", "username": "u",
+                                                      "nonce": "x"}).encode()))
+            writer.write(_frame(0, AUTH, b"[\"proof\"]"))
+            await writer.drain()
+            closed = await _closed(reader)
+            writer.close()
+        finally:
+            await server.stop()
+        return errors, closed
+
+    errors, closed = asyncio.run(run())
+    assert closed
+    assert errors == []
+
+
+def test_malformed_open_is_refused_and_the_session_survives():
+    async def run():
+        server, errors = await _server()
+        try:
+            session = await open_session("127.0.0.1", server.port, key=KEY)
+            await session._write(99, OPEN, b"[1]")
+            channel = await MessageChannel(session).open()
+            ack = await asyncio.wait_for(channel.send("server", "still here"), 5)
+            await session.close()
+        finally:
+            await server.stop()
+        return server, errors, ack
+
+    server, errors, ack = asyncio.run(run())
+    assert ack["ack"] == 1
+    assert server.stats["messages"] == 1
+    assert errors == []
+
+
+def test_wrong_key_is_refused():
+    async def run():
+        server, errors = await _server()
+        try:
+            with pytest.raises(ConnectionError):
+                await open_session("127.0.0.1", server.port, key=secrets.token_bytes(32))
+        finally:
+            await server.stop()
+        return server
+
+    assert asyncio.run(run()).stats["sessions"] == 0
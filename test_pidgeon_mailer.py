@@ -0,0 +1,63 @@
+import threading
+
+from pidgeon_mailer import PidgeonMailer
+from smtp_standin import LocalSMTPServer
+
+
+def _batch(n):
+    return [{"to": f"user{i}@example.test", "subject": f"Test {i}", "body": "hello"} for i in range(n)]
+
+
+def _send(config, messages, pool_size, workers=None, timeout=20, **options):
+    """send_batch in a thread, so a pool that stops handing out connections fails instead of hanging."""
+    out = {}
+
+    def run():
+        with PidgeonMailer(dict(config), pool_size=pool_size, backoff=0, **options) as mailer:
+            out["results"] = mailer.send_batch(messages, workers)
+        out["connects"] = mailer.pool.connects
+        out["open"] = mailer.pool._open  # after close(): every slot handed back
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "send_batch hung waiting for a pooled connection"
+    return out
+
+
+def test_pooled_delivery_reuses_connections():
+    with LocalSMTPServer() as server:
+        out = _send({"host": "127.0.0.1", "port": server.port}, _batch(40), pool_size=3, workers=6)
+        assert [r["status"] for r in out["results"]] == ["sent"] * 40
+        assert len(server.messages) == 40
+        assert out["connects"] <= 3
+        assert out["open"] == 0
+
+
+def test_transient_failures_are_retried():
+    # One worker, so a 451 is always followed by a transaction that succeeds
+    with LocalSMTPServer(fail_every=2) as server:
+        out = _send({"host": "127.0.0.1", "port": server.port}, _batch(10), pool_size=2, workers=1)
+        assert all(r["status"] == "sent" for r in out["results"])
+        assert any(r["attempts"] > 1 for r in out["results"])
+        assert len(server.messages) == 10
+
+
+def test_broken_connections_are_replaced():
+    with LocalSMTPServer(drop_every=3) as server:
+        out = _send({"host": "127.0.0.1", "port": server.port}, _batch(12), pool_size=2, workers=1)
+        assert all(r["status"] == "sent" for r in out["results"])
+        assert len(server.messages) == 12
+        assert out["connects"] > 1
+        assert out["open"] == 0
+
+
+def test_broken_connection_wakes_waiting_workers():
+    # One slot, three workers, every connection hangs up: each worker that
+    # gives up on a broken connection must hand its slot to a waiter
+    with LocalSMTPServer(drop_every=1) as server:
+        out = _send({"host": "127.0.0.1", "port": server.port}, _batch(3), pool_size=1, workers=3, max_retries=2)
+        assert [r["status"] for r in out["results"]] == ["failed"] * 3
+        assert [r["attempts"] for r in out["results"]] == [2] * 3
+        assert out["open"] == 0
+
@@ -0,0 +1,54 @@
+import time
+
+from script_stats import ScriptStats, percentile, record_runs
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 11))
+    assert percentile(values, 50) == 5
+    assert percentile(values, 90) == 9
+    assert percentile(values, 95) == 10
+    assert percentile(values, 100) == 10
+    assert percentile(values, 0) == 1
+    assert percentile([1, 2], 50) == 1
+    assert percentile([7], 95) == 7
+    assert percentile([], 50) is None
+
+
+def _run(name, seconds, exit_code=0, started_at=None):
+    return {"name": name, "path": None, "started_at": started_at or time.time(), "seconds": seconds,
+            "cpu_seconds": seconds / 2, "peak_rss": 1000, "exit_code": exit_code, "timed_out": False,
+            "bytes": 10, "lines": 1}
+
+
+def test_summary_percentiles_and_failures(tmp_path):
+    path = str(tmp_path / "stats.db")
+    assert record_runs([_run("a.py", s) for s in range(1, 21)] + [_run("b.py", 3, exit_code=1)], "test", path)
+    stats = ScriptStats(path)
+    try:
+        summary = {s["script"]: s for s in stats.summary()}
+    finally:
+        stats.close()
+    assert summary["a.py"]["runs"] == 20
+    assert summary["a.py"]["p50"] == 10
+    assert summary["a.py"]["p95"] == 19
+    assert summary["b.py"]["failures"] == 1
+
+
+def test_runs_that_never_started_count_as_failures(tmp_path):
+    path = str(tmp_path / "stats.db")
+    failed = {"name": "a.py", "path": None, "exit_code": None, "timed_out": False, "seconds": 0.0,
+              "error": "a.py not found"}
+    assert record_runs([_run("a.py", 4), failed], "schedule", path)
+    stats = ScriptStats(path)
+    try:
+        summary = stats.summary()[0]
+        recent = stats.recent("a.py", source="schedule")
+        slowest = stats.slowest()
+    finally:
+        stats.close()
+    assert summary["runs"] == 2
+    assert summary["failures"] == 1
+    assert summary["p50"] == summary["p95"] == 4
+    assert recent[0]["error"] == "a.py not found"
+    assert [r["error"] for r in slowest] == [None]
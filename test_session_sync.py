@@ -0,0 +1,62 @@
+import os
+import asyncio
+import hashlib
+import secrets
+
+from peer_session import SessionPool, SessionServer, open_session
+from session_sync import SyncService, _recv_blob, _send_delta
+
+KEY = secrets.token_bytes(32)
+
+
+def test_bad_pushes_are_refused_and_the_stream_survives(tmp_path):
+    root = tmp_path / "b"
+    root.mkdir()
+    (root / "x").write_text("a file where the peer has a directory\n")
+    incoming = tmp_path / "z.txt"
+    incoming.write_bytes(os.urandom(200_000))
+    digest = hashlib.sha256(incoming.read_bytes()).hexdigest()
+
+    async def run():
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        hello = {"node": "b", "username": "b"}
+        service = SyncService(SessionPool(hello, KEY), "b", lambda peer: None, str(tmp_path / "b.json"))
+        server = SessionServer("127.0.0.1", 0, handlers={"sync": service.serve_stream}, hello=hello, key=KEY)
+        port = await server.start()
+        await service.start()
+        await service.share({"name": "ws", "root": str(root), "peers": ["a"]})
+        session = await open_session("127.0.0.1", port, hello={"node": "a", "username": "a"}, key=KEY)
+        try:
+            stream = await session.open_stream("sync")
+            await stream.send_json({"op": "join", "session": "ws"})
+            assert (await stream.recv_json())["op"] == "joined"
+
+            replies = []
+            for message in ({"op": "offer"}, [1], {"path": "y"}, {"op": "delete", "path": "x"},
+                            {"op": "offer", "path": "x/y", "hash": digest, "size": 1, "base": None}):
+                await stream.send_json(message)
+                replies.append(await asyncio.wait_for(stream.recv_json(), 5))
+
+            # Still in step: a real push goes through on the same stream
+            await stream.send_json({"op": "offer", "path": "z.txt", "hash": digest,
+                                    "size": incoming.stat().st_size, "base": None})
+            reply = await asyncio.wait_for(stream.recv_json(), 5)
+            sig = await _recv_blob(stream)
+            await _send_delta(stream, str(incoming), reply["block"], sig)
+            done = await asyncio.wait_for(stream.recv_json(), 5)
+            ws = service.sessions["ws"]
+            return replies, done, ws.conflicts, ws.status, errors
+        finally:
+            await session.close()
+            await service.stop()
+            await service.pool.close()
+            await server.stop()
+
+    replies, done, conflicts, status, errors = asyncio.run(run())
+    assert [r["op"] for r in replies] == ["error"] * 5
+    assert done == {"op": "done", "into": "path"}
+    assert (root / "z.txt").read_bytes() == incoming.read_bytes()
+    assert [(c["path"], c["copy"], c["peer"]) for c in conflicts] == [("x/y", "x", "a")]
+    assert status == "CONFLICT"
+    assert errors == []
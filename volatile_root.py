@@ -0,0 +1,101 @@
+"""
+Volatile Root - RAM-Backed Detonation Space.
+
+Gives `nexus unpack --detonate --ram` a scratch root on a memory-backed
+filesystem (/dev/shm, $XDG_RUNTIME_DIR), sized against a hard cap and
+shredded the moment the detonated workflow exits. Where no tmpfs exists
+(Windows), it falls back to a private temp directory with the same cap
+and wipe guarantees, and says so.
+"""
+
+import os
+import sys
+import stat
+import errno
+import atexit
+import shutil
+import tempfile
+
+DEFAULT_RAM_CAP = 512 * 1024 * 1024
+RAM_FILESYSTEMS = ("tmpfs", "ramfs")
+
+
+def _mount_fstype(path: str) -> str:
+    """Filesystem type of the mount holding `path` (Linux only, else None)."""
+    if not sys.platform.startswith("linux"):
+        return None
+    path = os.path.realpath(path)
+    best, fstype = "", None
+    try:
+        with open("/proc/mounts") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) < 3:
+                    continue
+                mount = parts[1].replace("\\040", " ")
+                if (path == mount or path.startswith(mount.rstrip("/") + "/")) and len(mount) > len(best):
+                    best, fstype = mount, parts[2]
+    except OSError:
+        return None
+    return fstype
+
+
+def ram_base_dir():
+    """First writable memory-backed directory, or None."""
+    for candidate in ("/dev/shm", os.environ.get("XDG_RUNTIME_DIR")):
+        if candidate and os.path.isdir(candidate) and os.access(candidate, os.W_OK) \
+                and _mount_fstype(candidate) in RAM_FILESYSTEMS:
+            return candidate
+    return None
+
+
+def _force_remove(func, path, exc_info):
+    # Read-only files/dirs from the artifact would otherwise survive rmtree
+    os.chmod(path, stat.S_IWRITE | stat.S_IREAD | stat.S_IEXEC)
+    func(path)
+
+
+class VolatileRoot:
+    """
+    Context manager owning a capped scratch directory.
+
+        with VolatileRoot(cap_bytes) as vroot:
+            packager.unpack(vroot.path, max_bytes=vroot.cap_bytes)
+            ...detonate...
+        # vroot.path is gone here, even on error or Ctrl+C
+    """
+
+    def __init__(self, cap_bytes: int = DEFAULT_RAM_CAP, prefix: str = "nxs-detonate-"):
+        self.cap_bytes = cap_bytes
+        self.prefix = prefix
+        self.path = None
+        self.ram_backed = False
+
+    def __enter__(self):
+        base = ram_base_dir()
+        self.ram_backed = base is not None
+        self.path = tempfile.mkdtemp(prefix=self.prefix, dir=base)
+        # Safety net for exits that skip __exit__ (os._exit excepted)
+        atexit.register(self.wipe)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.wipe()
+        atexit.unregister(self.wipe)
+
+    def ensure_fits(self, nbytes: int):
+        """Refuse payloads above the cap or above what the filesystem has free."""
+        if nbytes > self.cap_bytes:
+            raise OSError(errno.ENOSPC, f"Payload of {nbytes / 1e6:.1f} MB exceeds the "
+                                        f"{self.cap_bytes / 1e6:.1f} MB detonation cap")
+        if hasattr(os, "statvfs"):
+            vfs = os.statvfs(self.path)
+            free = vfs.f_bavail * vfs.f_frsize
+            if nbytes > free:
+                raise OSError(errno.ENOSPC, f"Payload of {nbytes / 1e6:.1f} MB exceeds the "
+                                            f"{free / 1e6:.1f} MB free at {self.path}")
+
+    def wipe(self):
+        """Delete everything under the root. Safe to call more than once."""
+        if self.path and os.path.exists(self.path):
+            shutil.rmtree(self.path, onerror=_force_remove)